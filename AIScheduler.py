@@ -0,0 +1,71 @@
+"""Importing key libraries"""
+import numpy as np
+
+
+"""Defining Constants"""
+# AI Scheduler Constants
+# An AI ship is near a threat if the closest ship was at most this many times MAX_AIM_DISTANCE away last time it
+# thought, near ships think every tick
+AI_NEAR_FACTOR = 2
+# Ships that aren't near a threat think every this many ticks and chase as they last decided in between
+AI_FAR_INTERVAL = 4
+# At most this many AI ships think in one tick, None means there is no limit
+AI_DECISION_BUDGET = 1000
+
+
+class AIScheduler:
+    """Decides Which AI Ships Think Each Tick"""
+    # Thinking is finding the closest ship, steering towards it and firing, which costs more the more ships there are
+    # Turning away from the arena edge is cheap, so every ship does that every tick whether it thinks or not
+    # Ships far from every other ship can't shoot or be shot at, so they don't need to think every tick
+    # If more ships need to think than the budget allows, the ones left over wait for the next tick
+    # They are picked in turn from where the last tick stopped, so every ship waits about as long as the others
+    # The budget is a number of ships and not a time so a game plays out the same on every computer
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, near_distance, far_interval=AI_FAR_INTERVAL, decision_budget=AI_DECISION_BUDGET):
+        self.near_distance = near_distance
+        self.far_interval = far_interval
+        self.decision_budget = decision_budget
+        # The index of the AI ship the next tick over the budget starts from
+        self.cursor = 0
+
+        # These attributes count the decisions of every tick so far
+        # decisions is the number of times a ship thought
+        self.decisions = 0
+        # deferred is the number of times a ship needed to think but was over the budget
+        self.deferred = 0
+        # skipped is the number of times a far ship didn't need to think
+        self.skipped = 0
+
+    def choose(self, tick, think_tick, target_distance):
+        # Return the indexes of the AI ships that think this tick, in order
+        # think_tick is the tick each AI ship last thought on and target_distance is how far its closest ship was
+        ship_count = len(think_tick)
+        due = np.flatnonzero((target_distance <= self.near_distance) | (tick - think_tick >= self.far_interval))
+        self.skipped += ship_count - len(due)
+
+        if self.decision_budget is not None and len(due) > self.decision_budget:
+            # Start from the first ship due at or after the cursor and wrap round to the start
+            start = np.searchsorted(due, self.cursor)
+            chosen = np.roll(due, -start)[:self.decision_budget]
+            self.cursor = int(chosen[-1]) + 1
+            self.deferred += len(due) - self.decision_budget
+            due = np.sort(chosen)
+
+        self.decisions += len(due)
+        return due
+
+    def get_counters(self):
+        return {"decisions": self.decisions, "deferred": self.deferred, "skipped": self.skipped}
+
+    def get_state(self):
+        # Return the settings, cursor and counters, everything needed to carry on choosing the same ships
+        return {"near_distance": self.near_distance, "far_interval": self.far_interval,
+                "decision_budget": self.decision_budget, "cursor": self.cursor, **self.get_counters()}
+
+    def set_state(self, values):
+        # Replace the settings, cursor and counters with ones made by get_state
+        for name, value in values.items():
+            setattr(self, name, value)
@@ -0,0 +1,134 @@
+"""Importing key libraries"""
+import concurrent.futures
+import json
+import os
+import PIL.Image
+
+
+"""Defining Constants"""
+# Asset Constants
+# Every image the game draws, they are packed into one atlas image
+ASSET_IMAGES = ("Images/PlayerShip.png", "Images/EnemyShip1.png", "Images/EnemyShip2.png", "Images/EnemyShip3.png",
+                "Images/Torpedo.png", "Images/Explosion.png", "Images/Sign.png")
+
+# Atlas Constants
+# The packed atlas and where each image is in it are saved here
+# They are packed again if any image has changed since, or the cache can't be read
+ATLAS_CACHE_DIRECTORY = "Cache"
+ATLAS_IMAGE_FILE = "Atlas.png"
+ATLAS_INDEX_FILE = "Atlas.json"
+# This is changed when the way the atlas is packed changes, so an old cache isn't used
+ATLAS_VERSION = 1
+# The atlas is at least this wide, and wider if an image is
+ATLAS_WIDTH = 256
+# The empty pixels between images, so an image never has the edge of its neighbour in it
+ATLAS_PADDING = 1
+
+
+def get_sources(file_names):
+    # Return the size and time each image was last changed, the cache is only used if these are the same
+    sources = []
+    for file_name in file_names:
+        status = os.stat(file_name)
+        sources.append([file_name, status.st_size, status.st_mtime_ns])
+    return sources
+
+
+def pack_atlas(images):
+    # Pack the images into rows of one image, tallest first so each row wastes as little space as it can
+    # Returns the atlas and a dictionary of the [x, y, width, height] of each image in it
+    width = max([ATLAS_WIDTH] + [image.width + ATLAS_PADDING * 2 for image in images.values()])
+    regions = {}
+    x = y = ATLAS_PADDING
+    row_height = 0
+    for name, image in sorted(images.items(), key=lambda item: (-item[1].height, item[0])):
+        if x + image.width + ATLAS_PADDING > width:
+            x = ATLAS_PADDING
+            y += row_height + ATLAS_PADDING
+            row_height = 0
+        regions[name] = [x, y, image.width, image.height]
+        x += image.width + ATLAS_PADDING
+        row_height = max(row_height, image.height)
+
+    atlas = PIL.Image.new("RGBA", (width, y + row_height + ATLAS_PADDING))
+    for name, image in images.items():
+        atlas.paste(image, regions[name][:2])
+    return atlas, regions
+
+
+def read_atlas_cache(sources, cache_directory):
+    # Return the cached atlas and its regions, or None if there isn't one for these images
+    try:
+        with open(os.path.join(cache_directory, ATLAS_INDEX_FILE)) as file:
+            index = json.load(file)
+        if index["version"] != ATLAS_VERSION or index["sources"] != sources:
+            return None
+        atlas = PIL.Image.open(os.path.join(cache_directory, ATLAS_IMAGE_FILE))
+        atlas.load()
+        return atlas.convert("RGBA"), index["regions"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_atlas_cache(atlas, regions, sources, cache_directory):
+    # Save the atlas then its index, each to a temporary file that is renamed when it is written
+    # So a game closed while saving never leaves half a cache, and the index is never newer than the atlas
+    # If the cache can't be written the game still runs, it just packs the atlas again next time
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        image_path = os.path.join(cache_directory, ATLAS_IMAGE_FILE)
+        atlas.save(image_path + ".tmp", "PNG")
+        os.replace(image_path + ".tmp", image_path)
+        index_path = os.path.join(cache_directory, ATLAS_INDEX_FILE)
+        with open(index_path + ".tmp", "w") as file:
+            json.dump({"version": ATLAS_VERSION, "sources": sources, "regions": regions}, file)
+        os.replace(index_path + ".tmp", index_path)
+    except OSError:
+        pass
+
+
+def load_images(file_names=ASSET_IMAGES, cache_directory=ATLAS_CACHE_DIRECTORY):
+    # Return a dictionary of every image, as RGBA images cut from the atlas
+    # The atlas comes from the cache if it is up to date, which is one file read instead of one for each image
+    sources = get_sources(file_names)
+    cached = read_atlas_cache(sources, cache_directory) if cache_directory is not None else None
+    if cached is None:
+        images = {}
+        for file_name in file_names:
+            with PIL.Image.open(file_name) as image:
+                images[file_name] = image.convert("RGBA")
+        atlas, regions = pack_atlas(images)
+        if cache_directory is not None:
+            write_atlas_cache(atlas, regions, sources, cache_directory)
+    else:
+        atlas, regions = cached
+    return {name: atlas.crop((x, y, x + width, y + height)) for name, (x, y, width, height) in regions.items()}
+
+
+class AssetLoader:
+    """Loads The Images Of The Game On Another Thread"""
+    # The images are loaded while the window is opening, so the menu can be shown as soon as it has opened
+    # Anything that needs an image before they have loaded waits for them
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, file_names=ASSET_IMAGES, cache_directory=ATLAS_CACHE_DIRECTORY):
+        self.file_names = file_names
+        self.cache_directory = cache_directory
+        self.future = None
+
+    def start(self):
+        # Start loading the images, if they aren't already
+        if self.future is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            self.future = executor.submit(load_images, self.file_names, self.cache_directory)
+            # The thread finishes on its own once the images are loaded
+            executor.shutdown(wait=False)
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def get_images(self):
+        # Return the images, loading them now if they haven't been started and waiting if they haven't finished
+        self.start()
+        return self.future.result()
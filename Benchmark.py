@@ -0,0 +1,260 @@
+"""Importing key libraries"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from Geometry import set_heading_resolution
+from ImportBenchmark import IMPORT_CHECKS, check_imports
+from Rules import EXPLOSION_RADIUS, EXPLOSION_DECAY_RATE
+from Simulation import Simulation
+
+
+"""Defining Constants"""
+# Arena Constants
+ARENA_WIDTH = 1920
+ARENA_HEIGHT = 1080
+
+# Benchmark Constants
+# Ships are given this much hp so none of them die and the fleet stays the same size the whole benchmark
+UNKILLABLE_HP = 10 ** 12
+# The memory of a scenario is measured over at most this many ticks, as tracing memory slows everything down
+MEMORY_TICKS = 50
+
+# Baseline Constants
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Benchmarks", "Baseline.json")
+# A scenario has regressed if a metric is this much bigger than in the baseline, 0.25 is 25% bigger
+REGRESSION_THRESHOLD = 0.25
+# The metrics compared against the baseline
+COMPARED_METRICS = ("mean_tick_ms", "p95_tick_ms", "peak_memory_bytes")
+
+
+def fire_random_torpedoes(simulation, rng, number):
+    # Fire torpedoes from random points in random directions, not from any ship
+    for _ in range(number):
+        simulation.fire_torpedo(rng.uniform(0, 360), rng.uniform(0, simulation.width),
+                                rng.uniform(0, simulation.height), simulation.width, -1)
+
+
+def keep_torpedoes_alive(simulation, rng, number):
+    # Fire random torpedoes until number of them are alive, replacing the ones that exploded
+    fire_random_torpedoes(simulation, rng, number - simulation.torpedoes.count)
+
+
+def spawn_random_explosions(simulation, rng, number):
+    # Make explosions at random points
+    for _ in range(number):
+        simulation.explosions.spawn(rng.uniform(0, simulation.width), rng.uniform(0, simulation.height),
+                                    EXPLOSION_RADIUS, EXPLOSION_DECAY_RATE)
+
+
+class Scenario:
+    """A Scripted Game To Be Timed"""
+    # A scenario makes a Simulation with a number of ships and runs it for a number of ticks
+    # Before every tick script is called with the Simulation and a seeded random number generator
+    # So a scenario does exactly the same thing every time it is run
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, name, ships, ticks, script=None, **settings):
+        self.name = name
+        self.ships = ships
+        self.ticks = ticks
+        self.script = script
+        # These are passed to the Simulation, to change its AI constants
+        self.settings = settings
+
+    def create(self):
+        # Make the Simulation with ships that can't die
+        simulation = Simulation(ARENA_WIDTH, ARENA_HEIGHT, self.ships, **self.settings)
+        for ship in simulation.ship_list:
+            ship.hp = ship.max_hp = UNKILLABLE_HP
+        return simulation
+
+    def run(self, ticks, on_tick=None):
+        # Run the scenario for ticks ticks, calling on_tick after every tick
+        simulation = self.create()
+        rng = random.Random(self.name)
+        for tick in range(ticks):
+            if self.script is not None:
+                self.script(simulation, rng)
+            simulation.on_update(simulation.tick_time)
+            if on_tick is not None:
+                on_tick(tick)
+        return simulation
+
+
+SCENARIOS = [
+    Scenario("fleet_3", 3, 2000),
+    Scenario("fleet_30", 30, 1000),
+    Scenario("fleet_300", 300, 300),
+    Scenario("fleet_1000", 1000, 100),
+    Scenario("fleet_3000", 3000, 40),
+    Scenario("fleet_10000", 10000, 20),
+    # 50 torpedoes are fired every tick so thousands are alive at once
+    Scenario("torpedo_saturation", 3, 500, lambda simulation, rng: fire_random_torpedoes(simulation, rng, 50)),
+    # The torpedoes that explode are replaced every tick so exactly this many are alive at once
+    Scenario("torpedoes_10000", 3, 60, lambda simulation, rng: keep_torpedoes_alive(simulation, rng, 10000)),
+    Scenario("torpedoes_20000", 3, 30, lambda simulation, rng: keep_torpedoes_alive(simulation, rng, 20000)),
+    # 40 explosions are made every tick so thousands are alive at once, with 100 ships in them
+    Scenario("explosion_heavy", 100, 300, lambda simulation, rng: spawn_random_explosions(simulation, rng, 40)),
+    # The ships never fire, so this is only moving and turning
+    Scenario("idle_cruising", 300, 2000, weapon_cooldown_time=math.inf),
+]
+
+
+def measure_time(scenario, ticks):
+    # Return the time each tick took in nanoseconds and the total time of each phase
+    # The Simulation's profiler times the phases, without keeping a trace
+    tick_times = []
+    simulation = scenario.create()
+    simulation.profiler.enabled = True
+    simulation.profiler.max_trace_length = 0
+    rng = random.Random(scenario.name)
+
+    # The garbage collector is left on, as its pauses are part of what a tick costs
+    for _ in range(ticks):
+        if scenario.script is not None:
+            scenario.script(simulation, rng)
+        start = time.perf_counter_ns()
+        simulation.on_update(simulation.tick_time)
+        tick_times.append(time.perf_counter_ns() - start)
+
+    phase_times = {name: phase.total for name, phase in simulation.profiler.phases.items()}
+    return np.array(tick_times, dtype=np.float64), phase_times, simulation
+
+
+def measure_memory(scenario, ticks):
+    # Return the peak memory used while running the scenario and how many allocations were made
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    simulation = scenario.run(ticks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_memory_bytes": peak,
+        "allocated_blocks": sys.getallocatedblocks() - blocks,
+        "gc_collections": sum(stat["collections"] for stat in gc.get_stats()) - collections,
+        "memory_ticks": ticks,
+        "torpedoes_at_end": simulation.torpedoes.count,
+    }
+
+
+def run_scenario(scenario, tick_scale=1):
+    # Time a scenario and measure its memory, returning its metrics
+    ticks = max(5, int(scenario.ticks * tick_scale))
+    tick_times, phase_times, simulation = measure_time(scenario, ticks)
+    tick_ms = tick_times / 1e6
+    metrics = {
+        "ships": scenario.ships,
+        "ticks": ticks,
+        "mean_tick_ms": float(tick_ms.mean()),
+        "p50_tick_ms": float(np.percentile(tick_ms, 50)),
+        "p95_tick_ms": float(np.percentile(tick_ms, 95)),
+        "max_tick_ms": float(tick_ms.max()),
+        "phase_ms": {name: total / ticks / 1e6 for name, total in phase_times.items()},
+        "torpedoes": simulation.torpedoes.count,
+        "explosions": simulation.explosions.count,
+        "ai_decisions": simulation.ai_scheduler.get_counters(),
+    }
+    metrics.update(measure_memory(scenario, min(ticks, MEMORY_TICKS)))
+    return metrics
+
+
+def compare_to_baseline(results, baseline, threshold):
+    # Return a line for every metric of every scenario that is more than threshold bigger than the baseline
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        baseline_metrics = baseline["scenarios"].get(name)
+        if baseline_metrics is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old = baseline_metrics.get(metric)
+            new = metrics[metric]
+            if old and new > old * (1 + threshold):
+                regressions.append("{} {}: {:.4g} -> {:.4g} (+{:.0%})".format(name, metric, old, new, new / old - 1))
+    return regressions
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time the Simulation on scripted scenarios without a window")
+    parser.add_argument("scenarios", nargs="*", help="names of the scenarios to run, all of them by default")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="how much bigger a metric can be than the baseline before it is a regression")
+    parser.add_argument("--tick-scale", type=float, default=1, help="multiply the ticks of every scenario by this")
+    parser.add_argument("--heading-resolution", type=float,
+                        help="look headings up in a table with one every this many degrees instead of working them out")
+    parser.add_argument("--skip-imports", action="store_true",
+                        help="don't check how long the modules that run without a window take to import")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    if arguments.list:
+        for scenario in SCENARIOS:
+            print(scenario.name, scenario.ships, scenario.ticks)
+        return 0
+
+    set_heading_resolution(arguments.heading_resolution)
+    scenarios = [scenario for scenario in SCENARIOS if not arguments.scenarios or scenario.name in arguments.scenarios]
+    results = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "tick_scale": arguments.tick_scale,
+        "heading_resolution": arguments.heading_resolution,
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        metrics = run_scenario(scenario, arguments.tick_scale)
+        results["scenarios"][scenario.name] = metrics
+        print("{:20} {:6} ships {:9.3f} ms/tick  p95 {:9.3f} ms  peak {:8.1f} KiB".format(
+            scenario.name, scenario.ships, metrics["mean_tick_ms"], metrics["p95_tick_ms"],
+            metrics["peak_memory_bytes"] / 1024), flush=True)
+
+    # The same import checks as ImportBenchmark.py are part of the gate
+    # So a change that makes Rules.py import numpy or the Simulation import arcade fails it too
+    if not arguments.skip_imports and not arguments.save_baseline:
+        results["imports"] = check_imports(list(IMPORT_CHECKS))
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.save_baseline:
+        os.makedirs(os.path.dirname(arguments.baseline), exist_ok=True)
+        with open(arguments.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        return 0
+
+    regressions = ["import {}: {:.4g} ms, budget {} ms, forbidden modules imported: {}".format(
+        module, result["median_ms"], result["budget_ms"], ", ".join(result["forbidden_modules"]) or "none")
+        for module, result in results.get("imports", {}).items() if not result["passed"]]
+    if not os.path.exists(arguments.baseline):
+        print("No baseline at", arguments.baseline)
+    else:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        regressions += compare_to_baseline(results, baseline, arguments.threshold)
+    for line in regressions:
+        print("REGRESSION", line)
+    # A non zero exit code lets CI fail the build when something got slower
+    return 1 if regressions else 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
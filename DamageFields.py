@@ -0,0 +1,150 @@
+"""Importing key libraries"""
+import numpy as np
+from GridSearch import find_close_pairs
+
+
+class DamageFields:
+    """Holds Every Explosion As A Circle Of Damage In NumPy Arrays"""
+    # An explosion is a circle with a center and a radius that shrinks by its decay rate every update
+    # Any ship touching the circle loses hp every update until the circle is gone
+    # Every explosion is checked against every ship in one go, and nothing else collides with them
+
+    # The names of the arrays, used to save and load every explosion
+    ARRAY_NAMES = ("x", "y", "radius", "decay", "start_radius", "number")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, damage, capacity=256):
+        # The hp a ship loses every update it is touching an explosion
+        self.damage = damage
+
+        # The number of slots in use
+        self.count = 0
+        self.capacity = 0
+        # The number of explosions ever spawned, the next explosion is given this as its number
+        self.spawned = 0
+
+        # Create the arrays
+        self.x = None
+        self.y = None
+        self.radius = None
+        # How much the radius shrinks every update
+        self.decay = None
+        # The radius the explosion started with, used to work out how big to draw it
+        self.start_radius = None
+        # The number of explosions spawned before it, which no other explosion in the game has
+        self.number = None
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        # Make every array big enough for capacity explosions, keeping the explosions already in them
+        def resize(array, dtype=np.float64):
+            new_array = np.zeros(capacity, dtype=dtype)
+            if array is not None:
+                new_array[:self.count] = array[:self.count]
+            return new_array
+
+        self.x = resize(self.x)
+        self.y = resize(self.y)
+        self.radius = resize(self.radius)
+        self.decay = resize(self.decay)
+        self.start_radius = resize(self.start_radius)
+        self.number = resize(self.number, np.int64)
+        self.capacity = capacity
+
+    def get_state(self):
+        # Return a copy of the slots in use of every array
+        return {name: getattr(self, name)[:self.count].copy() for name in self.ARRAY_NAMES}
+
+    def set_state(self, arrays):
+        # Replace every explosion with the ones in arrays, which were made by get_state
+        count = len(arrays["x"])
+        self.count = 0
+        if count > self.capacity:
+            self.grow(count)
+        for name in self.ARRAY_NAMES:
+            getattr(self, name)[:count] = arrays[name]
+        self.count = count
+
+    def spawn(self, x, y, radius, decay):
+        # Add an explosion in the next free slot and return its index
+        # If the arrays are full then they are made twice as big
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        index = self.count
+        self.count += 1
+        self.x[index] = x
+        self.y[index] = y
+        self.radius[index] = radius
+        self.decay[index] = decay
+        self.start_radius[index] = radius
+        self.number[index] = self.spawned
+        self.spawned += 1
+        return index
+
+    def spawn_many(self, x, y, radius, decay):
+        # Add an explosion at each point in the x and y arrays, in the same order spawn would add them one by one
+        count = len(x)
+        if self.count + count > self.capacity:
+            self.grow(max(self.capacity * 2, self.count + count))
+
+        new = slice(self.count, self.count + count)
+        self.x[new] = x
+        self.y[new] = y
+        self.radius[new] = radius
+        self.decay[new] = decay
+        self.start_radius[new] = radius
+        self.number[new] = np.arange(self.spawned, self.spawned + count)
+        self.count += count
+        self.spawned += count
+
+    def get_scale(self, start_scale):
+        # Return how big each explosion should be drawn, an explosion starts at start_scale and shrinks to 0
+        count = self.count
+        return start_scale * self.radius[:count] / self.start_radius[:count]
+
+    def find_damage(self, ship_x, ship_y, ship_cos, ship_sin, half_length, half_width):
+        # Return the damage each ship takes from the explosions it is touching
+        # A ship is treated as a line along its heading with rounded ends, half_length from the center to
+        # the end of the line and half_width from the line to the side of the ship
+        damage = np.zeros(len(ship_x), dtype=np.int64)
+        count = self.count
+        if count == 0 or len(ship_x) == 0:
+            return damage
+
+        field_x = self.x[:count]
+        field_y = self.y[:count]
+        radius = self.radius[:count]
+
+        # Only pairs close enough for the biggest explosion to touch the furthest point of a ship are checked
+        reach = float(radius.max()) + half_length + half_width
+        field, ship = find_close_pairs(field_x, field_y, ship_x, ship_y, reach)
+
+        # Find the distance from the explosion's center to the nearest point on the line through the ship
+        diff_x = field_x[field] - ship_x[ship]
+        diff_y = field_y[field] - ship_y[ship]
+        along = np.clip(diff_x * ship_cos[ship] + diff_y * ship_sin[ship], -half_length, half_length)
+        nearest_x = diff_x - along * ship_cos[ship]
+        nearest_y = diff_y - along * ship_sin[ship]
+        touching = np.hypot(nearest_x, nearest_y) <= radius[field] + half_width
+
+        damage += np.bincount(ship[touching], minlength=len(ship_x)) * self.damage
+        return damage
+
+    def decay_fields(self):
+        # Shrink every explosion and remove the ones that are gone
+        # The living explosions are moved down so they stay in the order they were made
+        count = self.count
+        self.radius[:count] -= self.decay[:count]
+        alive = self.radius[:count] > 0
+        living = int(np.count_nonzero(alive))
+        if living == count:
+            return
+
+        for array in (self.x, self.y, self.radius, self.decay, self.start_radius, self.number):
+            array[:living] = array[:count][alive]
+        self.count = living
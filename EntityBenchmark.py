@@ -0,0 +1,101 @@
+"""Importing key libraries"""
+import argparse
+import json
+import random
+import sys
+import time
+from EntityList import EntityList
+
+
+"""Defining Constants"""
+# Entity Benchmark Constants
+# The number of living entities the churn is timed with, it should take the same time for each of them
+ENTITY_COUNTS = (1000, 100000, 1000000)
+# Each tick this many entities are spawned and this many are despawned, then they are flushed
+CHURN_PER_TICK = 1000
+CHURN_TICKS = 200
+# The fewest spawns and despawns a second there must be for every number of entities
+MIN_CHURN_RATE = 100000
+# Removing from a plain list is timed with this many removals, as it gets slow with many entities
+LIST_REMOVALS = 200
+
+
+class Entity:
+    """Stand In For A Ship"""
+    __slots__ = ("handle",)
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        self.handle = None
+
+
+def measure_churn(entity_count, churn_per_tick, ticks, seed):
+    # Return the spawns and despawns a second of an EntityList with entity_count living entities
+    # A spawn and a despawn are two operations, so churning one entity counts twice
+    # Every tick random entities are despawned, the same number are spawned and then the despawned ones are flushed
+    rng = random.Random(seed)
+    entities = EntityList()
+    for entity in [Entity() for _ in range(entity_count)]:
+        entity.handle = entities.spawn(entity)
+    spare = [Entity() for _ in range(churn_per_tick)]
+
+    start = time.perf_counter_ns()
+    for _ in range(ticks):
+        for position in rng.sample(range(len(entities)), churn_per_tick):
+            entities.despawn(entities.entities[position].handle)
+        for entity in spare:
+            entity.handle = entities.spawn(entity)
+        entities.flush()
+        spare = [Entity() for _ in range(churn_per_tick)]
+    seconds = (time.perf_counter_ns() - start) / 1e9
+    # The spare entities are made inside the loop, so they are part of the time the same as a real spawn
+    return 2 * churn_per_tick * ticks / seconds
+
+
+def measure_list_removal(entity_count, removals, seed):
+    # Return the removals a second from a plain list of entity_count entities, the way ships used to be removed
+    rng = random.Random(seed)
+    entities = [Entity() for _ in range(entity_count)]
+    chosen = [entities[position] for position in rng.sample(range(entity_count), removals)]
+    start = time.perf_counter_ns()
+    for entity in chosen:
+        entities.remove(entity)
+    return removals / ((time.perf_counter_ns() - start) / 1e9)
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time spawning and despawning entities in an EntityList")
+    parser.add_argument("--entities", type=int, nargs="+", default=ENTITY_COUNTS)
+    parser.add_argument("--churn", type=int, default=CHURN_PER_TICK, help="entities spawned and despawned a tick")
+    parser.add_argument("--ticks", type=int, default=CHURN_TICKS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    results = {}
+    for entity_count in arguments.entities:
+        churn_rate = measure_churn(entity_count, min(arguments.churn, entity_count), arguments.ticks, arguments.seed)
+        list_rate = measure_list_removal(entity_count, min(LIST_REMOVALS, entity_count), arguments.seed)
+        result = results[entity_count] = {
+            "spawns_and_despawns_per_second": churn_rate,
+            "list_removals_per_second": list_rate,
+            "min_spawns_and_despawns_per_second": MIN_CHURN_RATE,
+            "passed": churn_rate >= MIN_CHURN_RATE,
+        }
+        print("{:8} entities  {:10.0f} spawns and despawns/s  list.remove {:10.0f}/s  {}".format(
+            entity_count, churn_rate, list_rate, "ok" if result["passed"] else "FAILED"), flush=True)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    # Exits with 1 if any number of entities is below the rate, so it can be run in CI
+    return 0 if all(result["passed"] for result in results.values()) else 1
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Importing key libraries"""
+import itertools
+
+
+"""Defining Constants"""
+# Handle Constants
+# A handle is the number of an entity's slot in its low bits and the generation of the slot above them
+# The generation of a slot goes up every time its entity is removed
+# So a handle kept after its entity was removed never finds whatever entity is put in the slot next
+HANDLE_SLOT_BITS = 32
+HANDLE_SLOT_MASK = (1 << HANDLE_SLOT_BITS) - 1
+
+
+class EntityList:
+    """List Of Entities With Generational Handles And Constant Time Removal"""
+    # Adding or removing an entity takes the same time however many entities there are
+    # An entity is removed by moving the last entity into its place, instead of moving every entity after it
+    # So the order of the entities only changes where one was removed
+    # despawn only marks an entity to be removed and flush removes every marked entity at the end of a tick
+    # So the entities can be looped over while they are being despawned
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        # The living entities in a list without gaps, this is the list that is looped over
+        self.entities = []
+        # The slot of each entity in entities
+        self.entity_slots = []
+        # For every slot, where its entity is in entities, or -1 if it doesn't have one, and its generation
+        self.positions = []
+        self.generations = []
+        # The slots without an entity, which are used again before new slots are made
+        self.free_slots = []
+        # The handles despawned since the last flush, in the order they were despawned
+        self.despawned = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        # Loop over the entities there were when the loop started
+        # Entities spawned during the loop are added after them so they are left out
+        return itertools.islice(self.entities, len(self.entities))
+
+    def __contains__(self, handle):
+        return self.get(handle) is not None
+
+    def spawn(self, entity):
+        # Add an entity to the end of the list and return its handle
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.positions[slot] = len(self.entities)
+        else:
+            slot = len(self.positions)
+            self.positions.append(len(self.entities))
+            self.generations.append(0)
+        self.entities.append(entity)
+        self.entity_slots.append(slot)
+        return self.generations[slot] << HANDLE_SLOT_BITS | slot
+
+    def spawn_many(self, entities):
+        # Add entities to the end of the list in order and return their handles
+        # Free slots are used first, then new slots are made for the rest all at once
+        entities = list(entities)
+        reused = min(len(self.free_slots), len(entities))
+        handles = [self.spawn(entity) for entity in entities[:reused]]
+        new_entities = entities[reused:]
+        first_slot = len(self.positions)
+        first_position = len(self.entities)
+        count = len(new_entities)
+        self.positions.extend(range(first_position, first_position + count))
+        self.generations.extend(itertools.repeat(0, count))
+        self.entities.extend(new_entities)
+        self.entity_slots.extend(range(first_slot, first_slot + count))
+        # A new slot's generation is 0 so its handle is the same as its slot
+        handles.extend(range(first_slot, first_slot + count))
+        return handles
+
+    def get(self, handle):
+        # Return the entity with this handle, or None if it has been removed
+        slot = handle & HANDLE_SLOT_MASK
+        if slot >= len(self.positions) or self.generations[slot] != handle >> HANDLE_SLOT_BITS:
+            return None
+        return self.entities[self.positions[slot]]
+
+    def despawn(self, handle):
+        # Mark an entity to be removed by the next flush, it stays in the list until then
+        # Returns False if the entity has already been removed or marked
+        if handle in self.despawned or handle not in self:
+            return False
+        self.despawned[handle] = None
+        return True
+
+    def flush(self):
+        # Remove every entity despawned since the last flush, in the order they were despawned
+        # Each one is replaced by the last entity, this must not be called while looping over the entities
+        entities = self.entities
+        entity_slots = self.entity_slots
+        positions = self.positions
+        for handle in self.despawned:
+            slot = handle & HANDLE_SLOT_MASK
+            position = positions[slot]
+            last = entities.pop()
+            last_slot = entity_slots.pop()
+            if position < len(entities):
+                entities[position] = last
+                entity_slots[position] = last_slot
+                positions[last_slot] = position
+            positions[slot] = -1
+            self.generations[slot] += 1
+            self.free_slots.append(slot)
+        removed = len(self.despawned)
+        self.despawned.clear()
+        return removed
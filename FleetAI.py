@@ -0,0 +1,202 @@
+"""Importing key libraries"""
+import importlib.util
+import math
+import numpy as np
+
+# scipy is optional, without it the closest ships are always found with a distance matrix
+# It is only imported the first time a fleet is big enough to need it, as importing it takes longer than numpy
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+
+"""Defining Constants"""
+# Fleets with at least this many ships use a KD-tree to find the closest ships if scipy is installed
+KD_TREE_FLEET_SIZE = 500
+# The number of nearest ships a KD-tree returns for each ship
+# One of them is the ship itself, the others are checked again to break ties the same way as the distance matrix
+KD_TREE_NEIGHBOURS = 4
+# When the ships looking for a target are on at most this many teams, each team gets a KD-tree of its enemies
+# With more teams than this, one KD-tree of every ship is searched further until a ship on another team is found
+KD_TREE_TEAM_TREES = 8
+# The distance matrix is worked out this many rows at a time so it doesn't use too much memory
+DISTANCE_MATRIX_ROWS = 256
+
+
+def get_tie_break_rank(ship_numbers, candidates, is_ai):
+    # When two ships are the same distance away, the closest ship is the first one in the list being searched
+    # While an AI ship was looking for the closest ship, that list started with the player,
+    # then the AI ships after it, then the AI ships before it
+    # So a lower rank means a ship was earlier in that list
+    ship_count = len(is_ai)
+    rank = (candidates - ship_numbers[:, None]) % ship_count
+    return np.where(is_ai[candidates], rank, -1)
+
+
+def pick_closest(ship_numbers, candidates, distance, is_ai):
+    # Pick the closest candidate for each ship, breaking ties the same way as get_tie_break_rank
+    # candidates and distance have one row per ship, a distance of inf is never picked
+    closest_distance = distance.min(axis=1)
+    tied = distance == closest_distance[:, None]
+    rank = np.where(tied, get_tie_break_rank(ship_numbers, candidates, is_ai), len(is_ai))
+    choice = np.argmin(rank, axis=1)
+
+    target = candidates[np.arange(len(ship_numbers)), choice]
+    # If there are no other ships then there is no target
+    target = np.where(np.isinf(closest_distance), -1, target)
+    return target, closest_distance
+
+
+def find_closest_ships(x, y, is_ai, ship_numbers, team=None):
+    # For each ship in ship_numbers, find the closest other ship and the distance to it
+    # x, y and is_ai have one value for every ship, and so does team if it is given
+    # Ships on the same team as a ship are never its closest ship
+    # The target is -1 and the distance is inf if there are no other ships
+    ship_count = len(x)
+    if HAS_SCIPY and ship_count >= KD_TREE_FLEET_SIZE:
+        return find_closest_ships_kd_tree(x, y, is_ai, ship_numbers, team)
+    return find_closest_ships_matrix(x, y, is_ai, ship_numbers, team)
+
+
+def find_closest_ships_matrix(x, y, is_ai, ship_numbers, team=None):
+    # Find the closest ships with the distance from each ship to every ship, a few hundred rows at a time
+    ship_count = len(x)
+    targets = np.empty(len(ship_numbers), dtype=np.int64)
+    distances = np.empty(len(ship_numbers), dtype=np.float64)
+    everyone = np.arange(ship_count)
+    for start in range(0, len(ship_numbers), DISTANCE_MATRIX_ROWS):
+        rows = ship_numbers[start:start + DISTANCE_MATRIX_ROWS]
+        # The distance from each of these ships to every ship
+        x_diff = x[rows][:, None] - x[None, :]
+        y_diff = y[rows][:, None] - y[None, :]
+        distance = np.sqrt(x_diff * x_diff + y_diff * y_diff)
+        # A ship can't be its own closest ship
+        distance[np.arange(len(rows)), rows] = np.inf
+        if team is not None:
+            distance[team[rows][:, None] == team[None, :]] = np.inf
+
+        candidates = np.broadcast_to(everyone, distance.shape)
+        targets[start:start + len(rows)], distances[start:start + len(rows)] = \
+            pick_closest(rows, candidates, distance, is_ai)
+    return targets, distances
+
+
+def get_candidate_distances(x, y, ship_numbers, candidates, team):
+    # Return the distance from each ship to each of its candidates
+    # A ship itself and the ships on its team are an inf distance away so they are never picked
+    x_diff = x[ship_numbers][:, None] - x[candidates]
+    y_diff = y[ship_numbers][:, None] - y[candidates]
+    distance = np.sqrt(x_diff * x_diff + y_diff * y_diff)
+    distance[candidates == ship_numbers[:, None]] = np.inf
+    if team is not None:
+        distance[team[candidates] == team[ship_numbers][:, None]] = np.inf
+    return distance
+
+
+def find_closest_ships_kd_tree(x, y, is_ai, ship_numbers, team=None):
+    # The same as find_closest_ships but a KD-tree finds a few of the nearest ships for each ship first
+    # The distances to those are then worked out again so they are exactly the same as the distance matrix
+    from scipy.spatial import cKDTree
+    ship_count = len(x)
+    points = np.column_stack((x, y))
+    if team is not None:
+        # With only a few teams, each team looks in a tree of only the ships on other teams
+        # So a ship in the middle of a big fleet doesn't have to look past all of its own team
+        query_teams, team_rows = np.unique(team[ship_numbers], return_inverse=True)
+        if len(query_teams) <= KD_TREE_TEAM_TREES:
+            return find_closest_enemies_kd_tree(x, y, is_ai, ship_numbers, team, query_teams, team_rows)
+
+    tree = cKDTree(points)
+    targets = np.full(len(ship_numbers), -1, dtype=np.int64)
+    distances = np.full(len(ship_numbers), np.inf)
+    rows = np.arange(len(ship_numbers))
+    neighbours = min(KD_TREE_NEIGHBOURS, ship_count)
+    while len(rows) > 0:
+        numbers = ship_numbers[rows]
+        _, candidates = tree.query(points[numbers], k=neighbours)
+        candidates = candidates.reshape(len(rows), neighbours)
+        distance = get_candidate_distances(x, y, numbers, candidates, team)
+        targets[rows], distances[rows] = pick_closest(numbers, candidates, distance, is_ai)
+        if team is None or neighbours == ship_count:
+            break
+        # A ship whose nearest ships were all on its team looks at twice as many of them
+        rows = rows[np.isinf(distances[rows])]
+        neighbours = min(neighbours * 2, ship_count)
+    return targets, distances
+
+
+def find_closest_enemies_kd_tree(x, y, is_ai, ship_numbers, team, query_teams, team_rows):
+    # Find the closest ships with a KD-tree of the ships on the other teams for each team
+    # query_teams are the teams of the ships being looked up and team_rows is which of them each ship is on
+    from scipy.spatial import cKDTree
+    points = np.column_stack((x, y))
+    targets = np.full(len(ship_numbers), -1, dtype=np.int64)
+    distances = np.full(len(ship_numbers), np.inf)
+    for number, query_team in enumerate(query_teams.tolist()):
+        enemies = np.flatnonzero(team != query_team)
+        # If every ship is on this team then its ships have no target
+        if len(enemies) == 0:
+            continue
+        rows = np.flatnonzero(team_rows == number)
+        numbers = ship_numbers[rows]
+        neighbours = min(KD_TREE_NEIGHBOURS, len(enemies))
+        _, found = cKDTree(points[enemies]).query(points[numbers], k=neighbours)
+        candidates = enemies[found.reshape(len(rows), neighbours)]
+        distance = get_candidate_distances(x, y, numbers, candidates, None)
+        targets[rows], distances[rows] = pick_closest(numbers, candidates, distance, is_ai)
+    return targets, distances
+
+
+def is_point_in_rect(x, y, rect):
+    # Check which points are in a rectangle made of 4 points going anticlockwise from the bottom left
+    # This gives exactly the same answers as is_point_in_polygon does for these rectangles
+    (left, bottom), _, (right, top), _ = rect
+    in_y = (y > min(bottom, top)) & (y <= max(bottom, top))
+    return in_y & ((x <= right) != (x <= left))
+
+
+def avoid_walls(x, y, angle, turn, left_turn, right_turn, outer_rect, inner_rect):
+    # Work out the new angle and wall turning state of AI ships near the arena edge
+    # turn is how many degrees each ship turns this tick
+    # Returns the new angle, left_turn and right_turn arrays, and which ships are free to chase their closest ship
+
+    # If one of the turn variables is true then the ai ship is close to the arena edge
+    # Depending on which variable is true, make it turn that way
+    # If it is back inside the inner rect then stop turning away from the edge
+    turning = left_turn | right_turn
+    new_angle = np.where(turning & left_turn, angle + turn,
+                         np.where(turning & ~left_turn & right_turn, angle - turn, angle))
+    back_inside = turning & is_point_in_rect(x, y, inner_rect)
+    new_left_turn = left_turn & ~back_inside
+    new_right_turn = right_turn & ~back_inside
+
+    # If the ship is not turning and not in the outer rect, it is too close to the arena edge
+    # Then depending on angle it is approaching the arena edge, make it start turning left or right
+    in_rect = is_point_in_rect(x, y, outer_rect)
+    start_turning = ~turning & ~in_rect
+    turn_left = (angle // 45) % 2 == 0
+    new_left_turn |= start_turning & turn_left
+    new_right_turn |= start_turning & ~turn_left
+    return new_angle, new_left_turn, new_right_turn, ~turning & in_rect
+
+
+def turn_towards_targets(x, y, angle, turn, target_x, target_y, distance, max_aim_distance):
+    # Work out the new angle of AI ships that are chasing their closest ship
+    # Each ship only needs its own state and where its closest ship is, so the order doesn't matter
+    # turn is how many degrees each ship turns this tick, returns the new angle array
+
+    # math.atan2 is used instead of np.arctan2 as they can give slightly different answers
+    # and the turning rules below compare angles exactly
+    arctan_angle = np.degrees(np.fromiter(map(math.atan2, (target_y - y).tolist(), (target_x - x).tolist()),
+                                          np.float64, len(x)))
+    ship_angle = np.abs(angle % 360)
+
+    # If the closest ship is close, turn left when the ship's angle is in the half circle after the
+    # angle to the closest ship, and right otherwise
+    # If the closest ship is too far to shoot at, turn the other way so this ship gets closer
+    positive = arctan_angle >= 0
+    in_upper = (arctan_angle < ship_angle) & (ship_angle < arctan_angle + 180)
+    in_lower = (arctan_angle + 180 < ship_angle) & (ship_angle < arctan_angle + 360)
+    turn_left = np.where(positive, in_upper, ~in_lower)
+    close = distance < max_aim_distance / 2
+    far = distance > max_aim_distance
+    turn_left = np.where(close, turn_left, ~turn_left)
+    return np.where(close | far, np.where(turn_left, angle + turn, angle - turn), angle)
@@ -0,0 +1,117 @@
+"""Importing key libraries"""
+import math
+
+
+"""Defining Constants"""
+# Heading Constants
+# A heading is the cos and sin of an angle, the unit vector pointing that way
+# By default they are worked out exactly, set_heading_resolution makes them come from a table instead
+# The table has a heading every heading_resolution degrees and angles are rounded to the closest one
+heading_resolution = None
+heading_table = None
+
+# Hit Box Constants
+# Rotated hit boxes are rounded to 2 decimal places, so a point can end up this much further from the center
+HIT_BOX_ROUNDING = 0.01
+
+
+def set_heading_resolution(resolution=None):
+    # Look headings up in a table with a heading every resolution degrees, or work them out exactly if it is None
+    # This should be done before any Simulation is made, as bodies keep their heading until their angle changes
+    global heading_resolution, heading_table
+    if resolution is None:
+        heading_resolution = None
+        heading_table = None
+        return
+    size = round(360 / resolution)
+    heading_resolution = 360 / size
+    heading_table = [(math.cos(math.radians(i * heading_resolution)), math.sin(math.radians(i * heading_resolution)))
+                     for i in range(size)]
+
+
+def get_heading(angle_degrees):
+    # Return the cos and sin of an angle in degrees
+    if heading_table is None:
+        angle_radians = math.radians(angle_degrees)
+        return math.cos(angle_radians), math.sin(angle_radians)
+    return heading_table[round(angle_degrees / heading_resolution) % len(heading_table)]
+
+
+def rotate_point(x, y, angle_degrees):
+    # Rotate a point around the origin
+    cos_angle, sin_angle = get_heading(angle_degrees)
+    return rotate_point_by_heading(x, y, cos_angle, sin_angle)
+
+
+def rotate_point_by_heading(x, y, cos_angle, sin_angle):
+    # Rotate a point around the origin by an angle given as its heading
+    # The result is rounded to 2 decimal places the same way arcade does it
+    # So hit boxes here are exactly the same as the ones arcade would use
+    rotated_x = x * cos_angle - y * sin_angle
+    rotated_y = x * sin_angle + y * cos_angle
+    return [round(rotated_x, 2), round(rotated_y, 2)]
+
+
+def get_hit_box_radius(hit_box, scale=1):
+    # Return the furthest any point of a hit box can be from its center, whatever angle it is rotated to
+    # Two hit boxes can only touch if their centers are closer than the sum of their radii
+    return max(math.hypot(x * scale, y * scale) for x, y in hit_box) + HIT_BOX_ROUNDING
+
+
+def are_polygons_intersecting(poly_a, poly_b):
+    # Check if two convex polygons intersect using the separating axis theorem
+    # For every edge of both polygons, project both polygons onto the edge's normal
+    # If the projections don't overlap on any normal then the polygons don't intersect
+    for polygon in (poly_a, poly_b):
+        for i1 in range(len(polygon)):
+            i2 = (i1 + 1) % len(polygon)
+            projection_1 = polygon[i1]
+            projection_2 = polygon[i2]
+
+            normal = (projection_2[1] - projection_1[1],
+                      projection_1[0] - projection_2[0])
+
+            min_a, max_a, min_b, max_b = (None,) * 4
+
+            for point in poly_a:
+                projected = normal[0] * point[0] + normal[1] * point[1]
+                if min_a is None or projected < min_a:
+                    min_a = projected
+                if max_a is None or projected > max_a:
+                    max_a = projected
+
+            for point in poly_b:
+                projected = normal[0] * point[0] + normal[1] * point[1]
+                if min_b is None or projected < min_b:
+                    min_b = projected
+                if max_b is None or projected > max_b:
+                    max_b = projected
+
+            if max_a <= min_b or max_b <= min_a:
+                return False
+
+    return True
+
+
+def is_point_in_polygon(x, y, polygon_point_list):
+    # Use ray-tracing to see if a point is inside a polygon
+    # Points on the edges are treated the same way arcade treats them
+    n = len(polygon_point_list)
+    inside = False
+    if n == 0:
+        return False
+
+    p1x, p1y = polygon_point_list[0]
+    x_intersect = None
+    for i in range(n + 1):
+        p2x, p2y = polygon_point_list[i % n]
+        if y > min(p1y, p2y):
+            if y <= max(p1y, p2y):
+                if x <= max(p1x, p2x):
+                    if p1y != p2y:
+                        x_intersect = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+                    if p1x == p2x or x <= x_intersect:
+                        inside = not inside
+        p1x, p1y = p2x, p2y
+
+    return inside
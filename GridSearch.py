@@ -0,0 +1,78 @@
+"""Importing key libraries"""
+import numpy as np
+
+
+# Cell keys are made from two cell coordinates, these are used to combine them into one number
+# The offset keeps the coordinates positive for anything a little outside the arena
+CELL_KEY_OFFSET = 1 << 20
+CELL_KEY_MULTIPLIER = 1 << 22
+
+
+def get_cell_keys(x, y, cell_size):
+    # Return a number for the grid cell each point is in
+    cell_x = np.floor(x / cell_size).astype(np.int64) + CELL_KEY_OFFSET
+    cell_y = np.floor(y / cell_size).astype(np.int64) + CELL_KEY_OFFSET
+    return cell_x, cell_y
+
+
+def find_close_pairs(query_x, query_y, point_x, point_y, reach):
+    # Return every pair of a query point and a point that are within reach of each other
+    # This is the same check as the collision radius check, so nothing that could collide is missed
+    # The points are sorted into grid cells twice as wide as reach
+    # So only the 4 cells nearest to each query have to be checked
+    # The pairs are returned as an array of query numbers and an array of point numbers
+    if len(point_x) == 0 or len(query_x) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    cell_size = 2 * reach
+    point_cell_x, point_cell_y = get_cell_keys(point_x, point_y, cell_size)
+    point_keys = point_cell_x * CELL_KEY_MULTIPLIER + point_cell_y
+    order = np.argsort(point_keys, kind="stable")
+    sorted_keys = point_keys[order]
+
+    query_cell_x, query_cell_y = get_cell_keys(query_x, query_y, cell_size)
+    # Which half of its cell each query is in decides which neighbouring cells are checked
+    # A query in the left half of a cell checks the cell to the left, otherwise the cell to the right
+    half_x, half_y = get_cell_keys(query_x, query_y, reach)
+    step_x = 2 * (half_x - 2 * query_cell_x + CELL_KEY_OFFSET) - 1
+    step_y = 2 * (half_y - 2 * query_cell_y + CELL_KEY_OFFSET) - 1
+    query_numbers = np.arange(len(query_x))
+    reach_squared = reach * reach
+
+    queries = []
+    points = []
+    for offset_x in (0, step_x):
+        for offset_y in (0, step_y):
+            # Find where the points in the neighbouring cell start and end in the sorted points
+            neighbour = (query_cell_x + offset_x) * CELL_KEY_MULTIPLIER + query_cell_y + offset_y
+            start = np.searchsorted(sorted_keys, neighbour, "left")
+            lengths = np.searchsorted(sorted_keys, neighbour, "right") - start
+            total = int(lengths.sum())
+            if total == 0:
+                continue
+
+            # Make a pair of every query and every point in its neighbouring cell
+            query = np.repeat(query_numbers, lengths)
+            position = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            point = order[start[query] + position]
+
+            diff_x = query_x[query] - point_x[point]
+            diff_y = query_y[query] - point_y[point]
+            close = diff_x * diff_x + diff_y * diff_y <= reach_squared
+            queries.append(query[close])
+            points.append(point[close])
+
+    if not queries:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(queries), np.concatenate(points)
+
+
+def is_near(query_x, query_y, point_x, point_y, reach, same_points=False):
+    # For each query point, return whether any point is within reach of it
+    # If same_points is True then the query points are the points, and a point doesn't count itself
+    near = np.zeros(len(query_x), dtype=np.bool_)
+    query, point = find_close_pairs(query_x, query_y, point_x, point_y, reach)
+    if same_points:
+        query = query[query != point]
+    near[query] = True
+    return near
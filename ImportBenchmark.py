@@ -0,0 +1,104 @@
+"""Importing key libraries"""
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+
+"""Defining Constants"""
+# Import Benchmark Constants
+# Each module is imported in a new interpreter this many times, after one import that isn't timed
+IMPORT_REPEATS = 10
+# The modules that are timed, the most milliseconds their import can take
+# and the modules importing them must not import, so tools that only simulate never load a window or scipy
+HEAVY_MODULES = ("numpy", "scipy", "arcade", "pyglet")
+IMPORT_CHECKS = {
+    "Rules": (25, ("numpy", "scipy", "arcade", "pyglet")),
+    "Simulation": (400, ("scipy", "arcade", "pyglet")),
+    "Replay": (400, ("scipy", "arcade", "pyglet")),
+    "StateSync": (400, ("scipy", "arcade", "pyglet")),
+    "Tournament": (400, ("scipy", "arcade", "pyglet")),
+    "MatchServer": (400, ("scipy", "arcade", "pyglet")),
+    "ScenarioFile": (400, ("scipy", "arcade", "pyglet")),
+}
+# The code run in the new interpreter, it prints the import time and which heavy modules were imported
+IMPORT_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+milliseconds = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": milliseconds, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def time_import(module):
+    # Import the module in a new interpreter and return the milliseconds it took and the heavy modules it imported
+    directory = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, "-c", IMPORT_CODE.format(module=module, heavy=HEAVY_MODULES)],
+                            cwd=directory, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    return result["ms"], result["heavy"]
+
+
+def measure_import(module, repeats, budget_ms, forbidden):
+    # Return the import times of a module and whether it is within its budget and imports nothing forbidden
+    time_import(module)
+    times = []
+    heavy = []
+    for _ in range(repeats):
+        milliseconds, heavy = time_import(module)
+        times.append(milliseconds)
+    times = np.array(times)
+    forbidden_imported = [name for name in heavy if name in forbidden]
+    # The median is compared against the budget so one slow start doesn't fail it
+    median = float(np.median(times))
+    return {
+        "median_ms": median,
+        "min_ms": float(times.min()),
+        "max_ms": float(times.max()),
+        "budget_ms": budget_ms,
+        "heavy_modules": heavy,
+        "forbidden_modules": forbidden_imported,
+        "passed": median <= budget_ms and not forbidden_imported,
+    }
+
+
+def check_imports(modules, repeats=IMPORT_REPEATS):
+    # Time importing each module, printing a line for each, and return the results of every module
+    # Every module is compiled first, so no import is timed compiling it where bytecode isn't written
+    compileall.compile_dir(os.path.dirname(os.path.abspath(__file__)), maxlevels=0, quiet=1)
+    results = {}
+    for module in modules:
+        budget_ms, forbidden = IMPORT_CHECKS[module]
+        result = results[module] = measure_import(module, repeats, budget_ms, forbidden)
+        print("{:12} {:8.1f} ms  budget {:5} ms  imports {:22} {}".format(
+            module, result["median_ms"], budget_ms, ", ".join(result["heavy_modules"]) or "nothing heavy",
+            "ok" if result["passed"] else "FAILED"), flush=True)
+    return results
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time importing the modules that run without a window")
+    parser.add_argument("modules", nargs="*", help="modules to time, all of them if none are given")
+    parser.add_argument("--repeats", type=int, default=IMPORT_REPEATS)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    results = check_imports(arguments.modules or list(IMPORT_CHECKS), arguments.repeats)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    # Exits with 1 if any module is over its budget or imports something it shouldn't, so it can be run in CI
+    return 0 if all(result["passed"] for result in results.values()) else 1
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
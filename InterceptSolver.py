@@ -0,0 +1,52 @@
+"""Importing key libraries"""
+import numpy as np
+
+
+def solve_intercepts(x, y, target_x, target_y, target_change_x, target_change_y, projectile_speed):
+    # For each shooter, find when a projectile fired now meets a target moving in a straight line
+    # x and y are the shooters, the targets move target_change_x and target_change_y every tick
+    # and the projectile moves projectile_speed every tick
+    # Return the time in ticks, the point where they meet and whether the target can be reached at all
+    #
+    # The projectile meets the target at time t when the target's position is projectile_speed * t away
+    # |d + v t| = s t, where d is the target's position from the shooter and v is its velocity
+    # Squaring both sides gives a quadratic in t: (v.v - s^2) t^2 + 2 (d.v) t + d.d = 0
+    # The smallest positive root is the earliest the projectile can meet the target
+    x_diff = target_x - x
+    y_diff = target_y - y
+    a = target_change_x * target_change_x + target_change_y * target_change_y - projectile_speed * projectile_speed
+    b = 2 * (x_diff * target_change_x + y_diff * target_change_y)
+    c = x_diff * x_diff + y_diff * y_diff
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discriminant = b * b - 4 * a * c
+        root = np.sqrt(np.maximum(discriminant, 0))
+        # The two roots of the quadratic, the order depends on the sign of a
+        first = (-b - root) / (2 * a)
+        second = (-b + root) / (2 * a)
+        # If the target is as fast as the projectile then a is 0 and the equation is linear, b t + c = 0
+        linear = -c / b
+
+    first = np.where(first > 0, first, np.inf)
+    second = np.where(second > 0, second, np.inf)
+    time = np.where(a == 0, np.where(linear > 0, linear, np.inf), np.minimum(first, second))
+    # A target faster than the projectile and moving away from it can't be caught
+    time = np.where((a != 0) & (discriminant < 0), np.inf, time)
+    # A target on top of the shooter is met straight away
+    time = np.where(c == 0, 0, time)
+
+    reachable = np.isfinite(time)
+    time = np.where(reachable, time, 0)
+    return time, target_x + target_change_x * time, target_y + target_change_y * time, reachable
+
+
+def aim_at_intercepts(x, y, target_x, target_y, target_change_x, target_change_y, projectile_speed,
+                      max_distance):
+    # Return the angle to fire each projectile at, how far it has to travel and whether it should be fired
+    # A projectile is only fired if it can reach the target within max_distance
+    time, intercept_x, intercept_y, reachable = solve_intercepts(
+        x, y, target_x, target_y, target_change_x, target_change_y, projectile_speed)
+    distance = projectile_speed * time
+    fire = reachable & (distance <= max_distance)
+    angle = np.degrees(np.arctan2(intercept_y - y, intercept_x - x))
+    return angle, distance, fire
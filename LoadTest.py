@@ -0,0 +1,227 @@
+"""Importing key libraries"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+from MatchServer import SERVER_HOST, SERVER_PORT, MATCH_SHIPS, STATE_INTERVAL, INPUT_KEYS, WEBSOCKET_TEXT, \
+    encode_websocket_frame, read_websocket_frame
+from Rules import TICK_RATE
+
+
+"""Defining Constants"""
+# Load Test Constants
+LOAD_TEST_CLIENTS = 200
+LOAD_TEST_SECONDS = 30
+# Every client presses or releases a random key about this often in seconds
+INPUT_INTERVAL = 0.25
+# Clients connect this often in seconds, so they don't all make a match in the same instant
+CONNECT_INTERVAL = 0.005
+# How long to wait for a server started by the load test to start listening
+SERVER_START_TIMEOUT = 10
+
+
+class LoadTestClient:
+    """A Stand In For A Player's Game, Connected To The Server"""
+    # It makes a match, presses and releases random keys like a player would and counts what it is sent
+    # When its match ends it makes another one
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, host, port, ships, websocket, rng):
+        self.host = host
+        self.port = port
+        self.ships = ships
+        self.websocket = websocket
+        self.rng = rng
+        self.reader = None
+        self.writer = None
+
+        # These attributes count what happened to the client
+        # The time a match was asked for and how long each one took to join
+        self.join_start = None
+        self.join_times = []
+        self.states = 0
+        self.matches_ended = 0
+        self.errors = []
+        self.first_state_time = None
+        self.last_state_time = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        if self.websocket:
+            key = base64.b64encode(os.urandom(16)).decode()
+            self.writer.write("GET / HTTP/1.1\r\nHost: {}:{}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                              "Sec-WebSocket-Key: {}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+                              .format(self.host, self.port, key).encode())
+            while await self.reader.readline() not in (b"\r\n", b""):
+                pass
+
+    def send(self, message):
+        text = json.dumps(message).encode()
+        if self.websocket:
+            self.writer.write(encode_websocket_frame(text, WEBSOCKET_TEXT, os.urandom(4)))
+        else:
+            self.writer.write(text + b"\n")
+
+    async def receive(self):
+        if self.websocket:
+            opcode, payload, _ = await read_websocket_frame(self.reader)
+            return json.loads(payload) if opcode == WEBSOCKET_TEXT else None
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    async def run(self, seconds):
+        # Play until the time is up, then disconnect
+        await self.connect()
+        reading = asyncio.create_task(self.read_messages())
+        end_time = time.perf_counter() + seconds
+        self.create_match()
+        try:
+            while time.perf_counter() < end_time and not reading.done():
+                await asyncio.sleep(self.rng.expovariate(1 / INPUT_INTERVAL))
+                self.send({"type": self.rng.choice(("press", "release")), "key": self.rng.choice(list(INPUT_KEYS))})
+        finally:
+            reading.cancel()
+            self.writer.close()
+
+    def create_match(self):
+        self.join_start = time.perf_counter()
+        self.send({"type": "create", "ships": self.ships})
+
+    async def read_messages(self):
+        while True:
+            message = await self.receive()
+            if message is None:
+                return
+            if message["type"] == "state":
+                self.states += 1
+                self.last_state_time = time.perf_counter()
+                if self.first_state_time is None:
+                    self.first_state_time = self.last_state_time
+            elif message["type"] == "joined":
+                self.join_times.append(time.perf_counter() - self.join_start)
+            elif message["type"] == "end":
+                self.matches_ended += 1
+                self.create_match()
+            elif message["type"] == "error":
+                self.errors.append(message["message"])
+
+    def get_state_rate(self):
+        # Return how many state messages a second the client got
+        if self.first_state_time is None or self.last_state_time == self.first_state_time:
+            return 0
+        return (self.states - 1) / (self.last_state_time - self.first_state_time)
+
+
+async def get_server_metrics(host, port):
+    # Ask the server for its metrics on a connection of its own
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"type": "metrics"}).encode() + b"\n")
+    metrics = json.loads(await reader.readline())
+    writer.close()
+    return metrics
+
+
+async def start_server(host, port):
+    # Start a MatchServer in another process and wait for it to listen
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "MatchServer.py"),
+        "--host", host, "--port", str(port), "--report-interval", "0")
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return process
+        except OSError:
+            if time.perf_counter() > deadline:
+                process.kill()
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run_load_test(arguments):
+    # Run every client at once and return a summary of what the clients and the server saw
+    server = await start_server(arguments.host, arguments.port) if arguments.start_server else None
+    try:
+        rng = random.Random(arguments.seed)
+        clients = [LoadTestClient(arguments.host, arguments.port, arguments.ships, arguments.websocket,
+                                  random.Random(rng.getrandbits(32))) for _ in range(arguments.clients)]
+        tasks = []
+        for client in clients:
+            tasks.append(asyncio.create_task(client.run(arguments.seconds)))
+            await asyncio.sleep(CONNECT_INTERVAL)
+
+        # The server's metrics are taken just before the clients leave, while every match is still going
+        await asyncio.sleep(max(arguments.seconds - CONNECT_INTERVAL * len(clients) - 1, 0))
+        metrics = await get_server_metrics(arguments.host, arguments.port)
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            await server.wait()
+    return summarise(clients, outcomes, metrics)
+
+
+def summarise(clients, outcomes, metrics):
+    join_times = np.array([join_time for client in clients for join_time in client.join_times]) * 1000
+    # Clients the server was too busy for never get a state message, so they aren't counted
+    state_rates = np.array([client.get_state_rate() for client in clients if client.states > 1])
+    match_metrics = list(metrics["match_metrics"].values())
+    latencies = np.array([match["tick_latency"]["p99_ms"] for match in match_metrics if "tick_latency" in match])
+    errors = {}
+    for client in clients:
+        for error in client.errors:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "clients": len(clients),
+        "failed_clients": sum(isinstance(outcome, Exception) for outcome in outcomes),
+        "errors": errors,
+        "matches_ended": sum(client.matches_ended for client in clients),
+        "mean_join_ms": float(join_times.mean()) if len(join_times) else None,
+        # A client keeping up gets a state message every STATE_INTERVAL ticks
+        "expected_state_rate": TICK_RATE / STATE_INTERVAL,
+        "playing_clients": len(state_rates),
+        "mean_state_rate": float(state_rates.mean()) if len(state_rates) else 0,
+        "server_matches": metrics["matches"],
+        "server_load": metrics["load"],
+        "server_overloaded": metrics["overloaded"],
+        "refused_matches": metrics["refused_matches"],
+        "dropped_ticks": sum(match["dropped_ticks"] for match in match_metrics),
+        "median_match_p99_tick_latency_ms": float(np.median(latencies)) if len(latencies) else None,
+        "worst_match_p99_tick_latency_ms": float(latencies.max()) if len(latencies) else None,
+    }
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Load test a MatchServer with many simulated clients")
+    parser.add_argument("--clients", type=int, default=LOAD_TEST_CLIENTS)
+    parser.add_argument("--seconds", type=float, default=LOAD_TEST_SECONDS)
+    parser.add_argument("--ships", type=int, default=MATCH_SHIPS, help="AI ships in each client's match")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--websocket", action="store_true", help="connect over WebSocket instead of plain TCP")
+    parser.add_argument("--start-server", action="store_true", help="start a MatchServer in another process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the summary to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    summary = asyncio.run(run_load_test(arguments))
+    print(json.dumps(summary, indent=2))
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(summary, file, indent=2)
+    return 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
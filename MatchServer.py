@@ -0,0 +1,549 @@
+"""Importing key libraries"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import sys
+import time
+import traceback
+from Profiler import Profiler
+from Rules import KEY_NAMES, TICK_RATE
+from Simulation import Simulation
+
+
+"""Defining Constants"""
+# Server Constants
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+MAX_MATCHES = 1000
+# The server prints a line about how it is doing this often in seconds, 0 turns it off
+REPORT_INTERVAL = 5
+
+# Match Constants
+MATCH_WIDTH = 1920
+MATCH_HEIGHT = 1080
+MATCH_SHIPS = 3
+MAX_MATCH_SHIPS = 50
+# A state message is sent to the clients of a match every this many ticks
+STATE_INTERVAL = 6
+# The number of recent tick latencies each match keeps to work out its percentiles from
+METRICS_WINDOW = 600
+
+# Overload Constants
+# A match this many ticks behind drops the ticks it is behind by instead of trying to catch up
+# So it plays slower for a moment rather than every match falling further and further behind
+MAX_TICK_LAG = 5
+# The fraction of the time the server spends ticking is measured over this many seconds
+LOAD_WINDOW = 1
+# When the server spends more than this fraction of the time ticking, or dropped a tick, it is overloaded
+# An overloaded server refuses to start new matches until it has caught up
+OVERLOAD_LOAD = 0.9
+# A new match is refused if the ticks of one more match would take the load over this
+# It is lower than OVERLOAD_LOAD as sending and receiving messages takes time too
+ADMISSION_LOAD = 0.7
+# How much each tick moves the average tick duration towards its own duration
+TICK_DURATION_SMOOTHING = 0.01
+# Messages a client can do without, like state messages, aren't sent while this many bytes wait to be sent to it
+MAX_WRITE_BUFFER = 64 * 1024
+
+# WebSocket Constants
+# Clients that start by sending an HTTP GET are WebSocket clients, the others send a JSON message on each line
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_CONTINUATION = 0x0
+WEBSOCKET_TEXT = 0x1
+WEBSOCKET_CLOSE = 0x8
+WEBSOCKET_PING = 0x9
+WEBSOCKET_PONG = 0xA
+MAX_MESSAGE_SIZE = 64 * 1024
+# The codes a WebSocket is closed with when a client sends frames out of order or that aren't text
+WEBSOCKET_PROTOCOL_ERROR = 1002
+WEBSOCKET_UNSUPPORTED_DATA = 1003
+
+# Message Constants
+# What receive returns for a message that isn't JSON, the client is told and can carry on
+BAD_MESSAGE = object()
+
+# Input Constants
+# The keys a client can press and release, the same keys the GameView handles
+# A key's name is the name of its key flag without "_pressed", so "up" is up_pressed
+INPUT_KEYS = {name[:-len("_pressed")]: name for name in KEY_NAMES}
+
+
+def get_websocket_accept(key):
+    # Return the Sec-WebSocket-Accept header that answers a client's Sec-WebSocket-Key
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+
+
+def apply_websocket_mask(payload, mask):
+    # Clients mask every byte of a frame with a 4 byte key, masking it again unmasks it
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+def encode_websocket_frame(payload, opcode=WEBSOCKET_TEXT, mask=None):
+    # Return a whole WebSocket frame holding the payload
+    # Frames from a server aren't masked, frames from a client have to be
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask is not None else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask is not None:
+        header += mask
+        payload = apply_websocket_mask(payload, mask)
+    return bytes(header) + payload
+
+
+def decode_message(data):
+    # Return the message in a line or frame from a client, or BAD_MESSAGE if it isn't JSON
+    try:
+        return json.loads(data)
+    except ValueError:
+        return BAD_MESSAGE
+
+
+def is_integer(value):
+    # Return whether a value from a message is a whole number, JSON true and false are bools and don't count
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+async def read_websocket_frame(reader):
+    # Read one WebSocket frame and return its opcode, unmasked payload and whether it is the last frame of a message
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError("WebSocket frame is too big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = apply_websocket_mask(payload, mask)
+    return first & 0x0F, payload, bool(first & 0x80)
+
+
+class Connection:
+    """One Client Sending And Receiving A JSON Message On Each Line"""
+    # The server only ever talks to clients through receive and send
+    # So a WebSocket client is handled the same as a TCP one
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        # The Match the client is in and whether it controls the player's ship or only watches
+        self.match = None
+        self.is_player = False
+        # The number of messages not sent because the client wasn't keeping up
+        self.dropped_messages = 0
+
+    async def receive(self):
+        # Return the next message from the client, or None if it has disconnected
+        line = await self.reader.readline()
+        if not line:
+            return None
+        return decode_message(line)
+
+    def encode(self, text):
+        return text.encode() + b"\n"
+
+    def send(self, message, droppable=False):
+        # Send a message to the client without waiting for it to be sent
+        # A droppable message is dropped if the client has too much waiting to be sent to it already
+        if self.writer.is_closing():
+            return
+        if droppable and self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.dropped_messages += 1
+            return
+        self.writer.write(self.encode(json.dumps(message)))
+
+
+class WebSocketConnection(Connection):
+    """One Client Sending And Receiving A JSON Message In Each WebSocket Text Frame"""
+
+    async def receive(self):
+        # A message split over several frames is put back together
+        # Ping and close frames can come between the frames of a message
+        fragments = None
+        while True:
+            opcode, payload, is_final = await read_websocket_frame(self.reader)
+            if opcode == WEBSOCKET_TEXT and fragments is None:
+                if is_final:
+                    return decode_message(payload)
+                fragments = [payload]
+            elif opcode == WEBSOCKET_CONTINUATION and fragments is not None:
+                fragments.append(payload)
+                if sum(len(fragment) for fragment in fragments) > MAX_MESSAGE_SIZE:
+                    raise ValueError("WebSocket message is too big")
+                if is_final:
+                    return decode_message(b"".join(fragments))
+            elif opcode == WEBSOCKET_CLOSE:
+                return None
+            elif opcode == WEBSOCKET_PING:
+                self.writer.write(encode_websocket_frame(payload, WEBSOCKET_PONG))
+            elif opcode in (WEBSOCKET_TEXT, WEBSOCKET_CONTINUATION):
+                # A new message started before the last one finished, or a continuation of nothing
+                self.close(WEBSOCKET_PROTOCOL_ERROR)
+                return None
+            elif opcode != WEBSOCKET_PONG:
+                # Only text messages are understood
+                self.close(WEBSOCKET_UNSUPPORTED_DATA)
+                return None
+
+    def close(self, code):
+        # Tell the client why the WebSocket is being closed, the connection is closed when receive returns
+        self.writer.write(encode_websocket_frame(struct.pack("!H", code), WEBSOCKET_CLOSE))
+
+    def encode(self, text):
+        return encode_websocket_frame(text.encode())
+
+
+class Match:
+    """One Game Hosted By The Server"""
+    # A match steps its own Simulation on its own fixed tick, whenever the server gets to it
+    # The first client controls the player's ship, any others only watch
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, identifier, simulation, start_time):
+        self.identifier = identifier
+        self.simulation = simulation
+        self.connections = []
+        # The time the next tick is due at, from time.perf_counter
+        self.next_tick_time = start_time + simulation.tick_time
+        # The ticks dropped because the match fell too far behind
+        self.dropped_ticks = 0
+        # The latency of a tick is from when it was due to when it was done
+        # The duration of a tick is how long the Simulation took to update
+        self.metrics = Profiler(METRICS_WINDOW, max_trace_length=0)
+
+    def step(self):
+        # Do the tick that is due and return how long it took in nanoseconds
+        simulation = self.simulation
+        start = time.perf_counter_ns()
+        lag = start / 1e9 - self.next_tick_time
+        if lag > MAX_TICK_LAG * simulation.tick_time:
+            # Too far behind to catch up, so the ticks it is behind by are dropped
+            dropped = int(lag / simulation.tick_time)
+            self.dropped_ticks += dropped
+            self.next_tick_time += dropped * simulation.tick_time
+
+        simulation.on_update(simulation.tick_time)
+        end = time.perf_counter_ns()
+        self.metrics.add("tick_latency", start, end - int(self.next_tick_time * 1e9))
+        self.metrics.add("tick_duration", start, end - start)
+        self.next_tick_time += simulation.tick_time
+
+        if simulation.tick % STATE_INTERVAL == 0 or simulation.result is not None:
+            self.broadcast(self.get_state_message(), droppable=simulation.result is None)
+        return end - start
+
+    def get_state_message(self):
+        # Return a short summary of the game for the clients
+        simulation = self.simulation
+        player = simulation.player_sprite
+        return {
+            "type": "state",
+            "match": self.identifier,
+            "tick": simulation.tick,
+            "result": simulation.result,
+            "ships": len(simulation.ship_list),
+            "torpedoes": simulation.torpedoes.count,
+            "player": None if player is None else [player.center_x, player.center_y, player.angle, player.hp],
+        }
+
+    def broadcast(self, message, droppable=False):
+        for connection in self.connections:
+            connection.send(message, droppable)
+
+    def get_metrics(self):
+        metrics = {
+            "tick": self.simulation.tick,
+            "result": self.simulation.result,
+            "clients": len(self.connections),
+            "dropped_ticks": self.dropped_ticks,
+        }
+        metrics.update(self.metrics.get_summary())
+        return metrics
+
+
+class MatchServer:
+    """Hosts Many Matches At Once For Clients On This Computer"""
+    # Every match is ticked by one task, so no match is ever updated by two things at once
+    # Each time round, the matches with a tick due are ticked once each, the most overdue first
+    # So a slow match can't starve the others, and every client's messages are read in between ticks
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, max_matches=MAX_MATCHES, width=MATCH_WIDTH, height=MATCH_HEIGHT, tick_rate=TICK_RATE):
+        self.max_matches = max_matches
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.matches = {}
+        self.next_match_identifier = 1
+        self.connections = set()
+        # Set when a match is made so the tick task wakes up if it was waiting for one
+        self.match_added = asyncio.Event()
+
+        # These attributes track how busy the server is
+        # load is the fraction of the last LOAD_WINDOW spent ticking
+        self.load = 0
+        self.overloaded = False
+        self.ticks = 0
+        self.refused_matches = 0
+        self.busy_time = 0
+        self.dropped_ticks_seen = 0
+        self.window_start = time.perf_counter()
+        # A moving average of how long a tick takes in nanoseconds, used to guess the load of one more match
+        self.tick_duration = 0
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT, report_interval=REPORT_INTERVAL):
+        # Run the server until it is cancelled
+        # If the tick task ever stops with an error, the error is raised here and the server shuts down
+        # Rather than carrying on with every client connected to matches that never tick
+        server = await asyncio.start_server(self.handle_client, host, port)
+        tick_task = asyncio.create_task(self.run_ticks())
+        print("Serving matches on {}:{}".format(host, port), file=sys.stderr, flush=True)
+        try:
+            async with server:
+                while True:
+                    await asyncio.wait({tick_task}, timeout=report_interval or 3600)
+                    if tick_task.done():
+                        tick_task.result()
+                    if report_interval:
+                        print(self.get_report(), file=sys.stderr, flush=True)
+        finally:
+            tick_task.cancel()
+
+    async def run_ticks(self):
+        # Tick every match that has a tick due, forever
+        while True:
+            now = time.perf_counter()
+            if not self.matches:
+                self.match_added.clear()
+                await self.match_added.wait()
+                continue
+
+            due = [match for match in self.matches.values() if match.next_tick_time <= now]
+            if not due:
+                await asyncio.sleep(min(match.next_tick_time for match in self.matches.values()) - now)
+                self.update_load()
+                continue
+
+            due.sort(key=lambda match: match.next_tick_time)
+            for match in due:
+                if match.identifier not in self.matches:
+                    continue
+                try:
+                    duration = match.step()
+                except Exception:
+                    # A match that breaks is ended on its own, so the other matches keep ticking
+                    print("Match {} stopped with an error".format(match.identifier), file=sys.stderr, flush=True)
+                    traceback.print_exc()
+                    self.end_match(match, error="The match stopped with an error")
+                    continue
+                self.busy_time += duration
+                self.tick_duration += (duration - self.tick_duration) * TICK_DURATION_SMOOTHING
+                self.ticks += 1
+                if match.simulation.result is not None:
+                    self.end_match(match)
+                # Let the clients' messages be read between ticks
+                await asyncio.sleep(0)
+            self.update_load()
+
+    def update_load(self):
+        # Work out the load at the end of every LOAD_WINDOW
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed < LOAD_WINDOW:
+            return
+        dropped_ticks = sum(match.dropped_ticks for match in self.matches.values())
+        self.load = self.busy_time / 1e9 / elapsed
+        self.overloaded = self.load > OVERLOAD_LOAD or dropped_ticks > self.dropped_ticks_seen
+        self.dropped_ticks_seen = dropped_ticks
+        self.busy_time = 0
+        self.window_start = now
+
+    async def handle_client(self, reader, writer):
+        # This is called by asyncio for every client that connects
+        connection = None
+        try:
+            connection, message = await self.accept(reader, writer)
+            self.connections.add(connection)
+            while True:
+                if message is not None:
+                    self.handle_message(connection, message)
+                message = await connection.receive()
+                if message is None:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            if connection is not None:
+                self.leave_match(connection)
+                self.connections.discard(connection)
+            writer.close()
+
+    async def accept(self, reader, writer):
+        # Return a Connection for a new client and its first message, if it has sent one
+        # The WebSocket handshake is done first if it is a WebSocket client
+        first_line = await reader.readline()
+        if not first_line.startswith(b"GET "):
+            return Connection(reader, writer), decode_message(first_line) if first_line.strip() else None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "sec-websocket-key" not in headers:
+            raise ValueError("Not a WebSocket handshake")
+        writer.write("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     "Sec-WebSocket-Accept: {}\r\n\r\n".format(get_websocket_accept(headers["sec-websocket-key"]))
+                     .encode())
+        return WebSocketConnection(reader, writer), None
+
+    def handle_message(self, connection, message):
+        # Do what a message from a client asks
+        # Messages are dictionaries with a type, a client that sends a bad one is told and can carry on
+        if message is BAD_MESSAGE:
+            connection.send({"type": "error", "message": "Messages have to be JSON"})
+            return
+        message_type = message.get("type") if isinstance(message, dict) else None
+        if message_type in ("press", "release"):
+            # The same keys the GameView handles, only the client playing the match can press them
+            key = message.get("key")
+            name = INPUT_KEYS.get(key) if isinstance(key, str) else None
+            if name is None:
+                connection.send({"type": "error", "message": "Unknown key"})
+            elif connection.is_player:
+                setattr(connection.match.simulation, name, message_type == "press")
+        elif message_type == "create":
+            self.create_match(connection, message.get("ships", MATCH_SHIPS))
+        elif message_type == "join":
+            identifier = message.get("match")
+            match = self.matches.get(identifier) if is_integer(identifier) else None
+            if match is None:
+                connection.send({"type": "error", "message": "No such match"})
+            else:
+                self.join_match(connection, match, is_player=False)
+        elif message_type == "leave":
+            self.leave_match(connection)
+        elif message_type == "metrics":
+            connection.send({"type": "metrics", **self.get_metrics()})
+        else:
+            connection.send({"type": "error", "message": "Unknown message"})
+
+    def create_match(self, connection, ships):
+        # Start a new match with the client playing it, unless the server is full or overloaded
+        if not is_integer(ships):
+            connection.send({"type": "error", "message": "ships has to be a whole number"})
+            return
+        expected_load = (len(self.matches) + 1) * self.tick_rate * self.tick_duration / 1e9
+        if len(self.matches) >= self.max_matches or self.overloaded or expected_load > ADMISSION_LOAD:
+            self.refused_matches += 1
+            connection.send({"type": "error", "message": "Server is busy"})
+            return
+
+        simulation = Simulation(self.width, self.height, min(max(ships, 1), MAX_MATCH_SHIPS), self.tick_rate)
+        match = Match(self.next_match_identifier, simulation, time.perf_counter())
+        self.next_match_identifier += 1
+        self.matches[match.identifier] = match
+        self.match_added.set()
+        self.join_match(connection, match, is_player=True)
+
+    def join_match(self, connection, match, is_player):
+        self.leave_match(connection)
+        connection.match = match
+        connection.is_player = is_player
+        match.connections.append(connection)
+        connection.send({"type": "joined", "match": match.identifier, "player": is_player,
+                         "width": match.simulation.width, "height": match.simulation.height,
+                         "tick_rate": self.tick_rate})
+
+    def leave_match(self, connection):
+        # A match nobody is in is ended, as nobody would see it
+        match = connection.match
+        if match is None:
+            return
+        match.connections.remove(connection)
+        connection.match = None
+        connection.is_player = False
+        if not match.connections:
+            self.matches.pop(match.identifier, None)
+
+    def end_match(self, match, error=None):
+        # The last state message told the clients the result, so they are taken out of the match
+        # A match that stopped with an error tells its clients the error instead
+        if error is not None:
+            match.broadcast({"type": "error", "match": match.identifier, "message": error})
+        match.broadcast({"type": "end", "match": match.identifier, "result": match.simulation.result,
+                         "winner": match.simulation.winner})
+        for connection in list(match.connections):
+            self.leave_match(connection)
+        self.matches.pop(match.identifier, None)
+
+    def get_metrics(self):
+        return {
+            "matches": len(self.matches),
+            "clients": len(self.connections),
+            "ticks": self.ticks,
+            "load": self.load,
+            "mean_tick_ms": self.tick_duration / 1e6,
+            "overloaded": self.overloaded,
+            "refused_matches": self.refused_matches,
+            "dropped_messages": sum(connection.dropped_messages for connection in self.connections),
+            "match_metrics": {identifier: match.get_metrics() for identifier, match in self.matches.items()},
+        }
+
+    def get_report(self):
+        # Return a line saying how busy the server is and how late the worst match's ticks are
+        worst = max((match.metrics.get_summary().get("tick_latency", {}).get("p99_ms", 0)
+                     for match in self.matches.values()), default=0)
+        return "{} matches  {} clients  load {:.0%}  worst p99 tick latency {:.2f} ms  dropped ticks {}{}".format(
+            len(self.matches), len(self.connections), self.load, worst,
+            sum(match.dropped_ticks for match in self.matches.values()), "  OVERLOADED" if self.overloaded else "")
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Host many headless matches for clients on this computer")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-matches", type=int, default=MAX_MATCHES)
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL,
+                        help="seconds between lines about how the server is doing, 0 for none")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    async def run():
+        server = MatchServer(arguments.max_matches)
+        await server.serve(arguments.host, arguments.port, arguments.report_interval)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
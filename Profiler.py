@@ -0,0 +1,117 @@
+"""Importing key libraries"""
+import csv
+import json
+import time
+import numpy as np
+
+
+"""Defining Constants"""
+# Profiler Constants
+# The number of most recent times of each phase the percentiles are worked out from
+PROFILE_WINDOW = 600
+# The most times the trace keeps, after this the percentiles still update but the trace doesn't grow
+MAX_TRACE_LENGTH = 10 ** 6
+PERCENTILES = (50, 95, 99)
+# The histograms have bins from 1 microsecond to 1 second, with 4 bins for every power of 10
+HISTOGRAM_BIN_EDGES = np.logspace(3, 9, 25)
+
+
+class PhaseTimes:
+    """The Most Recent Times Of One Phase"""
+    # The times are kept in a ring buffer, so when it is full the oldest time is replaced
+    __slots__ = ("times", "next_slot", "count", "calls", "total")
+
+    def __init__(self, window):
+        self.times = np.zeros(window, dtype=np.int64)
+        self.next_slot = 0
+        self.count = 0
+        # Every time ever added is counted in these, not just the ones still in the ring buffer
+        self.calls = 0
+        self.total = 0
+
+    def add(self, duration):
+        self.times[self.next_slot] = duration
+        self.next_slot = (self.next_slot + 1) % len(self.times)
+        if self.count < len(self.times):
+            self.count += 1
+        self.calls += 1
+        self.total += duration
+
+    def get_recent(self):
+        # Return the times in the ring buffer, in no particular order
+        return self.times[:self.count]
+
+
+class Profiler:
+    """Times The Phases Of Each Update And Frame"""
+    # Each phase is timed with perf_counter_ns and the time is added to that phase's PhaseTimes
+    # Every time is also added to a trace that can be written to a CSV or JSON file
+    # Code that uses the profiler checks enabled once and only times its phases if it is True
+    # So when it is disabled it costs one attribute check per update
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, window=PROFILE_WINDOW, max_trace_length=MAX_TRACE_LENGTH):
+        self.enabled = False
+        self.window = window
+        self.max_trace_length = max_trace_length
+        # A dictionary of the PhaseTimes of each phase, in the order they were first timed
+        self.phases = {}
+        # A list of (start, phase name, duration), start is in nanoseconds since the profiler was made
+        self.trace = []
+        self.start_time = time.perf_counter_ns()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def reset(self):
+        self.phases = {}
+        self.trace = []
+        self.start_time = time.perf_counter_ns()
+
+    def add(self, name, start, duration):
+        # Add the time a phase took
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = PhaseTimes(self.window)
+        phase.add(duration)
+        if len(self.trace) < self.max_trace_length:
+            self.trace.append((start - self.start_time, name, duration))
+
+    def time_phase(self, name, function, *args):
+        # Call the function with the args and add how long it took as the time of the phase
+        start = time.perf_counter_ns()
+        result = function(*args)
+        self.add(name, start, time.perf_counter_ns() - start)
+        return result
+
+    def get_summary(self):
+        # Return the number of calls, mean and percentiles of every phase in milliseconds
+        # The mean is of every call, the percentiles only of the most recent ones
+        summary = {}
+        for name, phase in self.phases.items():
+            values = np.percentile(phase.get_recent(), PERCENTILES) / 1e6
+            summary[name] = {"calls": phase.calls, "mean_ms": phase.total / phase.calls / 1e6}
+            for percentile, value in zip(PERCENTILES, values.tolist()):
+                summary[name]["p{}_ms".format(percentile)] = value
+        return summary
+
+    def get_histograms(self):
+        # Return how many of the most recent times of each phase are in each bin of HISTOGRAM_BIN_EDGES
+        return {name: np.histogram(phase.get_recent(), HISTOGRAM_BIN_EDGES)[0].tolist()
+                for name, phase in self.phases.items()}
+
+    def dump(self, file_name):
+        # Write the trace to a file, a CSV file if the name ends in .csv and a JSON file otherwise
+        # The JSON file also has the summary and histograms
+        if file_name.endswith(".csv"):
+            with open(file_name, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(("start_ns", "phase", "duration_ns"))
+                writer.writerows(self.trace)
+        else:
+            with open(file_name, "w") as file:
+                json.dump({"summary": self.get_summary(),
+                           "histogram_bin_edges_ns": HISTOGRAM_BIN_EDGES.tolist(),
+                           "histograms": self.get_histograms(),
+                           "trace": self.trace}, file)
@@ -0,0 +1,137 @@
+"""Importing key libraries"""
+import argparse
+import json
+import random
+import sys
+import time
+import arcade
+import numpy as np
+from Simulation import Simulation
+from Benchmark import UNKILLABLE_HP
+from Window import GameView, HP_BAR_WIDTH, HP_BAR_HEIGHT, HP_BAR_COLOR, HP_BAR_LOST_COLOR
+
+
+"""Defining Constants"""
+# Render Benchmark Constants
+RENDER_WIDTH = 1920
+RENDER_HEIGHT = 1080
+RENDER_SHIPS = 1000
+RENDER_FRAMES = 600
+# Drawing with and without culling is timed on an arena this many times the size of the window
+# with this many ships spread all over it
+CULLING_WORLD_SCALE = 20
+CULLING_SHIPS = 5000
+# The first frames build the sprite buffers and texture atlases, so they aren't timed
+WARMUP_FRAMES = 30
+# The phases of on_draw and on_update timed by the Simulation's profiler
+DRAW_PHASES = ("draw_aim", "draw_weapons", "draw_health_bars", "draw_ships", "sync_sprites")
+
+
+def draw_immediate_health_bars(view):
+    # Draw every health bar with two immediate mode rectangles, as the game did before HealthBars
+    # It is only here so the batched health bars can be compared against it
+    for ship, sprite in view.ship_sprites.items():
+        fill = HP_BAR_WIDTH * max(ship.hp, 0) / ship.max_hp
+        left = int(sprite.center_x - HP_BAR_WIDTH // 2)
+        middle = int(left + fill)
+        bottom = sprite.center_y + ship.width / 2
+        top = bottom + HP_BAR_HEIGHT
+        arcade.draw_lrtb_rectangle_filled(middle, left + HP_BAR_WIDTH, top, bottom, HP_BAR_LOST_COLOR)
+        arcade.draw_lrtb_rectangle_filled(left, middle, top, bottom, HP_BAR_COLOR)
+
+
+def measure_frames(window, ships, frames, immediate=False, world_scale=1, culling=True):
+    # Return the time each frame took in nanoseconds and the profile of the phases of drawing
+    # A frame is an update, a draw and the flip that waits for the GPU to finish it
+    # On an arena bigger than the window the AI ships are spread all over it, so most of them aren't shown
+    simulation = Simulation(window.width * world_scale, window.height * world_scale, ships)
+    for ship in simulation.ship_list:
+        ship.hp = ship.max_hp = UNKILLABLE_HP
+    if world_scale > 1:
+        rng = random.Random(0)
+        for ship in simulation.enemy_ship_list:
+            ship.center_x = rng.uniform(0, simulation.width)
+            ship.center_y = rng.uniform(0, simulation.height)
+        simulation.save_previous_state()
+    view = GameView(simulation)
+    view.culling = culling
+    view.on_resize(window.width, window.height)
+    if immediate:
+        view.health_bars.update = lambda ship_sprites: None
+        view.draw_health_bars = lambda: draw_immediate_health_bars(view)
+    window.show_view(view)
+
+    frame_times = []
+    for frame in range(WARMUP_FRAMES + frames):
+        if frame == WARMUP_FRAMES:
+            simulation.profiler.reset()
+            simulation.profiler.enabled = True
+            simulation.profiler.max_trace_length = 0
+        start = time.perf_counter_ns()
+        window.dispatch_events()
+        view.on_update(simulation.tick_time)
+        view.on_draw()
+        window.flip()
+        if frame >= WARMUP_FRAMES:
+            frame_times.append(time.perf_counter_ns() - start)
+
+    summary = simulation.profiler.get_summary()
+    return np.array(frame_times, dtype=np.float64), {name: summary[name] for name in DRAW_PHASES if name in summary}
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time drawing a game with many ships in a window")
+    parser.add_argument("--ships", type=int, default=RENDER_SHIPS)
+    parser.add_argument("--frames", type=int, default=RENDER_FRAMES)
+    parser.add_argument("--width", type=int, default=RENDER_WIDTH)
+    parser.add_argument("--height", type=int, default=RENDER_HEIGHT)
+    parser.add_argument("--world-scale", type=int, default=CULLING_WORLD_SCALE, help="arena size of the culling test")
+    parser.add_argument("--world-ships", type=int, default=CULLING_SHIPS, help="ships of the culling test")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    # Arcade turns vsync off, so every frame is drawn as fast as it can be
+    window = arcade.Window(arguments.width, arguments.height, "Render Benchmark")
+
+    # The health bars are drawn both ways in the same window so the times can be compared
+    results = {"ships": arguments.ships, "frames": arguments.frames, "health_bars": {}}
+    for name, immediate in (("immediate", True), ("batched", False)):
+        frame_times, phases = measure_frames(window, arguments.ships, arguments.frames, immediate)
+        frame_ms = frame_times / 1e6
+        results["health_bars"][name] = {
+            "mean_frame_ms": float(frame_ms.mean()),
+            "p95_frame_ms": float(np.percentile(frame_ms, 95)),
+            "phases": phases,
+        }
+        print("{:10} {:6} ships {:9.3f} ms/frame  p95 {:9.3f} ms  health bars {:9.3f} ms".format(
+            name, arguments.ships, frame_ms.mean(), np.percentile(frame_ms, 95),
+            phases["draw_health_bars"]["mean_ms"]), flush=True)
+
+    # Then a big arena is drawn with every ship given a sprite, and with only the ships the camera shows
+    results["culling"] = {"world_scale": arguments.world_scale, "ships": arguments.world_ships}
+    for name, culling in (("everything", False), ("culled", True)):
+        frame_times, phases = measure_frames(window, arguments.world_ships, arguments.frames,
+                                             world_scale=arguments.world_scale, culling=culling)
+        frame_ms = frame_times / 1e6
+        results["culling"][name] = {
+            "mean_frame_ms": float(frame_ms.mean()),
+            "p95_frame_ms": float(np.percentile(frame_ms, 95)),
+            "phases": phases,
+        }
+        print("{:10} {:6} ships {:9.3f} ms/frame  p95 {:9.3f} ms  sprites {:9.3f} ms".format(
+            name, arguments.world_ships, frame_ms.mean(), np.percentile(frame_ms, 95),
+            phases["sync_sprites"]["mean_ms"]), flush=True)
+    window.close()
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Importing key libraries"""
+import bisect
+import json
+import struct
+import zlib
+import numpy as np
+from Rules import KEY_NAMES
+from WorldFile import save_world, load_world
+
+
+"""Defining Constants"""
+# Replay File Constants
+REPLAY_MAGIC = b"NWREPLAY"
+# This goes up whenever the format changes or the Simulation plays differently, as old replays would play out wrong
+REPLAY_VERSION = 9
+# A full copy of the game is saved every so many ticks, so seeking never has to simulate more ticks than that
+# A seek costs about as much as the ticks it simulates, and a tick costs as much as KEYFRAME_TICK_SHIPS ships
+# would even with no ships, plus a bit for every ship
+# Keyframes are spaced so a seek simulates at most KEYFRAME_SHIP_TICKS of those, which takes about 30 milliseconds
+# That is every KEYFRAME_INTERVAL ticks in a normal game and more often with more ships,
+# but never less than MIN_KEYFRAME_INTERVAL ticks apart, as a keyframe of hundreds of ships is tens of kilobytes
+KEYFRAME_INTERVAL = 60
+MIN_KEYFRAME_INTERVAL = 5
+KEYFRAME_SHIP_TICKS = 900
+KEYFRAME_TICK_SHIPS = 10
+# Most of a keyframe is the same as the keyframe before it, so it is compressed with that one as the dictionary
+# and only what changed takes up much space, a normal game takes a few hundred bytes a keyframe
+# Every FULL_KEYFRAME_INTERVAL keyframes one is compressed on its own, so a seek decompresses at most that many
+FULL_KEYFRAME_INTERVAL = 30
+KEYFRAME_COMPRESSION = 6
+
+
+def get_keyframe_interval(ship_count):
+    # Return the number of ticks between keyframes of a game with this many ships
+    interval = KEYFRAME_SHIP_TICKS // (ship_count + KEYFRAME_TICK_SHIPS)
+    return min(max(interval, MIN_KEYFRAME_INTERVAL), KEYFRAME_INTERVAL)
+
+
+def compress_keyframe(world, previous_world=None):
+    # Compress a world blob from save_world, with the blob of the keyframe before it as the dictionary if it is given
+    if previous_world is None:
+        return zlib.compress(world, KEYFRAME_COMPRESSION)
+    compressor = zlib.compressobj(KEYFRAME_COMPRESSION, zdict=previous_world)
+    return compressor.compress(world) + compressor.flush()
+
+
+def decompress_keyframe(data, previous_world=None):
+    # Return the world blob of a keyframe, previous_world must be the dictionary it was compressed with
+    if previous_world is None:
+        return zlib.decompress(data)
+    decompressor = zlib.decompressobj(zdict=previous_world)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def get_input_mask(simulation):
+    # Return the key flags of the Simulation as a number with a bit for each key
+    mask = 0
+    for bit, name in enumerate(KEY_NAMES):
+        if getattr(simulation, name):
+            mask |= 1 << bit
+    return mask
+
+
+def set_input_mask(simulation, mask):
+    # Set the key flags of the Simulation from a number made by get_input_mask
+    for bit, name in enumerate(KEY_NAMES):
+        setattr(simulation, name, bool(mask & (1 << bit)))
+
+
+class Replay:
+    """The Keys Pressed Every Tick Of A Game And Copies Of The Game Every So Often"""
+    # The keys are stored as runs, a run is a mask of the keys pressed and how many ticks in a row it was pressed
+    # The copies of the game are keyframes, compressed world blobs from save_world
+    # A full keyframe is compressed on its own and the others are compressed against the keyframe before them
+    # A game can be played from any tick by loading the keyframe before it and simulating forward
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, start_tick, end_tick, masks, lengths, keyframes, result=None, winner=None):
+        # The ticks the recording started and stopped at
+        self.start_tick = start_tick
+        self.end_tick = end_tick
+        self.masks = list(masks)
+        self.lengths = list(lengths)
+        # A list of (tick, whether it is a full keyframe, compressed state), the first one is always full
+        self.keyframes = list(keyframes)
+        self.result = result
+        self.winner = winner
+
+        # The tick each run starts at and each keyframe is at, used to find them with a binary search
+        self.run_starts = []
+        tick = start_tick
+        for length in self.lengths:
+            self.run_starts.append(tick)
+            tick += length
+        self.keyframe_ticks = [tick for tick, _, _ in self.keyframes]
+        # The number and world blob of the last keyframe decompressed, the next seek often needs the one after it
+        self.decompressed = (None, None)
+
+    def get_input_mask(self, tick):
+        # Return the keys pressed at a tick, no keys are pressed outside of the recording
+        run = bisect.bisect_right(self.run_starts, tick) - 1
+        if run < 0 or tick >= self.end_tick:
+            return 0
+        return self.masks[run]
+
+    def get_keyframe_world(self, keyframe):
+        # Return the world blob of a keyframe
+        # Every keyframe back to the full one before it is decompressed in order, unless some already were
+        first = keyframe
+        while not self.keyframes[first][1]:
+            first -= 1
+        world = None
+        decompressed, decompressed_world = self.decompressed
+        if decompressed is not None and first <= decompressed <= keyframe:
+            first, world = decompressed + 1, decompressed_world
+        for number in range(first, keyframe + 1):
+            _, full, data = self.keyframes[number]
+            world = decompress_keyframe(data, None if full else world)
+        self.decompressed = (keyframe, world)
+        return world
+
+    def seek(self, tick, simulation=None):
+        # Return a Simulation at the tick, playing this replay
+        # It is made from the last keyframe at or before the tick and simulated forward from there
+        # If a Simulation of this replay is given and it is closer to the tick than the keyframe, it is used instead
+        tick = min(max(tick, self.start_tick), self.end_tick)
+        keyframe = max(bisect.bisect_right(self.keyframe_ticks, tick) - 1, 0)
+        if simulation is None or not self.keyframe_ticks[keyframe] <= simulation.tick <= tick:
+            simulation = load_world(self.get_keyframe_world(keyframe))
+            simulation.replay = ReplayPlayer(self)
+        while simulation.tick < tick and simulation.result is None:
+            simulation.on_update(simulation.tick_time)
+        return simulation
+
+    def to_bytes(self):
+        # The file is the magic bytes and version, a JSON header, the runs and then the keyframes
+        header = json.dumps({"start_tick": self.start_tick, "end_tick": self.end_tick,
+                             "result": self.result, "winner": self.winner}).encode()
+        # The runs repeat a lot so they are compressed too
+        runs = zlib.compress(np.array(self.masks, dtype="<u2").tobytes()
+                             + np.array(self.lengths, dtype="<u4").tobytes(), 9)
+        parts = [REPLAY_MAGIC, struct.pack("<HI", REPLAY_VERSION, len(header)), header,
+                 struct.pack("<II", len(self.masks), len(runs)), runs, struct.pack("<I", len(self.keyframes))]
+        for tick, full, keyframe in self.keyframes:
+            parts.append(struct.pack("<I?I", tick, full, len(keyframe)))
+            parts.append(keyframe)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+            raise ValueError("Not a replay file")
+        offset = len(REPLAY_MAGIC)
+        version, header_length = struct.unpack_from("<HI", data, offset)
+        if version != REPLAY_VERSION:
+            raise ValueError("Replay version {} is not supported".format(version))
+        offset += 6
+        header = json.loads(data[offset:offset + header_length])
+        offset += header_length
+
+        run_count, runs_length = struct.unpack_from("<II", data, offset)
+        offset += 8
+        runs = zlib.decompress(data[offset:offset + runs_length])
+        offset += runs_length
+        masks = np.frombuffer(runs, "<u2", run_count).tolist()
+        lengths = np.frombuffer(runs, "<u4", run_count, run_count * 2).tolist()
+
+        keyframe_count, = struct.unpack_from("<I", data, offset)
+        offset += 4
+        keyframes = []
+        for _ in range(keyframe_count):
+            tick, full, length = struct.unpack_from("<I?I", data, offset)
+            offset += 9
+            keyframes.append((tick, full, bytes(data[offset:offset + length])))
+            offset += length
+        return cls(header["start_tick"], header["end_tick"], masks, lengths, keyframes,
+                   header["result"], header["winner"])
+
+    def save(self, file_name):
+        with open(file_name, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayRecorder:
+    """Records The Keys Of Every Tick Of A Simulation"""
+    # It is set as the replay of the Simulation so the Simulation calls before_tick at the start of every tick
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, simulation, keyframe_interval=None):
+        # The ticks between keyframes, None works it out from the number of ships at each keyframe
+        self.keyframe_interval = keyframe_interval
+        self.start_tick = simulation.tick
+        self.masks = []
+        self.lengths = []
+        self.keyframes = []
+        # The world blob of the last keyframe, the next one is compressed against it
+        self.last_world = None
+        simulation.replay = self
+
+    def add_keyframe(self, simulation):
+        # Save a copy of the game as a keyframe
+        world = bytes(save_world(simulation))
+        full = len(self.keyframes) % FULL_KEYFRAME_INTERVAL == 0
+        self.keyframes.append((simulation.tick, full, compress_keyframe(world, None if full else self.last_world)))
+        self.last_world = world
+
+    def before_tick(self, simulation):
+        # Save a keyframe if it is time to, then add the keys of this tick to the runs
+        interval = self.keyframe_interval
+        if interval is None:
+            interval = get_keyframe_interval(len(simulation.ship_list))
+        if not self.keyframes or simulation.tick - self.keyframes[-1][0] >= interval:
+            self.add_keyframe(simulation)
+
+        mask = get_input_mask(simulation)
+        if self.masks and self.masks[-1] == mask:
+            self.lengths[-1] += 1
+        else:
+            self.masks.append(mask)
+            self.lengths.append(1)
+
+    def get_replay(self, simulation):
+        # Return a Replay of everything recorded so far
+        # If no ticks were recorded yet the replay is only the game as it is now
+        keyframes = self.keyframes
+        if not keyframes:
+            keyframes = [(simulation.tick, True, compress_keyframe(bytes(save_world(simulation))))]
+        return Replay(self.start_tick, simulation.tick, self.masks, self.lengths, keyframes,
+                      simulation.result, simulation.winner)
+
+
+class ReplayPlayer:
+    """Sets The Keys Of Every Tick Of A Simulation From A Replay"""
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, replay):
+        self.replay = replay
+
+    def before_tick(self, simulation):
+        set_input_mask(simulation, self.replay.get_input_mask(simulation.tick))
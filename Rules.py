@@ -0,0 +1,424 @@
+"""Importing key libraries"""
+# The rules of the game only need the standard library, so they import in a few milliseconds
+# without numpy, arcade or a window, the Simulation plays them out for whole fleets with numpy
+from Geometry import get_heading, rotate_point_by_heading, are_polygons_intersecting, get_hit_box_radius
+
+
+"""Defining Constants"""
+# Scaling Constants
+SCALING = 1
+WEAPON_SCALING = 2
+EXPLOSION_SCALING = 4
+
+# Ship Constants
+SHIP_HP = 1000
+MAX_SPEED = 1.5
+MIN_SPEED = 0
+ACCELERATION_RATE = 0.01
+ANGLE_SPEED = 1
+WEAPON_COOLDOWN_TIME = 5
+
+# Aiming Constants
+AIM_DISTANCE_SPEED = 5
+AIM_ANGLE_SPEED = 2
+MAX_AIM_DISTANCE = 350
+MIN_AIM_DISTANCE = 75
+
+# Time Step Constants
+# The game is always updated in ticks of the same length, however often it is drawn
+# Every speed and rate in the game is how much something changes in one tick
+# So changing TICK_RATE changes how fast the game plays, not what happens in it
+TICK_RATE = 60
+# If drawing falls behind, at most this many ticks are done before the next frame is drawn
+# The rest of the time is dropped so a slow frame can't make every frame after it slower
+MAX_TICKS_PER_FRAME = 5
+
+# Other Constants
+ENEMY_SHIP_NUMBER = 3
+AI_OUTER_DISTANCE = 100
+AI_INNER_DISTANCE = 125
+TORPEDO_SPEED = 4
+
+# Hit Box Constants
+# These are the sizes of the images and the hit boxes arcade calculates from them
+# They are stored here so the simulation never has to open the images
+SHIP_SIZE = (54, 21)
+SHIP_HIT_BOX = ((-27.0, -7.5), (-24.0, -10.5), (18.0, -10.5), (27.0, -1.5),
+                (27.0, 1.5), (18.0, 10.5), (-24.0, 10.5), (-27.0, 7.5))
+TORPEDO_SIZE = (17, 5)
+TORPEDO_HIT_BOX = ((-8.5, -2.5), (6.5, -2.5), (8.5, -0.5), (8.5, 0.5), (6.5, 2.5), (-8.5, 2.5))
+# How far the hit box of a ship reaches from its center, anything further away can't be touching it
+SHIP_HIT_BOX_RADIUS = get_hit_box_radius(SHIP_HIT_BOX, SCALING)
+EXPLOSION_SIZE = (17, 17)
+
+# Damage Constants
+TORPEDO_DAMAGE = 150
+# Explosions are circles of damage, ships touching one lose EXPLOSION_DAMAGE hp every update
+# An explosion starts as big as its image and shrinks at the same rate as the image is drawn shrinking
+EXPLOSION_DAMAGE = 5
+EXPLOSION_SHRINK_RATE = 0.05
+EXPLOSION_RADIUS = max(EXPLOSION_SIZE) / 2 * EXPLOSION_SCALING
+EXPLOSION_DECAY_RATE = EXPLOSION_RADIUS * EXPLOSION_SHRINK_RATE / EXPLOSION_SCALING
+# For explosion damage a ship is a line along its heading with rounded ends as wide as the ship
+SHIP_HALF_WIDTH = min(SHIP_SIZE) / 2 * SCALING
+SHIP_HALF_LENGTH = max(SHIP_SIZE) / 2 * SCALING - SHIP_HALF_WIDTH
+
+# Input Constants
+# The key flags of a Simulation, in the order of their bits in an input mask
+KEY_NAMES = ("up_pressed", "down_pressed", "left_pressed", "right_pressed", "w_pressed", "a_pressed", "s_pressed",
+             "d_pressed", "space_pressed")
+
+
+def check_for_collision(body1, body2):
+    # Check for a collision between two bodies
+    # The collision radius is a quick check to skip bodies that are far apart
+    # Only bodies that are close have their hit boxes checked
+    collision_radius_sum = body1.collision_radius + body2.collision_radius
+
+    diff_x = body1.center_x - body2.center_x
+    diff_x2 = diff_x * diff_x
+    if diff_x2 > collision_radius_sum * collision_radius_sum:
+        return False
+
+    diff_y = body1.center_y - body2.center_y
+    diff_y2 = diff_y * diff_y
+    if diff_y2 > collision_radius_sum * collision_radius_sum:
+        return False
+
+    distance = diff_x2 + diff_y2
+    if distance > collision_radius_sum * collision_radius_sum:
+        return False
+
+    return are_polygons_intersecting(body1.get_adjusted_hit_box(), body2.get_adjusted_hit_box())
+
+
+def check_for_collision_with_list(body, body_list):
+    # Return every body in the list that collides with the given body
+    return [other for other in body_list if body is not other and check_for_collision(body, other)]
+
+
+def check_for_collision_with_hash(body, spatial_hash, origin=None):
+    # Return every body in the spatial hash that collides with the given body
+    # Only the bodies near the given body are checked
+    # A ship whose identifier is origin is left out
+    return spatial_hash.check_for_collision(body, check_for_collision, origin)
+
+
+def get_game_result(team_counts, player, player_alive):
+    # Return how the game ended, or None if it is still going
+    # team_counts is how many ships are left on each team, including the player's
+    # Without a player the game is over when there is at most one team left
+    if player is None:
+        return "finished" if len(team_counts) <= 1 else None
+
+    # If everyone not on the player's team is dead then the player's team won
+    if all(team == player.team for team in team_counts):
+        return "won"
+
+    # If the player is dead then the player lost
+    if not player_alive:
+        return "lost"
+    return None
+
+
+def remove_from_lists(body, *body_lists):
+    # Remove a body from every list it is in
+    # This does the same job as arcade's remove_from_sprite_lists
+    for body_list in body_lists:
+        if body in body_list:
+            body_list.remove(body)
+
+
+class Body:
+    """Base Class For Anything In The Simulation"""
+    # A Body has the position, angle, scale and hit box of a sprite but nothing to do with drawing
+    # This lets the game run without a window
+    # The window draws each body with its own sprite, which is moved to the body every frame
+    # Bodies and their child classes use __slots__, so each one is a small fixed record instead of a dictionary
+    # This makes fleets of tens of thousands of ships use much less memory and their attributes quicker to get
+    __slots__ = ("_center_x", "_center_y", "_angle", "_scale", "texture_width", "texture_height", "width", "height",
+                 "hit_box", "_point_list_cache", "_heading", "collision_radius", "identifier",
+                 "spatial_hash", "spatial_hash_cell")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, size, hit_box, scale):
+        self._center_x = 0
+        self._center_y = 0
+        self._angle = 0
+        self._scale = scale
+        self.texture_width, self.texture_height = size
+        self.width = self.texture_width * scale
+        self.height = self.texture_height * scale
+        self.hit_box = hit_box
+        # The hit box moved, rotated and scaled to where the body is
+        # It is only recalculated when the body moves, rotates or is scaled
+        self._point_list_cache = None
+        # The cos and sin of the angle, the unit vector the body is facing
+        # It is only recalculated when the angle changes, None means it has to be
+        self._heading = None
+        # The collision radius is a quick check to skip bodies that are far apart
+        # It is calculated from the starting size and is not changed after that
+        self.collision_radius = max(self.width, self.height)
+        # Only ships have an identifier
+        self.identifier = None
+        # The spatial hash the body is in and the cell it is in
+        # When the body moves it tells the spatial hash so its cell is always right
+        self.spatial_hash = None
+        self.spatial_hash_cell = None
+
+    def _get_center_x(self):
+        return self._center_x
+
+    def _set_center_x(self, new_value):
+        if new_value != self._center_x:
+            self._point_list_cache = None
+            self._center_x = new_value
+            if self.spatial_hash is not None:
+                self.spatial_hash.move(self)
+
+    center_x = property(_get_center_x, _set_center_x)
+
+    def _get_center_y(self):
+        return self._center_y
+
+    def _set_center_y(self, new_value):
+        if new_value != self._center_y:
+            self._point_list_cache = None
+            self._center_y = new_value
+            if self.spatial_hash is not None:
+                self.spatial_hash.move(self)
+
+    center_y = property(_get_center_y, _set_center_y)
+
+    def _get_angle(self):
+        return self._angle
+
+    def _set_angle(self, new_value):
+        if new_value != self._angle:
+            self._point_list_cache = None
+            self._heading = None
+            self._angle = new_value
+
+    angle = property(_get_angle, _set_angle)
+
+    @property
+    def heading(self):
+        # The cos and sin of the angle, from Geometry's get_heading
+        if self._heading is None:
+            self._heading = get_heading(self._angle)
+        return self._heading
+
+    def _get_scale(self):
+        return self._scale
+
+    def _set_scale(self, new_value):
+        if new_value != self._scale:
+            self._point_list_cache = None
+            self._scale = new_value
+            self.width = self.texture_width * new_value
+            self.height = self.texture_height * new_value
+
+    scale = property(_get_scale, _set_scale)
+
+    def place(self, x, y, angle):
+        # Put a body that isn't in a spatial hash yet at a position and angle
+        # This is quicker than setting center_x, center_y and angle when making many bodies at once
+        self._center_x = x
+        self._center_y = y
+        self._angle = angle
+        self._point_list_cache = None
+        self._heading = None
+
+    def get_adjusted_hit_box(self):
+        # Get the points of the hit box including rotation, scaling and position
+        if self._point_list_cache is not None:
+            return self._point_list_cache
+
+        point_list = []
+        cos_angle, sin_angle = self.heading
+        for point in self.hit_box:
+            point = [point[0], point[1]]
+
+            # Scale the point
+            if self._scale != 1:
+                point[0] *= self._scale
+                point[1] *= self._scale
+
+            # Rotate the point
+            if self._angle:
+                point = rotate_point_by_heading(point[0], point[1], cos_angle, sin_angle)
+
+            # Offset the point
+            point_list.append([point[0] + self._center_x, point[1] + self._center_y])
+
+        self._point_list_cache = point_list
+        return point_list
+
+    # The sides of the body are the sides of its hit box
+    # Setting a side moves the body so that side is at the given value
+    def _get_left(self):
+        return min(point[0] for point in self.get_adjusted_hit_box())
+
+    def _set_left(self, amount):
+        self.center_x += amount - self._get_left()
+
+    left = property(_get_left, _set_left)
+
+    def _get_right(self):
+        return max(point[0] for point in self.get_adjusted_hit_box())
+
+    def _set_right(self, amount):
+        self.center_x -= self._get_right() - amount
+
+    right = property(_get_right, _set_right)
+
+    def _get_bottom(self):
+        return min(point[1] for point in self.get_adjusted_hit_box())
+
+    def _set_bottom(self, amount):
+        self.center_y -= self._get_bottom() - amount
+
+    bottom = property(_get_bottom, _set_bottom)
+
+    def _get_top(self):
+        return max(point[1] for point in self.get_adjusted_hit_box())
+
+    def _set_top(self, amount):
+        self.center_y -= self._get_top() - amount
+
+    top = property(_get_top, _set_top)
+
+
+class Ship(Body):
+    """Child Class Of The Body Class"""
+    # This is a base class for the AI ships and player ship to derive the same attributes and updates from
+    __slots__ = ("image_number", "speed", "hp", "max_hp", "cooldown_time", "previous_x", "previous_y",
+                 "previous_angle", "team", "max_speed", "weapon_cooldown_time", "handle")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, image_number):
+        # Init the parent
+        super().__init__(SHIP_SIZE, SHIP_HIT_BOX, SCALING)
+
+        # Creating New Attributes
+        # The image number says which ship image the window should draw for this ship
+        # 0 is the player's ship and 1 to 3 are the enemy ship colours
+        self.image_number = image_number
+        self.speed = 0
+        self.hp = SHIP_HP
+        self.max_hp = self.hp
+        # Identifier is useful for making torpedoes fired from a ship not collide with the ship upon firing
+        self.identifier = None
+        # The handle of the ship in the Simulation's EntityList, used to remove it when it dies
+        self.handle = None
+        # AI ships go after the closest ship that isn't on their team
+        # Every ship is on a team of its own unless a scenario puts them together
+        self.team = None
+        # The fastest the ship can go, different classes of ship in a scenario can have different speeds
+        self.max_speed = MAX_SPEED
+        # Cooldown_time allows for a cooldown after a projectile is fired
+        # The ship can fire again once it reaches weapon_cooldown_time
+        self.cooldown_time = 0
+        self.weapon_cooldown_time = WEAPON_COOLDOWN_TIME
+        # Where the ship was before the last tick, used to draw it between ticks
+        self.previous_x = 0
+        self.previous_y = 0
+        self.previous_angle = 0
+
+    def on_update(self, width, height, delta_time: float = 1/60):
+        # This is an update function which takes the size of the arena
+        # and the time since the last frame / last update
+
+        # Update ship's position based on ship's direction and speed
+        heading_x, heading_y = self.heading
+        self.center_x += self.speed * heading_x
+        self.center_y += self.speed * heading_y
+
+        # Increase the cooldown_time by the time since the last update
+        # When it reaches a certain value then they can fire
+        self.cooldown_time += delta_time
+
+        # Wall Collision
+        # Check to see if the ship hit the arena edge and if so prevent the ship from going off the arena
+        if self.left < 0:
+            self.left = 0
+        elif self.right > width - 1:
+            self.right = width - 1
+
+        if self.bottom < 0:
+            self.bottom = 0
+        elif self.top > height - 1:
+            self.top = height - 1
+
+        # Prevent the ship from exceeding speed limits
+        if self.speed > self.max_speed:
+            self.speed = self.max_speed
+        elif self.speed < MIN_SPEED:
+            self.speed = MIN_SPEED
+
+    def is_weapon_ready(self):
+        # A ship can fire once its cooldown_time has reached its weapon_cooldown_time
+        return self.cooldown_time >= self.weapon_cooldown_time
+
+    def fire_weapon(self):
+        # The ship fired a torpedo, so its cooldown starts again
+        self.cooldown_time = 0
+
+    def take_damage(self, damage):
+        # Decrease the ship's hp, it dies once it has none left
+        self.hp -= damage
+
+    def is_dead(self):
+        # A ship with no hp left is removed at the end of the update
+        return self.hp <= 0
+
+
+class AI(Ship):
+    """Child Class Of The Ship Class"""
+    # This class inherits attributes and updates from the ship class
+    # This class gives the AI ships more attributes
+    __slots__ = ("left_turn", "right_turn", "think_tick", "target_distance", "angle_change", "speed_change")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, image_number):
+        # Init the parent
+        super().__init__(image_number)
+        # These attributes are required to turn it away from the arena edge if the AI gets too close
+        self.left_turn = False
+        self.right_turn = False
+        # These attributes are the last decision the ship made, which it keeps doing on ticks it doesn't think
+        # The tick it last thought on and how far its closest ship was then
+        # It hasn't thought yet so it is treated as being near a threat and thinks on the first tick
+        self.think_tick = 0
+        self.target_distance = 0
+        # How much it turned and accelerated
+        self.angle_change = 0
+        self.speed_change = 0
+
+
+class Player(Ship):
+    """Child Class Of The Ship Class"""
+    # This class inherits attributes and updates from the ship class
+    # This class is for the player's ship which gives them more attributes
+    __slots__ = ("aim_angle", "aim_distance")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        # Init the parent
+        super().__init__(0)
+
+        # Creating New Attributes
+        # These attributes will be changed by the player to show and determine where the player is aiming
+        self.aim_angle = 0
+        self.aim_distance = MIN_AIM_DISTANCE
+
+    def update(self):
+        # Limit the aim_distance of the player so they cannot go outside of the determined range
+        if self.aim_distance > MAX_AIM_DISTANCE:
+            self.aim_distance = MAX_AIM_DISTANCE
+        elif self.aim_distance < MIN_AIM_DISTANCE:
+            self.aim_distance = MIN_AIM_DISTANCE
@@ -0,0 +1,197 @@
+"""Importing key libraries"""
+import importlib.util
+import json
+import math
+import os
+import numpy as np
+from Rules import SHIP_HP, MAX_SPEED, WEAPON_COOLDOWN_TIME
+from Simulation import Simulation
+
+
+"""Defining Constants"""
+# Scenario File Constants
+# tomllib is only in Python 3.11 and later, on older versions scenarios have to be JSON
+HAS_TOMLLIB = importlib.util.find_spec("tomllib") is not None
+# The ship class used for a fleet or the player that doesn't name one
+DEFAULT_CLASS = {"image": 1, "hp": SHIP_HP, "max_speed": MAX_SPEED, "weapon_cooldown_time": WEAPON_COOLDOWN_TIME}
+# The images AI ships can have, the player always has image 0
+AI_IMAGES = (1, 2, 3)
+
+# Formation Constants
+FORMATIONS = ("ring", "grid", "line", "random")
+# The pixels between ships in a grid or line and the radius of a ring if the fleet doesn't give them
+# It is a little more than the length of a ship so they don't start touching
+FORMATION_SPACING = 60
+RING_RADIUS = 500
+
+
+def read_scenario_file(file_name):
+    # Return the dictionary in a JSON or TOML scenario file, which one is decided by the file extension
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == ".toml":
+        if not HAS_TOMLLIB:
+            raise ValueError("TOML scenarios need Python 3.11 or later, use a JSON scenario instead")
+        import tomllib
+        with open(file_name, "rb") as file:
+            try:
+                return tomllib.load(file)
+            except tomllib.TOMLDecodeError as error:
+                raise ValueError("{} is not a valid TOML file: {}".format(file_name, error)) from error
+    with open(file_name) as file:
+        try:
+            return json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError("{} is not a valid JSON file: {}".format(file_name, error)) from error
+
+
+def get_number(values, name, default=None, minimum=None):
+    # Return a number from a section of a scenario, raising a ValueError if it is missing or isn't a number
+    value = values.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError("{} must be a number, not {!r}".format(name, value))
+    if minimum is not None and value < minimum:
+        raise ValueError("{} must be at least {}, not {!r}".format(name, minimum, value))
+    return value
+
+
+def get_table(values, name, default=None):
+    # Return a table from a section of a scenario, raising a ValueError if it isn't a table of values
+    value = values.get(name, default)
+    if not isinstance(value, dict):
+        raise ValueError("{} must be a table of values, not {!r}".format(name, value))
+    return value
+
+
+def get_ship_class(classes, name):
+    # Return the values of a ship class, a fleet without a class uses the default one
+    if name is None:
+        return dict(DEFAULT_CLASS)
+    if not isinstance(name, str):
+        raise ValueError("class must be the name of a ship class, not {!r}".format(name))
+    if name not in classes:
+        raise ValueError("there is no ship class called {!r}".format(name))
+    return classes[name]
+
+
+def check_ship_class(name, values):
+    # Return a ship class with every value filled in, raising a ValueError if one is wrong
+    if not isinstance(values, dict):
+        raise ValueError("ship class {!r} must be a table of values".format(name))
+    ship_class = dict(DEFAULT_CLASS)
+    ship_class.update(values)
+    if ship_class["image"] not in AI_IMAGES:
+        raise ValueError("the image of ship class {!r} must be one of {}".format(name, AI_IMAGES))
+    ship_class["hp"] = int(get_number(ship_class, "hp", minimum=1))
+    ship_class["max_speed"] = float(get_number(ship_class, "max_speed", minimum=0))
+    ship_class["weapon_cooldown_time"] = float(get_number(ship_class, "weapon_cooldown_time", minimum=0))
+    return ship_class
+
+
+def get_formation(fleet, count):
+    # Return the x, y and angle arrays of the ships of a fleet
+    # Every formation is centered on the fleet's x and y and worked out at once with arrays
+    formation = fleet.get("formation", "grid")
+    center_x = get_number(fleet, "x")
+    center_y = get_number(fleet, "y")
+    angle = get_number(fleet, "angle", 0)
+    spacing = get_number(fleet, "spacing", FORMATION_SPACING, minimum=0)
+    numbers = np.arange(count)
+
+    if formation == "ring":
+        # The ships are spread equally around a circle facing outwards, like the ships of the default game
+        ring_angle = numbers * 360 / count + angle
+        radius = get_number(fleet, "radius", RING_RADIUS, minimum=0)
+        x = radius * np.cos(np.radians(ring_angle)) + center_x
+        y = radius * np.sin(np.radians(ring_angle)) + center_y
+        return x, y, ring_angle
+    if formation == "grid":
+        # The ships are in rows as close to a square as they can be, all facing the same way
+        columns = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / columns)
+        x = (numbers % columns - (columns - 1) / 2) * spacing + center_x
+        y = (numbers // columns - (rows - 1) / 2) * spacing + center_y
+    elif formation == "line":
+        # The ships are side by side in one row
+        x = (numbers - (count - 1) / 2) * spacing + center_x
+        y = np.full(count, center_y, dtype=np.float64)
+    elif formation == "random":
+        # The ships are anywhere in a rectangle, the seed makes it the same every time the scenario is loaded
+        seed = fleet.get("seed", 0)
+        if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            raise ValueError("seed must be a whole number of at least 0, not {!r}".format(seed))
+        generator = np.random.default_rng(seed)
+        width = get_number(fleet, "width", minimum=0)
+        height = get_number(fleet, "height", minimum=0)
+        x = generator.uniform(center_x - width / 2, center_x + width / 2, count)
+        y = generator.uniform(center_y - height / 2, center_y + height / 2, count)
+        return x, y, generator.uniform(0, 360, count)
+    else:
+        raise ValueError("formation must be one of {}, not {!r}".format(", ".join(FORMATIONS), formation))
+    return x, y, np.full(count, angle, dtype=np.float64)
+
+
+def load_scenario(file_name):
+    # Read a scenario file and return it with every fleet's positions worked out
+    # Anything wrong in the file raises a ValueError saying what it is
+    scenario = read_scenario_file(file_name)
+    if not isinstance(scenario, dict):
+        raise ValueError("a scenario must be a table of values")
+    arena = get_table(scenario, "arena", {})
+    width = get_number(arena, "width", minimum=1)
+    height = get_number(arena, "height", minimum=1)
+
+    if not isinstance(scenario.get("classes", {}), dict) or not isinstance(scenario.get("fleets", []), list):
+        raise ValueError("classes must be a table of ship classes and fleets must be a list of fleets")
+    classes = {name: check_ship_class(name, values) for name, values in scenario.get("classes", {}).items()}
+
+    player = scenario.get("player")
+    if player is not None:
+        player = get_table(scenario, "player")
+        ship_class = get_ship_class(classes, player.get("class"))
+        player = dict(ship_class, team=int(get_number(player, "team", 0)), x=get_number(player, "x", width / 2),
+                      y=get_number(player, "y", height / 2), angle=get_number(player, "angle", 0))
+        if not 0 <= player["x"] <= width or not 0 <= player["y"] <= height:
+            raise ValueError("the player at {}, {} isn't in the arena".format(player["x"], player["y"]))
+
+    fleets = []
+    for fleet in scenario.get("fleets", []):
+        if not isinstance(fleet, dict):
+            raise ValueError("each fleet must be a table of values, not {!r}".format(fleet))
+        count = int(get_number(fleet, "count", minimum=1))
+        ship_class = get_ship_class(classes, fleet.get("class"))
+        x, y, angle = get_formation(fleet, count)
+        if x.min() < 0 or x.max() > width or y.min() < 0 or y.max() > height:
+            raise ValueError("a fleet of {} ships at {}, {} doesn't fit in the arena".format(count, fleet["x"],
+                                                                                              fleet["y"]))
+        fleets.append(dict(ship_class, team=int(get_number(fleet, "team")), x=x, y=y, angle=angle))
+
+    # Ships never fight their own team, so a game with only one team would never end
+    teams = {fleet["team"] for fleet in fleets}
+    if player is not None:
+        teams.add(player["team"])
+    if len(teams) < 2:
+        raise ValueError("a scenario needs ships on at least two teams, not {}".format(len(teams)))
+    return {"width": width, "height": height, "player": player, "fleets": fleets}
+
+
+def create_simulation(scenario, **kwargs):
+    # Return a new Simulation with the player and fleets of a scenario from load_scenario
+    # kwargs are passed to the Simulation, to change the AI constants
+    player = scenario["player"]
+    simulation = Simulation(scenario["width"], scenario["height"], 0, has_player=player is not None, **kwargs)
+    if player is not None:
+        ship = simulation.player_sprite
+        ship.center_x = ship.previous_x = player["x"]
+        ship.center_y = ship.previous_y = player["y"]
+        ship.angle = ship.previous_angle = player["angle"]
+        ship.hp = ship.max_hp = player["hp"]
+        ship.max_speed = player["max_speed"]
+        ship.weapon_cooldown_time = player["weapon_cooldown_time"]
+        ship.team = player["team"]
+        simulation.team_counts = {ship.team: 1}
+
+    # Each fleet is added in one go, in the order they are in the file
+    for fleet in scenario["fleets"]:
+        simulation.spawn_ships(fleet["x"], fleet["y"], fleet["angle"], fleet["image"], fleet["team"], fleet["hp"],
+                               fleet["max_speed"], fleet["weapon_cooldown_time"])
+    return simulation
@@ -0,0 +1,672 @@
+"""Importing key libraries"""
+import itertools
+import math
+import operator
+import numpy as np
+from Rules import AI, Player, remove_from_lists, get_game_result, KEY_NAMES, SCALING, \
+    WEAPON_SCALING, MAX_SPEED, ACCELERATION_RATE, ANGLE_SPEED, WEAPON_COOLDOWN_TIME, AIM_DISTANCE_SPEED, \
+    AIM_ANGLE_SPEED, MAX_AIM_DISTANCE, MIN_AIM_DISTANCE, TICK_RATE, MAX_TICKS_PER_FRAME, ENEMY_SHIP_NUMBER, \
+    AI_OUTER_DISTANCE, AI_INNER_DISTANCE, TORPEDO_SPEED, SHIP_SIZE, TORPEDO_SIZE, TORPEDO_HIT_BOX, TORPEDO_DAMAGE, \
+    EXPLOSION_DAMAGE, EXPLOSION_RADIUS, EXPLOSION_DECAY_RATE, SHIP_HALF_WIDTH, SHIP_HALF_LENGTH, SHIP_HP, \
+    SHIP_HIT_BOX_RADIUS
+from AIScheduler import AIScheduler, AI_NEAR_FACTOR, AI_FAR_INTERVAL, AI_DECISION_BUDGET
+from FleetAI import find_closest_ships, avoid_walls, turn_towards_targets
+from InterceptSolver import aim_at_intercepts
+from DamageFields import DamageFields
+from EntityList import EntityList
+from Profiler import Profiler
+from SpatialHash import SpatialHash
+from TorpedoEngine import TorpedoEngine, are_hit_boxes_intersecting
+
+
+"""Defining Constants"""
+# State Constants
+# The values of a Simulation that are saved as well as its ships, torpedoes and explosions
+STATE_VALUES = ("width", "height", "tick", "tick_time", "accumulator", "interpolation", "result", "winner",
+                "shots_fired", "shots_hit", "damage_dealt", "ai_outer_distance", "ai_inner_distance",
+                "max_aim_distance", "weapon_cooldown_time", "torpedo_speed", "next_identifier") + KEY_NAMES
+# The attributes of every ship that are saved and the type of array they are saved in
+SHIP_STATE = (("identifier", np.int64), ("image_number", np.int64), ("center_x", np.float64),
+              ("center_y", np.float64), ("angle", np.float64), ("speed", np.float64), ("hp", np.int64),
+              ("max_hp", np.int64), ("cooldown_time", np.float64), ("previous_x", np.float64),
+              ("previous_y", np.float64), ("previous_angle", np.float64), ("team", np.int64),
+              ("max_speed", np.float64), ("weapon_cooldown_time", np.float64))
+# The attributes only AI ships have
+AI_STATE = (("left_turn", np.bool_), ("right_turn", np.bool_), ("think_tick", np.int64),
+            ("target_distance", np.float64), ("angle_change", np.float64), ("speed_change", np.float64))
+# The attributes update_ai_ships reads from every ship
+GET_POSITION = operator.attrgetter("center_x", "center_y", "team")
+# The attributes update_torpedoes reads from every ship
+GET_TORPEDO_TARGET = operator.attrgetter("center_x", "center_y", "identifier")
+# The attributes the AI ships are updated with, in the order update_ai_ships reads them
+GET_AI_STATE = operator.attrgetter("angle", "speed", "angle_change", "speed_change", "think_tick", "target_distance",
+                                   "left_turn", "right_turn")
+AI_STATE_SIZE = 8
+
+# Spatial Hash Constants
+# The ship hash is only used to find the ships the window can see, so the cells are made as wide as two ships
+# That way a ship only changes cell every couple of dozen updates
+SPATIAL_HASH_CELL_SIZE = 2 * max(SHIP_SIZE) * SCALING
+
+
+def get_values(value, count):
+    # Return a list of count values from a list, tuple or array, or count of the same value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return value
+    return itertools.repeat(value, count)
+
+
+class Simulation:
+    """Holds And Updates Everything In A Game"""
+    # This class has all the gameplay of a game but doesn't draw anything
+    # So a game can be run without a window, as fast as the computer allows
+    # The GameView in Window.py draws a Simulation and passes the player's key presses to it
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, width, height, enemy_ship_number=ENEMY_SHIP_NUMBER, tick_rate=TICK_RATE, has_player=True,
+                 ai_outer_distance=AI_OUTER_DISTANCE, ai_inner_distance=AI_INNER_DISTANCE,
+                 max_aim_distance=MAX_AIM_DISTANCE, weapon_cooldown_time=WEAPON_COOLDOWN_TIME,
+                 torpedo_speed=TORPEDO_SPEED, ai_far_interval=AI_FAR_INTERVAL,
+                 ai_decision_budget=AI_DECISION_BUDGET):
+        # These attributes track the current state of what key is pressed
+        # Initially they are set to False
+        self.left_pressed = False
+        self.right_pressed = False
+        self.up_pressed = False
+        self.down_pressed = False
+        self.w_pressed = False
+        self.a_pressed = False
+        self.s_pressed = False
+        self.d_pressed = False
+        self.space_pressed = False
+
+        # These attributes are the AI constants of this game
+        # They default to the constants at the top of this file but can be changed to tune the AI
+        self.ai_outer_distance = ai_outer_distance
+        self.ai_inner_distance = ai_inner_distance
+        self.max_aim_distance = max_aim_distance
+        self.weapon_cooldown_time = weapon_cooldown_time
+        self.torpedo_speed = torpedo_speed
+        # The AI scheduler decides which AI ships think each tick
+        self.ai_scheduler = AIScheduler(AI_NEAR_FACTOR * max_aim_distance, ai_far_interval, ai_decision_budget)
+
+        # The size of the arena
+        # Ships can't leave it and torpedoes are removed when they leave it
+        self.width = None
+        self.height = None
+
+        # These attributes will be rectangles
+        # They are used for determining whether the AI Ships are too close to the arena edge
+        self.ai_outer_rect = None
+        self.ai_inner_rect = None
+        self.resize(width, height)
+
+        # The number of updates done so far
+        self.tick = 0
+        # The length of a tick in seconds
+        self.tick_time = 1 / tick_rate
+        # The time that has passed that hasn't been used up by a tick yet
+        self.accumulator = 0
+        # How far the game is between the last tick and the next one, from 0 to 1
+        # The window uses this to draw the bodies between where they were and where they are
+        self.interpolation = 0
+        # This is set to "won" or "lost" when the game ends
+        # A game without a player is set to "finished" when at most one ship is left
+        self.result = None
+        # The identifier of the last ship left when the game ends, None if there isn't exactly one
+        self.winner = None
+
+        # The profiler times each phase of an update when it is enabled
+        self.profiler = Profiler()
+        # A ReplayRecorder that records the keys of every tick or a ReplayPlayer that sets them
+        self.replay = None
+
+        # These attributes count what has happened in the game so far
+        self.shots_fired = 0
+        # A shot hit if its torpedo hit at least one ship
+        self.shots_hit = 0
+        # The hp taken from ships by torpedoes and explosions
+        self.damage_dealt = 0
+
+        # Create lists to hold the bodies
+        # The ships are kept in an EntityList, so a dead ship is removed without moving every ship after it
+        # The ship_list is the EntityList's own list, it is what is looped over and read by everything else
+        self.player_list = []
+        self.ships = EntityList()
+        self.ship_list = self.ships.entities
+        # Every ship is kept in a spatial hash
+        # So each torpedo only has to check the bodies near it
+        self.collision_hash = SpatialHash(SPATIAL_HASH_CELL_SIZE)
+        # Every torpedo is kept in the arrays of a TorpedoEngine
+        self.torpedoes = TorpedoEngine(torpedo_speed, TORPEDO_SIZE, TORPEDO_HIT_BOX, WEAPON_SCALING)
+        # Every explosion is a circle of damage kept in the arrays of a DamageFields
+        self.explosions = DamageFields(EXPLOSION_DAMAGE)
+
+        # The number of living ships on each team, the game is over when only one team is left
+        # Unless a scenario puts ships on teams, every ship is on a team of its own
+        self.team_counts = {}
+        # The identifier the next ship made is given
+        self.next_identifier = 1
+
+        # This sets up the starting position of all the ships depending on how many ships there are
+        # The ships are arranged equally on points of a circle originating at the middle of the arena
+        # The angle different between them is determined on the number of ships
+        # Their direction is determined by the angle they were placed at
+        # It's cartesian coordinates are determined by polar coordinates
+        ship_count = enemy_ship_number + has_player
+        angles = [i * 360 / ship_count for i in range(ship_count)]
+        x = [self.height / 4 * math.cos(math.radians(angle)) + self.width / 2 for angle in angles]
+        y = [self.height / 4 * math.sin(math.radians(angle)) + self.height / 2 for angle in angles]
+
+        # Create and setup the player ship
+        # A game without a player only has AI ships, which is used to run AI against AI
+        self.player_sprite = None
+        if has_player:
+            self.player_sprite = Player()
+            self.player_sprite.identifier = 0
+            self.player_sprite.team = 0
+            self.player_sprite.weapon_cooldown_time = weapon_cooldown_time
+            self.player_sprite.place(x.pop(0), y.pop(0), angles.pop(0))
+            # Append the player to the appropriate lists
+            self.player_list.append(self.player_sprite)
+            self.player_sprite.handle = self.ships.spawn(self.player_sprite)
+            self.team_counts[0] = 1
+            self.collision_hash.insert(self.player_sprite)
+
+        # Create and setup the enemy ships
+        # There are 3 different colours of enemy ships
+        # So every 3 enemy ships the colours will repeat
+        self.spawn_ships(x, y, angles, [(i % 3) + 1 for i in range(enemy_ship_number)])
+        self.save_previous_state()
+
+    def spawn_ships(self, x, y, angle, image_number=1, team=None, hp=SHIP_HP, max_speed=MAX_SPEED,
+                    weapon_cooldown_time=None):
+        # Add AI ships facing angle at the points in x and y, and return them
+        # x, y and angle have a value for every ship, as lists or arrays
+        # The rest can have a value for every ship or one value for all of them
+        # A team of None puts each ship on a team of its own and a weapon_cooldown_time of None uses this game's
+        # The ships are made in one go and added to the lists and spatial hash together
+        # Which is much quicker than adding tens of thousands of ships one at a time
+        ship_count = len(x)
+        if weapon_cooldown_time is None:
+            weapon_cooldown_time = self.weapon_cooldown_time
+        first_identifier = self.next_identifier
+        self.next_identifier += ship_count
+
+        ships = []
+        for identifier, ship_x, ship_y, ship_angle, ship_image, ship_team, ship_hp, ship_max_speed, cooldown in zip(
+                range(first_identifier, first_identifier + ship_count), get_values(x, ship_count),
+                get_values(y, ship_count), get_values(angle, ship_count), get_values(image_number, ship_count),
+                get_values(team, ship_count), get_values(hp, ship_count), get_values(max_speed, ship_count),
+                get_values(weapon_cooldown_time, ship_count)):
+            ship = AI(ship_image)
+            ship.place(ship_x, ship_y, ship_angle)
+            ship.identifier = identifier
+            ship.team = identifier if ship_team is None else ship_team
+            ship.hp = ship.max_hp = ship_hp
+            ship.max_speed = ship_max_speed
+            ship.weapon_cooldown_time = cooldown
+            ship.previous_x = ship_x
+            ship.previous_y = ship_y
+            ship.previous_angle = ship_angle
+            ships.append(ship)
+
+        # Append the AI ships to the appropriate lists
+        # They go after the player in the ship_list, like every other AI ship
+        for ship, handle in zip(ships, self.ships.spawn_many(ships)):
+            ship.handle = handle
+        self.collision_hash.insert_many(ships)
+        team_counts = self.team_counts
+        for ship in ships:
+            team_counts[ship.team] = team_counts.get(ship.team, 0) + 1
+        return ships
+
+    @property
+    def enemy_ship_list(self):
+        # The AI ships, which are every ship after the player in the ship_list
+        return self.ship_list[len(self.player_list):]
+
+    def resize(self, width, height):
+        # When the arena is resized, the sizes of the rectangles for the AI Ship wall avoidance code need to be resized
+        self.width = width
+        self.height = height
+
+        # Create rectangles which have a midpoint at the arena's midpoint
+        # The outer rect is to determine when the AI Ships start turning away from the wall
+        p1 = (self.ai_outer_distance, self.ai_outer_distance)
+        p2 = (width - self.ai_outer_distance, self.ai_outer_distance)
+        p3 = (width - self.ai_outer_distance, height - self.ai_outer_distance)
+        p4 = (self.ai_outer_distance, height - self.ai_outer_distance)
+        self.ai_outer_rect = [p1, p2, p3, p4]
+
+        # The inner rect is to determine when the AI Ships stop turning away from the wall
+        p1 = (self.ai_inner_distance, self.ai_inner_distance)
+        p2 = (width - self.ai_inner_distance, self.ai_inner_distance)
+        p3 = (width - self.ai_inner_distance, height - self.ai_inner_distance)
+        p4 = (self.ai_inner_distance, height - self.ai_inner_distance)
+        self.ai_inner_rect = [p1, p2, p3, p4]
+
+    @classmethod
+    def from_state(cls, values, arrays):
+        # Make a Simulation from a state saved by get_state
+        simulation = cls(values["width"], values["height"], 0, has_player=False)
+        simulation.load_state(values, arrays)
+        return simulation
+
+    def copy(self):
+        # Return a new Simulation in exactly the same state as this one
+        return Simulation.from_state(*self.get_state())
+
+    def get_state(self):
+        # Return everything needed to carry on this game exactly as it would have gone
+        # values is a dictionary of numbers and strings and arrays is a dictionary of NumPy arrays
+        values = {name: getattr(self, name) for name in STATE_VALUES}
+        values["has_player"] = self.player_sprite is not None
+        values["ai_scheduler"] = self.ai_scheduler.get_state()
+        values["torpedoes_spawned"] = self.torpedoes.spawned
+        values["explosions_spawned"] = self.explosions.spawned
+
+        # The ships are saved in the order of the ship_list
+        # If the player is dead it is saved after them so the window can still draw its aim
+        ships = list(self.ship_list)
+        if self.player_sprite is not None:
+            values["aim_angle"] = self.player_sprite.aim_angle
+            values["aim_distance"] = self.player_sprite.aim_distance
+            if self.player_sprite not in self.player_list:
+                ships.append(self.player_sprite)
+
+        # Every saved attribute of each ship is got at once, then each column is made an array of its type
+        get_ship_state = operator.attrgetter(*(name for name, _ in SHIP_STATE))
+        ship_state = np.array([get_ship_state(ship) for ship in ships], dtype=np.float64).reshape(-1, len(SHIP_STATE))
+        arrays = {}
+        for column, (name, dtype) in enumerate(SHIP_STATE):
+            arrays["ship_" + name] = ship_state[:, column].astype(dtype)
+        for name, dtype in AI_STATE:
+            arrays["ship_" + name] = np.array([getattr(ship, name, False) for ship in ships], dtype=dtype)
+        arrays["ship_alive"] = np.arange(len(ships)) < len(self.ship_list)
+        arrays["ship_is_player"] = np.array([ship is self.player_sprite for ship in ships], dtype=np.bool_)
+
+        for name, array in self.torpedoes.get_state().items():
+            arrays["torpedo_" + name] = array
+        for name, array in self.explosions.get_state().items():
+            arrays["explosion_" + name] = array
+        return values, arrays
+
+    def load_state(self, values, arrays):
+        # Replace this game with a state saved by get_state
+        for name in STATE_VALUES:
+            setattr(self, name, values[name])
+        self.resize(self.width, self.height)
+        self.ai_scheduler.set_state(values["ai_scheduler"])
+
+        # The ships are made again and the living ones are put back in the lists and spatial hash
+        self.player_list = []
+        self.ships = EntityList()
+        self.ship_list = self.ships.entities
+        self.collision_hash = SpatialHash(SPATIAL_HASH_CELL_SIZE)
+        self.player_sprite = None
+        ship_values = {name: array.tolist() for name, array in arrays.items() if name.startswith("ship_")}
+        for i, is_player in enumerate(ship_values["ship_is_player"]):
+            if is_player:
+                ship = self.player_sprite = Player()
+                ship.aim_angle = values["aim_angle"]
+                ship.aim_distance = values["aim_distance"]
+            else:
+                ship = AI(ship_values["ship_image_number"][i])
+                for name, _ in AI_STATE:
+                    setattr(ship, name, ship_values["ship_" + name][i])
+            for name, _ in SHIP_STATE:
+                setattr(ship, name, ship_values["ship_" + name][i])
+
+            if ship_values["ship_alive"][i]:
+                ship.handle = self.ships.spawn(ship)
+                if is_player:
+                    self.player_list.append(ship)
+                self.collision_hash.insert(ship)
+        self.team_counts = {}
+        for ship in self.ship_list:
+            self.team_counts[ship.team] = self.team_counts.get(ship.team, 0) + 1
+
+        self.torpedoes = TorpedoEngine(self.torpedo_speed, TORPEDO_SIZE, TORPEDO_HIT_BOX, WEAPON_SCALING)
+        self.torpedoes.set_state({name: arrays["torpedo_" + name] for name in TorpedoEngine.ARRAY_NAMES})
+        self.torpedoes.spawned = values["torpedoes_spawned"]
+        self.explosions = DamageFields(EXPLOSION_DAMAGE)
+        self.explosions.set_state({name: arrays["explosion_" + name] for name in DamageFields.ARRAY_NAMES})
+        self.explosions.spawned = values["explosions_spawned"]
+
+    def run(self, max_ticks):
+        # Keep updating until the game ends or max_ticks updates have been done
+        # Returns the result of the game which is None if it didn't end
+        while self.result is None and self.tick < max_ticks:
+            self.on_update(self.tick_time)
+        return self.result
+
+    def advance(self, frame_time):
+        # This function is called once a frame with the time since the last frame
+        # It does as many ticks as fit in the time that has passed, so the game plays at the same speed
+        # however fast it is drawn, and returns the number of ticks done
+        self.accumulator += frame_time
+        ticks = 0
+        while self.accumulator >= self.tick_time and ticks < MAX_TICKS_PER_FRAME:
+            self.on_update(self.tick_time)
+            self.accumulator -= self.tick_time
+            ticks += 1
+
+        # If the game couldn't catch up then the time it is behind is dropped
+        if self.accumulator >= self.tick_time:
+            self.accumulator %= self.tick_time
+        self.interpolation = self.accumulator / self.tick_time
+        return ticks
+
+    def on_update(self, delta_time):
+        # This function updates the game by one tick
+        # Once the game has ended nothing changes anymore
+        if self.result is not None:
+            return
+
+        if self.replay is not None:
+            self.replay.before_tick(self)
+        self.save_previous_state()
+        profiler = self.profiler
+        if profiler.enabled:
+            if self.player_sprite is not None:
+                profiler.time_phase("update_player", self.update_player)
+            profiler.time_phase("update_explosions", self.update_explosions)
+            profiler.time_phase("update_torpedoes", self.update_torpedoes)
+            profiler.time_phase("update_ai_ships", self.update_ai_ships)
+            profiler.time_phase("check_deaths", self.check_deaths)
+            profiler.time_phase("update_bodies", self.update_bodies, delta_time)
+        else:
+            if self.player_sprite is not None:
+                self.update_player()
+            self.update_explosions()
+            self.update_torpedoes()
+            self.update_ai_ships()
+            self.check_deaths()
+            self.update_bodies(delta_time)
+        self.tick += 1
+
+    def save_previous_state(self):
+        # Remember where every ship is before it is updated
+        for ship in self.ship_list:
+            ship.previous_x = ship.center_x
+            ship.previous_y = ship.center_y
+            ship.previous_angle = ship.angle
+
+    def fire_torpedo(self, angle, x, y, distance_to_travel, identifier):
+        # Creates the torpedo in the next free slot of the TorpedoEngine
+        self.torpedoes.spawn(angle, x, y, distance_to_travel, identifier)
+        self.shots_fired += 1
+
+    def update_player(self):
+        # The player is updated first based on the keys pressed
+        # If only the w key is pressed then the player is accelerating
+        # If both are pressed then the player's speed is not changed
+        # If only the s key is pressed then the player is decelerating
+        if self.w_pressed and not self.s_pressed:
+            self.player_sprite.speed += ACCELERATION_RATE
+        elif self.s_pressed and not self.w_pressed:
+            self.player_sprite.speed -= ACCELERATION_RATE
+
+        # Changes angle of the player ship
+        # Like comments above but a key turns player ship left and d key right
+        # The angle turning is based on the speed of the player so they can't turn if they have a speed of 0
+        if self.a_pressed and not self.d_pressed:
+            self.player_sprite.angle += ANGLE_SPEED * self.player_sprite.speed
+        elif self.d_pressed and not self.a_pressed:
+            self.player_sprite.angle -= ANGLE_SPEED * self.player_sprite.speed
+
+        # Change aim_distance
+        # Like comments above but up arrow key increases aim_distance
+        # Down arrow decreases aim_distance
+        # This changes how far the player is aiming
+        if self.up_pressed and not self.down_pressed:
+            self.player_sprite.aim_distance += AIM_DISTANCE_SPEED
+        elif self.down_pressed and not self.up_pressed:
+            self.player_sprite.aim_distance -= AIM_DISTANCE_SPEED
+
+        # Change aim_angle
+        # Like comments above, left arrow key increases aim_angle (left)
+        # Right arrow key decreases aim_angle (right)
+        # This changes the direction the player is aiming
+        if self.left_pressed and not self.right_pressed:
+            self.player_sprite.aim_angle += AIM_ANGLE_SPEED
+        elif self.right_pressed and not self.left_pressed:
+            self.player_sprite.aim_angle -= AIM_ANGLE_SPEED
+
+        # The space key is the player's shoot key
+        # If it's pressed, it checks if the player can shoot a torpedo
+        # cooldown_time is increased every update in the Ship Class update function
+        # If the player's weapon is ready then a torpedo is created
+        if self.space_pressed:
+            if self.player_sprite.is_weapon_ready():
+                # Since the player fired a torpedo, reset the cooldown_time
+                self.player_sprite.fire_weapon()
+
+                self.fire_torpedo(self.player_sprite.aim_angle,
+                                  self.player_sprite.center_x,
+                                  self.player_sprite.center_y,
+                                  self.player_sprite.aim_distance,
+                                  self.player_sprite.identifier)
+
+    def update_explosions(self):
+        # Updates Explosions
+        # When a torpedo explodes, an explosion is made
+        # Every ship touching an explosion loses EXPLOSION_DAMAGE hp for each explosion it is touching
+        ships = self.ship_list
+        if self.explosions.count > 0 and len(ships) > 0:
+            ship_count = len(ships)
+            heading = np.array([ship.heading for ship in ships], dtype=np.float64)
+            damage = self.explosions.find_damage(
+                np.fromiter((ship.center_x for ship in ships), np.float64, ship_count),
+                np.fromiter((ship.center_y for ship in ships), np.float64, ship_count),
+                heading[:, 0], heading[:, 1], SHIP_HALF_LENGTH, SHIP_HALF_WIDTH)
+            for ship, ship_damage in zip(ships, damage.tolist()):
+                if ship_damage:
+                    ship.take_damage(ship_damage)
+            self.damage_dealt += int(damage.sum())
+
+        # Explosions go away over time
+        # So shrink the explosions and remove the ones that are gone
+        self.explosions.decay_fields()
+
+    def update_torpedoes(self):
+        # Updates torpedoes
+        # Every collision of every torpedo is found at once, then the torpedoes that hit something explode
+        torpedoes = self.torpedoes
+        if torpedoes.count == 0:
+            return
+
+        # Find the torpedoes and ships close enough to be touching, then check their hit boxes
+        # The ship that fired a torpedo is left out
+        # This prevents the torpedo from exploding as soon as it was fired
+        # Because it hit the ship it was fired from
+        ships = self.ship_list
+        ship_x, ship_y, ship_identifier = np.fromiter(
+            itertools.chain.from_iterable(map(GET_TORPEDO_TARGET, ships)), np.float64,
+            len(ships) * 3).reshape(len(ships), 3).T
+        hit_torpedoes, hit_ships = torpedoes.find_ship_pairs(ship_x, ship_y, SHIP_HIT_BOX_RADIUS)
+        not_origin = torpedoes.origin[hit_torpedoes] != ship_identifier[hit_ships]
+        hit_torpedoes = hit_torpedoes[not_origin]
+        hit_ships = hit_ships[not_origin]
+        if len(hit_ships) > 0:
+            # A ship's hit box is worked out by the ship, so it is rounded exactly the same way as always
+            unique_ships, ship_pairs = np.unique(hit_ships, return_inverse=True)
+            ship_boxes = np.array([ships[number].get_adjusted_hit_box() for number in unique_ships.tolist()])
+            touching = are_hit_boxes_intersecting(torpedoes.get_hit_boxes(hit_torpedoes), ship_boxes[ship_pairs])
+            hit_torpedoes = hit_torpedoes[touching]
+            hit_ships = hit_ships[touching]
+
+        # A torpedo explodes if it hit a ship or a torpedo, or if it reached its endpoint
+        exploding = torpedoes.find_expired()
+        exploding[hit_torpedoes] = True
+        exploding = np.flatnonzero(torpedoes.find_torpedo_hits(exploding))
+        torpedoes.alive[exploding] = False
+
+        # Create an explosion at the midpoint of each one, in the order they were fired
+        self.explosions.spawn_many(torpedoes.x[exploding], torpedoes.y[exploding], EXPLOSION_RADIUS,
+                                   EXPLOSION_DECAY_RATE)
+
+        # Every ship that was hit loses hp for each torpedo that hit it
+        for number in hit_ships.tolist():
+            ships[number].take_damage(TORPEDO_DAMAGE)
+        self.damage_dealt += TORPEDO_DAMAGE * len(hit_ships)
+        self.shots_hit += len(np.unique(hit_torpedoes))
+
+    def update_ai_ships(self):
+        # Updates AI Ships
+        # Every thinking AI ship's closest ship and turning are worked out at once using arrays
+        if len(self.ship_list) == len(self.player_list):
+            return
+
+        # The ship_list always has the player first, if it is alive, then the AI ships
+        # A dead ship is replaced by the last ship, so the player stays first until it dies
+        ships = self.ship_list
+        ship_count = len(ships)
+        x, y, team = np.fromiter(itertools.chain.from_iterable(map(GET_POSITION, ships)), np.float64,
+                                 ship_count * 3).reshape(ship_count, 3).T
+        is_ai = np.arange(ship_count) >= len(self.player_list)
+        ai_numbers = np.flatnonzero(is_ai)
+        ai_ships = ships[len(self.player_list):]
+        ai_count = len(ai_ships)
+
+        # Only the AI ships the scheduler picks think this tick
+        # The rest accelerate and chase the same as they did the last time they thought
+        # but every ship still keeps away from the arena edge every tick
+        # Every attribute the AI needs is read from each ship in one go
+        ai_state = np.fromiter(itertools.chain.from_iterable(map(GET_AI_STATE, ai_ships)), np.float64,
+                               ai_count * AI_STATE_SIZE).reshape(ai_count, AI_STATE_SIZE)
+        old_angle, old_speed, angle_change, speed_change, think_tick, target_distance = ai_state[:, :6].T
+        old_left_turn, old_right_turn = ai_state[:, 6:].T.astype(np.bool_)
+        thinking = self.ai_scheduler.choose(self.tick, think_tick, target_distance)
+        thinking_numbers = ai_numbers[thinking]
+        thinking_ships = [ai_ships[index] for index in thinking.tolist()]
+        is_thinking = np.zeros(ai_count, dtype=np.bool_)
+        is_thinking[thinking] = True
+
+        # Find the closest ship to every thinking AI ship and the distance to it
+        # Ships never target their own team
+        targets, distances = find_closest_ships(x, y, is_ai, thinking_numbers, team)
+        has_target = targets >= 0
+
+        # If a thinking ship is below its max speed then accelerate it, each kind of ship has its own top speed
+        # The waiting ships speed up or slow down the same as they did the last time they thought
+        speed = old_speed + speed_change
+        max_speed = np.fromiter((ship.max_speed for ship in thinking_ships), np.float64, len(thinking))
+        thinking_speed = old_speed[thinking]
+        speed[thinking] = np.where(thinking_speed < max_speed, thinking_speed + ACCELERATION_RATE, thinking_speed)
+        turn = ANGLE_SPEED * speed
+
+        # Every ship turns away from the arena edge the same way whether it thinks this tick or not
+        angle, left_turn, right_turn, free = avoid_walls(x[ai_numbers], y[ai_numbers], old_angle, turn,
+                                                         old_left_turn, old_right_turn,
+                                                         self.ai_outer_rect, self.ai_inner_rect)
+
+        # Away from the edge the waiting ships turn the same as they did the last time they thought
+        # and the thinking ships turn towards or away from their closest ship
+        cached = np.flatnonzero(free & ~is_thinking)
+        angle[cached] = old_angle[cached] + angle_change[cached]
+        chasing = np.flatnonzero(free[thinking] & has_target)
+        chasing_ships = thinking[chasing]
+        chasing_targets = targets[chasing]
+        angle[chasing_ships] = turn_towards_targets(
+            x[thinking_numbers[chasing]], y[thinking_numbers[chasing]], old_angle[chasing_ships],
+            turn[chasing_ships], x[chasing_targets], y[chasing_targets], distances[chasing], self.max_aim_distance)
+
+        # Thinking AI ships whose weapon is ready shoot at their closest ship if they can reach it
+        weapon_ready = np.fromiter((ship.is_weapon_ready() for ship in thinking_ships), np.bool_, len(thinking))
+        ready = np.flatnonzero(has_target & weapon_ready)
+        if len(ready) > 0:
+            self.fire_at_targets([thinking_ships[index] for index in ready.tolist()], x[thinking_numbers[ready]],
+                                 y[thinking_numbers[ready]], targets[ready], x, y, ai_numbers, speed, angle)
+
+        # The thinking AI ships remember what they decided
+        for ship, distance, angle_change, speed_change in zip(
+                thinking_ships, distances.tolist(), (angle[thinking] - old_angle[thinking]).tolist(),
+                (speed[thinking] - old_speed[thinking]).tolist()):
+            ship.think_tick = self.tick
+            ship.target_distance = distance
+            ship.angle_change = angle_change
+            ship.speed_change = speed_change
+
+        # Give the AI ships their new speed, angle and turning
+        # Ships that are going straight on at the same speed are left alone
+        changed = np.flatnonzero((speed != old_speed) | (angle != old_angle) | (left_turn != old_left_turn) |
+                                 (right_turn != old_right_turn))
+        for ship, new_speed, new_angle, new_left_turn, new_right_turn in zip(
+                [ai_ships[index] for index in changed.tolist()], speed[changed].tolist(), angle[changed].tolist(),
+                left_turn[changed].tolist(), right_turn[changed].tolist()):
+            ship.speed = new_speed
+            ship.angle = new_angle
+            ship.left_turn = new_left_turn
+            ship.right_turn = new_right_turn
+
+    def fire_at_targets(self, shooters, shooter_x, shooter_y, targets, x, y, ai_numbers, ai_speed, ai_angle):
+        # Every shooter fires a torpedo at where it will meet its target, if it can reach it
+        # targets are the numbers of the targets in the ship_list, and x and y have one value for every ship
+        # Every AI ship moves with the new speed and angle worked out for it this tick
+        # So those are what AI targets are aimed at with, the player has already moved
+        ships = self.ship_list
+        target_speed = np.fromiter((ships[target].speed for target in targets.tolist()), np.float64, len(targets))
+        target_angle = np.fromiter((ships[target].angle for target in targets.tolist()), np.float64, len(targets))
+        ai_index = np.full(len(ships), -1)
+        ai_index[ai_numbers] = np.arange(len(ai_numbers))
+        target_ai = ai_index[targets]
+        is_ai = target_ai >= 0
+        target_speed[is_ai] = ai_speed[target_ai[is_ai]]
+        target_angle[is_ai] = ai_angle[target_ai[is_ai]]
+
+        target_radians = np.radians(target_angle)
+        angle, distance, fire = aim_at_intercepts(
+            shooter_x, shooter_y, x[targets], y[targets],
+            target_speed * np.cos(target_radians), target_speed * np.sin(target_radians),
+            self.torpedo_speed, self.max_aim_distance)
+
+        # If the distance to travel is smaller than the MIN_AIM_DISTANCE
+        # Then set it to the MIN_AIM_DISTANCE
+        # This helps prevent a ship from destroying itself
+        distance = np.maximum(distance, MIN_AIM_DISTANCE)
+        for index in np.flatnonzero(fire).tolist():
+            ship = shooters[index]
+            # The AI Ship fires a torpedo so reset it's cooldown_time
+            ship.fire_weapon()
+            self.fire_torpedo(float(angle[index]), ship.center_x, ship.center_y, float(distance[index]),
+                              ship.identifier)
+
+    def check_deaths(self):
+        # Check if a ship is dead and if so remove it
+        # Dead ships are despawned while looping over the ships and all removed together after the loop
+        for ship in self.ships:
+            if ship.is_dead():
+                self.ships.despawn(ship.handle)
+                remove_from_lists(ship, self.player_list)
+                self.collision_hash.remove(ship)
+                self.team_counts[ship.team] -= 1
+                if self.team_counts[ship.team] == 0:
+                    del self.team_counts[ship.team]
+
+                # If the player is dead or all the enemy ships are dead
+                # Then the game is over
+                result = get_game_result(self.team_counts, self.player_sprite, len(self.player_list) > 0)
+                if result is not None:
+                    self.result = result
+
+        self.ships.flush()
+
+        # If the game is over and one ship is left then that ship won
+        if self.result is not None and len(self.ship_list) == 1:
+            self.winner = self.ship_list[0].identifier
+
+    def update_bodies(self, delta_time):
+        # Update the bodies in these lists using the update function in their class
+        for ship in self.ship_list:
+            ship.on_update(self.width, self.height, delta_time)
+        if self.player_sprite is not None:
+            self.player_sprite.update()
+        # Move every torpedo, any that are off the arena are removed
+        # Then the slots of torpedoes that are gone are freed up
+        self.torpedoes.move(self.width, self.height)
+        self.torpedoes.compact()
@@ -0,0 +1,138 @@
+"""Importing key libraries"""
+import math
+
+
+class SpatialHash:
+    """Uniform Grid Of Cells For Finding Bodies That Are Near Each Other"""
+    # Every body is stored in the cell that its center is in
+    # To find what a body might collide with, only the cells around it have to be checked
+    # Instead of every other body in the game
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # A dictionary of cells, each cell is a dictionary used as an ordered set of the bodies in it
+        # Dictionaries keep their order so the results of a query are always in the same order
+        self.cells = {}
+        # The biggest collision radius of anything inserted so far
+        # Queries have to look this far past their own collision radius to not miss anything
+        self.max_collision_radius = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def cell_for(self, x, y):
+        # Return the key of the cell the point is in
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, body):
+        # Add a body to the cell its center is in
+        # The body remembers its cell and this hash so it can move itself when it moves
+        key = self.cell_for(body.center_x, body.center_y)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = {}
+        cell[body] = None
+        body.spatial_hash = self
+        body.spatial_hash_cell = key
+        self.count += 1
+
+        if body.collision_radius > self.max_collision_radius:
+            self.max_collision_radius = body.collision_radius
+
+    def insert_many(self, bodies):
+        # Add many bodies in the same order as inserting them one at a time would
+        # The lookups are done once instead of for every body, which matters for tens of thousands of bodies
+        cells = self.cells
+        cell_size = self.cell_size
+        floor = math.floor
+        max_collision_radius = self.max_collision_radius
+        for body in bodies:
+            key = (floor(body.center_x / cell_size), floor(body.center_y / cell_size))
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {}
+            cell[body] = None
+            body.spatial_hash = self
+            body.spatial_hash_cell = key
+            if body.collision_radius > max_collision_radius:
+                max_collision_radius = body.collision_radius
+        self.max_collision_radius = max_collision_radius
+        self.count += len(bodies)
+
+    def remove(self, body):
+        # Remove a body from its cell
+        # Empty cells are deleted so the dictionary doesn't grow as bodies move around
+        if body.spatial_hash is not self:
+            return
+        key = body.spatial_hash_cell
+        cell = self.cells[key]
+        del cell[body]
+        if not cell:
+            del self.cells[key]
+        body.spatial_hash = None
+        body.spatial_hash_cell = None
+        self.count -= 1
+
+    def move(self, body):
+        # This is called by a body when its center changes
+        # It is only moved to another cell if it crossed into one
+        key = self.cell_for(body.center_x, body.center_y)
+        if key != body.spatial_hash_cell:
+            cell = self.cells[body.spatial_hash_cell]
+            del cell[body]
+            if not cell:
+                del self.cells[body.spatial_hash_cell]
+
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = {}
+            cell[body] = None
+            body.spatial_hash_cell = key
+
+    def get_nearby(self, body):
+        # Return every body whose center is close enough that it could collide with the given body
+        # This is any body whose center is within both collision radii on the x and y axis
+        reach = body.collision_radius + self.max_collision_radius
+        min_x, min_y = self.cell_for(body.center_x - reach, body.center_y - reach)
+        max_x, max_y = self.cell_for(body.center_x + reach, body.center_y + reach)
+
+        nearby = []
+        cells = self.cells
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is not None:
+                    nearby.extend(cell)
+        return nearby
+
+    def get_in_rect(self, left, bottom, right, top):
+        # Return every body in a cell that overlaps the rectangle
+        # Bodies near the edges of the rectangle may be a little outside it
+        # Only the cells in the rectangle are looked at, so it doesn't matter how many bodies are outside it
+        min_x, min_y = self.cell_for(left, bottom)
+        max_x, max_y = self.cell_for(right, top)
+
+        bodies = []
+        cells = self.cells
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is not None:
+                    bodies.extend(cell)
+        return bodies
+
+    def check_for_collision(self, body, check, origin=None):
+        # Return every body that collides with the given body, using check to test each nearby body
+        # A body whose identifier is origin is left out, so a torpedo doesn't hit the ship that fired it
+        hit_list = []
+        for other in self.get_nearby(body):
+            if other is body:
+                continue
+            if origin is not None and other.identifier == origin:
+                continue
+            if check(body, other):
+                hit_list.append(other)
+        return hit_list
@@ -0,0 +1,72 @@
+"""Importing key libraries"""
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from ScenarioFile import load_scenario, create_simulation
+
+
+"""Defining Constants"""
+# Spawn Benchmark Constants
+SPAWN_SCENARIO = "Scenarios/FiftyThousand.json"
+SPAWN_REPEATS = 5
+# The most milliseconds loading the scenario and spawning its ships can take
+SPAWN_BUDGET_MS = 1000
+
+
+def measure_spawn(file_name, repeats):
+    # Return the times to read the scenario and to make its Simulation, and the number of ships it has
+    load_times = []
+    spawn_times = []
+    ship_count = 0
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        scenario = load_scenario(file_name)
+        loaded = time.perf_counter_ns()
+        simulation = create_simulation(scenario)
+        spawned = time.perf_counter_ns()
+        load_times.append((loaded - start) / 1e6)
+        spawn_times.append((spawned - loaded) / 1e6)
+        ship_count = len(simulation.ship_list)
+    return np.array(load_times), np.array(spawn_times), ship_count
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time loading a scenario file and spawning its fleets")
+    parser.add_argument("scenario", nargs="?", default=SPAWN_SCENARIO)
+    parser.add_argument("--repeats", type=int, default=SPAWN_REPEATS)
+    parser.add_argument("--budget", type=float, default=SPAWN_BUDGET_MS, help="milliseconds")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    load_times, spawn_times, ship_count = measure_spawn(arguments.scenario, arguments.repeats)
+    total_times = load_times + spawn_times
+    # The median is compared against the budget so one slow run doesn't fail it
+    results = {
+        "scenario": arguments.scenario,
+        "ships": ship_count,
+        "load_ms": float(np.median(load_times)),
+        "spawn_ms": float(np.median(spawn_times)),
+        "total_ms": float(np.median(total_times)),
+        "max_total_ms": float(total_times.max()),
+        "budget_ms": arguments.budget,
+    }
+    results["passed"] = results["total_ms"] <= arguments.budget
+    print("{} ships  load {:.1f} ms  spawn {:.1f} ms  total {:.1f} ms  budget {:.0f} ms  {}".format(
+        ship_count, results["load_ms"], results["spawn_ms"], results["total_ms"], arguments.budget,
+        "ok" if results["passed"] else "FAILED"))
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    # Exits with 1 if it is over the budget, so it can be run in CI
+    return 0 if results["passed"] else 1
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
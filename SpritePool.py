@@ -0,0 +1,63 @@
+"""Defining Constants"""
+# Pool Constants
+# The number of sprites a pool makes when it is created
+POOL_CAPACITY = 256
+# When a pool runs out of sprites its capacity is multiplied by this
+POOL_GROWTH = 2
+
+
+class SpritePool:
+    """Keeps Sprites That Aren't In Use So They Can Be Used Again"""
+    # Making a sprite every time a torpedo is fired or explodes causes lots of allocations
+    # Instead every sprite is made up front and kept in a free list
+    # acquire() takes a sprite out of the free list and release() puts it back
+    # hits counts the sprites that came from the free list and misses the ones that had to be made
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, create_sprite, reset_sprite, capacity=POOL_CAPACITY, growth=POOL_GROWTH):
+        # create_sprite makes a new sprite and reset_sprite sets a sprite back to how it was when it was made
+        self.create_sprite = create_sprite
+        self.reset_sprite = reset_sprite
+        # If growth is 1 or less the pool never grows
+        # A sprite made when it is empty is used once and not kept when it is released
+        self.growth = growth
+        self.capacity = 0
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.grow(capacity)
+
+    def __len__(self):
+        return len(self.free)
+
+    def grow(self, capacity):
+        # Make enough sprites for the pool to hold capacity sprites
+        self.free.extend(self.create_sprite() for _ in range(capacity - self.capacity))
+        self.capacity = capacity
+
+    def acquire(self):
+        # Return a sprite that is ready to use
+        # It is reset when it is taken out, so it doesn't matter what was done to it before it was released
+        if self.free:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if self.growth > 1:
+                self.grow(max(int(self.capacity * self.growth), self.capacity + 1))
+            else:
+                return self.create_sprite()
+
+        sprite = self.free.pop()
+        self.reset_sprite(sprite)
+        return sprite
+
+    def release(self, sprite):
+        # Put a sprite that isn't needed any more back in the pool
+        # If the pool is already full the sprite is dropped
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+
+    def get_stats(self):
+        # Return how the pool has been used so far
+        return {"capacity": self.capacity, "free": len(self.free), "hits": self.hits, "misses": self.misses}
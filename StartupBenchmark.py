@@ -0,0 +1,144 @@
+"""Importing key libraries"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import arcade
+import numpy as np
+import PIL.Image
+import Window
+from Assets import AssetLoader, ASSET_IMAGES, load_images
+
+
+"""Defining Constants"""
+# Startup Benchmark Constants
+STARTUP_WIDTH = 1920
+STARTUP_HEIGHT = 1080
+# The number of times the images are loaded each way and the number of games restarted
+LOAD_REPEATS = 20
+RESTART_REPEATS = 20
+# The most frames the BufferView is given to show the menu, in case something has gone wrong
+MAX_BUFFER_FRAMES = 600
+# Before the images were loaded on another thread, the menu was shown after this long whatever happened
+OLD_BUFFER_SECONDS = 0.5
+
+
+def load_separate_images():
+    # Load every image from its own file and work out its hit box, as arcade.load_texture did before the atlas
+    for file_name in ASSET_IMAGES:
+        with PIL.Image.open(file_name) as image:
+            arcade.calculate_hit_box_points_simple(image.convert("RGBA"))
+
+
+def time_call(function, repeats):
+    # Return the time of each call in milliseconds
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        function()
+        times.append((time.perf_counter_ns() - start) / 1e6)
+    return np.array(times)
+
+
+def measure_loading(repeats):
+    # Return the times to load the images from their own files, to pack them into an atlas and to read a cached atlas
+    cache_directory = tempfile.mkdtemp()
+    try:
+        def pack():
+            shutil.rmtree(cache_directory, ignore_errors=True)
+            load_images(cache_directory=cache_directory)
+
+        times = {"separate_files": time_call(load_separate_images, repeats), "atlas_packed": time_call(pack, repeats)}
+        times["atlas_cached"] = time_call(lambda: load_images(cache_directory=cache_directory), repeats)
+    finally:
+        shutil.rmtree(cache_directory, ignore_errors=True)
+    return times
+
+
+def draw_frame(window):
+    # Update and draw the window's View and wait for the GPU to finish drawing it
+    window.dispatch_events()
+    window.current_view.on_update(1 / 60)
+    window.current_view.on_draw()
+    window.flip()
+
+
+def measure_time_to_menu(width, height):
+    # Return the milliseconds from opening the window to the first frame of the menu being drawn
+    # Nothing has been loaded yet, like when the game is started
+    Window.textures.clear()
+    Window.label_textures.clear()
+    Window.sprite_pools.clear()
+    Window.asset_loader = AssetLoader()
+    start = time.perf_counter_ns()
+    Window.asset_loader.start()
+    window = arcade.Window(width, height, "Startup Benchmark")
+    window.show_view(Window.BufferView())
+    for _ in range(MAX_BUFFER_FRAMES):
+        draw_frame(window)
+        if isinstance(window.current_view, Window.MenuView):
+            break
+    draw_frame(window)
+    return window, (time.perf_counter_ns() - start) / 1e6
+
+
+def measure_restarts(window, repeats):
+    # Return the milliseconds from clicking on the game over screen to the first frame of the new game being drawn
+    times = []
+    for _ in range(repeats):
+        game_over_view = Window.GameOverView()
+        game_over_view.text = "You Lost!"
+        window.show_view(game_over_view)
+        draw_frame(window)
+        start = time.perf_counter_ns()
+        game_over_view.on_mouse_press(0, 0, arcade.MOUSE_BUTTON_LEFT, 0)
+        draw_frame(window)
+        times.append((time.perf_counter_ns() - start) / 1e6)
+        window.current_view.release_sprites()
+    return np.array(times)
+
+
+def summarise(times):
+    return {"mean_ms": float(times.mean()), "p95_ms": float(np.percentile(times, 95))}
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Time loading the images, showing the menu and restarting a game")
+    parser.add_argument("--load-repeats", type=int, default=LOAD_REPEATS)
+    parser.add_argument("--restarts", type=int, default=RESTART_REPEATS)
+    parser.add_argument("--width", type=int, default=STARTUP_WIDTH)
+    parser.add_argument("--height", type=int, default=STARTUP_HEIGHT)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    results = {"loading": {}}
+    for name, times in measure_loading(arguments.load_repeats).items():
+        results["loading"][name] = summarise(times)
+        print("{:15} {:9.3f} ms  p95 {:9.3f} ms".format(name, times.mean(), np.percentile(times, 95)), flush=True)
+
+    window, time_to_menu = measure_time_to_menu(arguments.width, arguments.height)
+    results["time_to_menu_ms"] = time_to_menu
+    results["old_buffer_ms"] = OLD_BUFFER_SECONDS * 1000
+    print("time to menu    {:9.3f} ms  (the menu used to wait at least {:.0f} ms)".format(
+        time_to_menu, OLD_BUFFER_SECONDS * 1000), flush=True)
+
+    restart_times = measure_restarts(window, arguments.restarts)
+    results["restart"] = summarise(restart_times)
+    print("restart         {:9.3f} ms  p95 {:9.3f} ms".format(restart_times.mean(), np.percentile(restart_times, 95)),
+          flush=True)
+    window.close()
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
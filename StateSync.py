@@ -0,0 +1,400 @@
+"""Importing key libraries"""
+import itertools
+import operator
+import struct
+import numpy as np
+
+
+"""Defining Constants"""
+# State Sync Constants
+SYNC_VERSION = 1
+# The version, the sequence number of the snapshot, the sequence number of the snapshot it is a change from
+# and the tick of the snapshot
+SYNC_PREFIX = struct.Struct("<BIII")
+# The baseline of a message that has the whole state, as the client has no snapshot to change
+NO_BASELINE = 0xFFFFFFFF
+# The bit width of a packed list of values is written in this many bits
+WIDTH_BITS = 7
+# An encoder keeps at most this many snapshots the client hasn't acknowledged yet
+MAX_PENDING_SNAPSHOTS = 120
+
+# Quantization Constants
+# Positions are sent in 1/POSITION_SCALE pixels
+POSITION_SCALE = 8
+# Angles are sent as one of ANGLE_STEPS steps around a circle
+ANGLE_STEPS = 4096
+# An explosion's size is sent as one of SCALE_STEPS steps from nothing to the size it started at
+SCALE_STEPS = 255
+# The bits of a ship's flags
+PLAYER_FLAG = 1
+
+# The fields sent for each kind of entity, and the number a field wraps around at if it does
+# Every field is a whole number once it is quantized
+ENTITY_FIELDS = {
+    "ships": (("x", None), ("y", None), ("angle", ANGLE_STEPS), ("hp", None), ("max_hp", None),
+              ("image_number", None), ("flags", None)),
+    "torpedoes": (("x", None), ("y", None), ("angle", ANGLE_STEPS), ("origin", None)),
+    "explosions": (("x", None), ("y", None), ("scale", None)),
+}
+# How each field is turned back into the number the game uses
+FIELD_SCALES = {"x": POSITION_SCALE, "y": POSITION_SCALE, "angle": ANGLE_STEPS / 360, "scale": SCALE_STEPS}
+# The attributes read from every ship for a snapshot
+GET_SHIP_STATE = operator.attrgetter("identifier", "center_x", "center_y", "angle", "hp", "max_hp", "image_number")
+
+
+def zigzag(values):
+    # Turn signed whole numbers into unsigned ones so small negative numbers stay small, -1 is 1 and 1 is 2
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def unzigzag(values):
+    # Undo zigzag
+    values = np.asarray(values, dtype=np.uint64)
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def get_bit_width(values):
+    # Return the number of bits the biggest of the unsigned values needs
+    return int(values.max()).bit_length() if len(values) else 0
+
+
+class BitWriter:
+    """Packs Lists Of Whole Numbers Into As Few Bits As They Need"""
+    # Each list is turned into an array of bits in one go, and the bits are packed into bytes at the end
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, values, width):
+        # Write every unsigned value in width bits, most significant bit first
+        values = np.asarray(values, dtype=np.uint64)
+        if width == 0 or len(values) == 0:
+            return
+        shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+        self.chunks.append(((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8).ravel())
+
+    def write_number(self, value):
+        # Write one unsigned number with its width in front of it
+        width = int(value).bit_length()
+        self.write([width], WIDTH_BITS)
+        self.write([value], width)
+
+    def write_packed(self, values):
+        # Write unsigned values all in the width the biggest of them needs, with the width in front of them
+        width = get_bit_width(values)
+        self.write([width], WIDTH_BITS)
+        self.write(values, width)
+
+    def write_sorted(self, values):
+        # Write a list of different unsigned numbers in order, as the first one and the gaps between them
+        self.write_number(len(values))
+        if len(values):
+            self.write_number(values[0])
+            self.write_packed(np.diff(values) - 1)
+
+    def get_bytes(self):
+        if not self.chunks:
+            return b""
+        return np.packbits(np.concatenate(self.chunks)).tobytes()
+
+
+class BitReader:
+    """Reads What A BitWriter Wrote"""
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, data):
+        self.bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        self.position = 0
+
+    def read(self, count, width):
+        # Read count unsigned values that were written in width bits
+        if width == 0 or count == 0:
+            return np.zeros(count, dtype=np.uint64)
+        end = self.position + count * width
+        if end > len(self.bits):
+            raise ValueError("State sync message is too short")
+        bits = self.bits[self.position:end].reshape(count, width).astype(np.uint64)
+        self.position = end
+        return (bits << np.arange(width - 1, -1, -1, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+    def read_number(self):
+        return int(self.read(1, int(self.read(1, WIDTH_BITS)[0]))[0])
+
+    def read_packed(self, count):
+        return self.read(count, int(self.read(1, WIDTH_BITS)[0]))
+
+    def read_sorted(self):
+        count = self.read_number()
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        first = self.read_number()
+        gaps = self.read_packed(count - 1).astype(np.int64) + 1
+        return np.concatenate(([first], first + np.cumsum(gaps))).astype(np.int64)
+
+
+class EntityTable:
+    """The Quantized Fields Of Every Entity Of One Kind, In Order Of Their Ids"""
+    __slots__ = ("ids", "fields")
+
+    def __init__(self, ids, fields):
+        self.ids = ids
+        # A dictionary of an array of whole numbers for each field
+        self.fields = fields
+
+    @classmethod
+    def empty(cls, kind):
+        return cls(np.zeros(0, dtype=np.int64),
+                   {name: np.zeros(0, dtype=np.int64) for name, _ in ENTITY_FIELDS[kind]})
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __eq__(self, other):
+        return (np.array_equal(self.ids, other.ids)
+                and all(np.array_equal(values, other.fields[name]) for name, values in self.fields.items()))
+
+
+class Snapshot:
+    """The State Of A Game At One Tick, As It Is Sent To A Client"""
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, tick, tables, sequence=0):
+        self.tick = tick
+        # A dictionary of the EntityTable of each kind of entity
+        self.tables = tables
+        # The number of snapshots the encoder made before this one
+        self.sequence = sequence
+
+    def __eq__(self, other):
+        return self.tick == other.tick and all(table == other.tables[kind] for kind, table in self.tables.items())
+
+    def get_entity_count(self):
+        return sum(len(table) for table in self.tables.values())
+
+    def get_values(self, kind):
+        # Return the ids and fields of every entity of one kind in the units the game uses
+        table = self.tables[kind]
+        return table.ids, {name: values / FIELD_SCALES[name] if name in FIELD_SCALES else values
+                           for name, values in table.fields.items()}
+
+
+def make_table(ids, fields):
+    # Return an EntityTable of the entities sorted by id
+    order = np.argsort(ids, kind="stable")
+    return EntityTable(ids[order], {name: values[order] for name, values in fields.items()})
+
+
+def quantize_angle(angle):
+    return np.rint(np.asarray(angle) % 360 * (ANGLE_STEPS / 360)).astype(np.int64) % ANGLE_STEPS
+
+
+def quantize_position(position):
+    return np.rint(np.asarray(position) * POSITION_SCALE).astype(np.int64)
+
+
+def take_snapshot(simulation, sequence=0):
+    # Return a Snapshot of every ship, torpedo and explosion in the Simulation
+    ships = simulation.ship_list
+    ship_state = np.fromiter(itertools.chain.from_iterable(map(GET_SHIP_STATE, ships)), np.float64,
+                             len(ships) * 7).reshape(len(ships), 7)
+    ship_ids = ship_state[:, 0].astype(np.int64)
+    player = simulation.player_sprite
+    is_player = np.zeros(len(ships), dtype=np.int64)
+    if player is not None and player in simulation.player_list:
+        is_player = (ship_ids == player.identifier).astype(np.int64)
+
+    torpedoes = simulation.torpedoes
+    torpedo_count = torpedoes.count
+    explosions = simulation.explosions
+    explosion_count = explosions.count
+    return Snapshot(simulation.tick, {
+        "ships": make_table(ship_ids, {
+            "x": quantize_position(ship_state[:, 1]),
+            "y": quantize_position(ship_state[:, 2]),
+            "angle": quantize_angle(ship_state[:, 3]),
+            "hp": ship_state[:, 4].astype(np.int64),
+            "max_hp": ship_state[:, 5].astype(np.int64),
+            "image_number": ship_state[:, 6].astype(np.int64),
+            "flags": is_player * PLAYER_FLAG,
+        }),
+        # Torpedoes and explosions are kept in the order they were spawned, which is the order of their numbers
+        "torpedoes": EntityTable(torpedoes.number[:torpedo_count].copy(), {
+            "x": quantize_position(torpedoes.x[:torpedo_count]),
+            "y": quantize_position(torpedoes.y[:torpedo_count]),
+            "angle": quantize_angle(torpedoes.angle[:torpedo_count]),
+            "origin": torpedoes.origin[:torpedo_count].copy(),
+        }),
+        "explosions": EntityTable(explosions.number[:explosion_count].copy(), {
+            "x": quantize_position(explosions.x[:explosion_count]),
+            "y": quantize_position(explosions.y[:explosion_count]),
+            "scale": np.rint(explosions.get_scale(SCALE_STEPS)).astype(np.int64),
+        }),
+    }, sequence)
+
+
+def find_sorted(ids, other_ids):
+    # Return which of the sorted ids are also in the sorted other_ids
+    if len(other_ids) == 0:
+        return np.zeros(len(ids), dtype=np.bool_)
+    index = np.minimum(np.searchsorted(other_ids, ids), len(other_ids) - 1)
+    return other_ids[index] == ids
+
+
+def get_deltas(new_values, old_values, modulo):
+    # Return the change of each value, a value that wraps around changes the short way round
+    deltas = new_values - old_values
+    if modulo is not None:
+        deltas %= modulo
+        deltas[deltas >= modulo // 2] -= modulo
+    return deltas
+
+
+def encode_table(writer, table, baseline, fields):
+    # Write the changes from the baseline to the table
+    # First the entities that are gone, as their indexes in the baseline
+    # Then the new entities with all of their fields
+    # Then a bit for each entity left saying if it changed, and for those that did a bit for each field
+    # and the change of each field that changed
+    kept_old = find_sorted(baseline.ids, table.ids)
+    kept_new = find_sorted(table.ids, baseline.ids)
+    writer.write_sorted(np.flatnonzero(~kept_old))
+
+    spawned = ~kept_new
+    writer.write_sorted(table.ids[spawned])
+    for name, _ in fields:
+        writer.write_packed(zigzag(table.fields[name][spawned]))
+
+    deltas = [get_deltas(table.fields[name][kept_new], baseline.fields[name][kept_old], modulo)
+              for name, modulo in fields]
+    changed = np.column_stack(deltas) != 0 if deltas else np.zeros((0, 0), dtype=np.bool_)
+    any_changed = changed.any(axis=1)
+    writer.write(any_changed, 1)
+    changed = changed[any_changed]
+    writer.write(changed.ravel(), 1)
+    for field, field_deltas in enumerate(deltas):
+        writer.write_packed(zigzag(field_deltas[any_changed][changed[:, field]]))
+
+
+def decode_table(reader, baseline, fields):
+    # Read what encode_table wrote and return the new EntityTable
+    kept = np.ones(len(baseline), dtype=np.bool_)
+    kept[reader.read_sorted()] = False
+
+    spawned_ids = reader.read_sorted()
+    spawned_fields = {name: unzigzag(reader.read_packed(len(spawned_ids))) for name, _ in fields}
+
+    kept_count = int(np.count_nonzero(kept))
+    any_changed = reader.read(kept_count, 1).astype(np.bool_)
+    changed = np.zeros((kept_count, len(fields)), dtype=np.bool_)
+    changed[any_changed] = reader.read(int(np.count_nonzero(any_changed)) * len(fields), 1) \
+        .astype(np.bool_).reshape(-1, len(fields))
+
+    new_fields = {}
+    for field, (name, modulo) in enumerate(fields):
+        values = baseline.fields[name][kept]
+        field_changed = changed[:, field]
+        values[field_changed] += unzigzag(reader.read_packed(int(np.count_nonzero(field_changed))))
+        if modulo is not None:
+            values %= modulo
+        new_fields[name] = np.concatenate((values, spawned_fields[name]))
+    kept_ids = baseline.ids[kept]
+    ids = np.concatenate((kept_ids, spawned_ids))
+
+    # New ids are usually bigger than every old one, then the entities are already in order
+    if len(spawned_ids) and len(kept_ids) and spawned_ids[0] < kept_ids[-1]:
+        return make_table(ids, new_fields)
+    return EntityTable(ids, new_fields)
+
+
+def encode_snapshot(snapshot, baseline=None):
+    # Return a message with the changes from the baseline snapshot to the snapshot
+    # Without a baseline the message has the whole snapshot
+    writer = BitWriter()
+    for kind, fields in ENTITY_FIELDS.items():
+        base_table = baseline.tables[kind] if baseline is not None else EntityTable.empty(kind)
+        encode_table(writer, snapshot.tables[kind], base_table, fields)
+    prefix = SYNC_PREFIX.pack(SYNC_VERSION, snapshot.sequence,
+                              NO_BASELINE if baseline is None else baseline.sequence, snapshot.tick)
+    return prefix + writer.get_bytes()
+
+
+def decode_snapshot(data, baseline=None):
+    # Return the Snapshot in a message made by encode_snapshot from the same baseline
+    reader = BitReader(memoryview(data)[SYNC_PREFIX.size:])
+    _, sequence, _, tick = SYNC_PREFIX.unpack_from(data)
+    tables = {}
+    for kind, fields in ENTITY_FIELDS.items():
+        base_table = baseline.tables[kind] if baseline is not None else EntityTable.empty(kind)
+        tables[kind] = decode_table(reader, base_table, fields)
+    return Snapshot(tick, tables, sequence)
+
+
+class StateEncoder:
+    """Sends The Changes Since The Last Snapshot A Client Acknowledged"""
+    # Every message is a change from the newest snapshot the client said it has
+    # So a lost message doesn't matter, the next one is a change from the same snapshot or a newer one
+    # Snapshots are known by their sequence number rather than their tick, as a game that has ended
+    # or is paused can be sent more than once at the same tick
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        # The snapshots sent that the client might still acknowledge, by sequence number
+        self.snapshots = {}
+        self.next_sequence = 0
+        # The sequence number of the newest snapshot the client has acknowledged
+        self.acknowledged = None
+
+    def encode(self, simulation):
+        # Return the message for the Simulation's current state
+        snapshot = take_snapshot(simulation, self.next_sequence)
+        self.next_sequence += 1
+        data = encode_snapshot(snapshot, self.snapshots.get(self.acknowledged))
+        self.snapshots[snapshot.sequence] = snapshot
+
+        # If the client has stopped acknowledging, the oldest snapshots are forgotten
+        # The acknowledged snapshot is kept as the next messages are changes from it
+        if len(self.snapshots) > MAX_PENDING_SNAPSHOTS:
+            del self.snapshots[min(sequence for sequence in self.snapshots if sequence != self.acknowledged)]
+        return data
+
+    def acknowledge(self, sequence):
+        # The client has this snapshot, so every snapshot before it is forgotten
+        if sequence in self.snapshots and (self.acknowledged is None or sequence > self.acknowledged):
+            self.acknowledged = sequence
+            self.snapshots = {old: snapshot for old, snapshot in self.snapshots.items() if old >= sequence}
+
+
+class StateDecoder:
+    """Turns The Messages Of A StateEncoder Back Into Snapshots"""
+    # After decoding a snapshot the client should acknowledge its sequence number
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        # The snapshots the encoder might send changes from, by sequence number
+        self.snapshots = {}
+
+    def decode(self, data):
+        # Return the Snapshot in the message
+        # A message from a baseline that has been forgotten, which can only happen if it arrived late, can't be read
+        version, sequence, baseline_sequence, _ = SYNC_PREFIX.unpack_from(data)
+        if version != SYNC_VERSION:
+            raise ValueError("State sync version {} is not supported".format(version))
+        baseline = None
+        if baseline_sequence != NO_BASELINE:
+            baseline = self.snapshots.get(baseline_sequence)
+            if baseline is None:
+                raise ValueError("Snapshot {} has been forgotten".format(baseline_sequence))
+
+        snapshot = decode_snapshot(data, baseline)
+        self.snapshots[sequence] = snapshot
+        # The encoder never goes back to a snapshot older than one it has made a change from
+        if baseline is not None:
+            self.snapshots = {old: kept for old, kept in self.snapshots.items() if old >= baseline_sequence}
+        return snapshot
@@ -0,0 +1,150 @@
+"""Importing key libraries"""
+import argparse
+import collections
+import json
+import random
+import sys
+import time
+import numpy as np
+from Benchmark import ARENA_WIDTH, ARENA_HEIGHT, UNKILLABLE_HP, fire_random_torpedoes
+from Simulation import Simulation
+from StateSync import StateEncoder, StateDecoder, ENTITY_FIELDS, encode_snapshot, take_snapshot
+
+
+"""Defining Constants"""
+# Sync Benchmark Constants
+# The number of entities in each scenario and the ticks it is run for
+SYNC_SCENARIOS = ((10, 600), (1000, 120), (10000, 30))
+# A quarter of the entities are torpedoes, the rest are ships, explosions come from the torpedoes that hit
+TORPEDO_FRACTION = 0.25
+# The number of ticks a message takes to get to the client, and an acknowledgement to get back
+LOOPBACK_LATENCY = 3
+# The fraction of messages and acknowledgements that are lost
+LOOPBACK_LOSS = 0.05
+# A full state is every field of every entity as a float64
+FULL_STATE_FIELD_BYTES = 8
+
+
+def create_scenario(entities):
+    # Return a Simulation with the ships of the scenario, which never die
+    ships = max(1, round(entities * (1 - TORPEDO_FRACTION)))
+    simulation = Simulation(ARENA_WIDTH, ARENA_HEIGHT, ships - 1)
+    for ship in simulation.ship_list:
+        ship.hp = ship.max_hp = UNKILLABLE_HP
+    return simulation
+
+
+def get_full_state_bytes(snapshot):
+    # Return the size of every field of every entity sent as a float64 with a float64 id
+    return sum(len(snapshot.tables[kind]) * (len(fields) + 1) * FULL_STATE_FIELD_BYTES
+               for kind, fields in ENTITY_FIELDS.items())
+
+
+def run_loopback(simulation, ticks, latency, loss, rng, torpedoes=0):
+    # Send the state of every tick through an encoder and decoder, as if over a network
+    # Messages and acknowledgements take latency ticks to arrive and some of them are lost
+    # Every decoded snapshot is checked against the snapshot the encoder made
+    # Returns the size of every message and how long each encode and decode took in nanoseconds
+    encoder = StateEncoder()
+    decoder = StateDecoder()
+    to_client = collections.deque()
+    to_server = collections.deque()
+    expected = {}
+    results = {"message_bytes": [], "full_state_bytes": [], "full_message_bytes": [], "entities": [],
+               "encode_ns": [], "decode_ns": [], "delivered": 0, "lost": 0, "undecodable": 0, "mismatches": 0}
+
+    for tick in range(ticks):
+        if torpedoes:
+            fire_random_torpedoes(simulation, rng, max(torpedoes - simulation.torpedoes.count, 0))
+        simulation.on_update(simulation.tick_time)
+
+        start = time.perf_counter_ns()
+        data = encoder.encode(simulation)
+        results["encode_ns"].append(time.perf_counter_ns() - start)
+        snapshot = encoder.snapshots[encoder.next_sequence - 1]
+        expected[snapshot.sequence] = snapshot
+        results["message_bytes"].append(len(data))
+        results["full_state_bytes"].append(get_full_state_bytes(snapshot))
+        results["entities"].append(snapshot.get_entity_count())
+        if rng.random() < loss:
+            results["lost"] += 1
+        else:
+            to_client.append((tick + latency, data))
+
+        # Deliver the messages and acknowledgements that have arrived
+        while to_client and to_client[0][0] <= tick:
+            data = to_client.popleft()[1]
+            start = time.perf_counter_ns()
+            try:
+                decoded = decoder.decode(data)
+            except ValueError:
+                results["undecodable"] += 1
+                continue
+            results["decode_ns"].append(time.perf_counter_ns() - start)
+            results["delivered"] += 1
+            if not decoded == expected.pop(decoded.sequence):
+                results["mismatches"] += 1
+            if rng.random() >= loss:
+                to_server.append((tick + latency, decoded.sequence))
+        while to_server and to_server[0][0] <= tick:
+            encoder.acknowledge(to_server.popleft()[1])
+
+    # The size of the whole state in one message, which is what a client that has nothing is sent
+    results["full_message_bytes"].append(len(encode_snapshot(take_snapshot(simulation))))
+    return results
+
+
+def summarise(results):
+    message_bytes = np.array(results["message_bytes"], dtype=np.float64)
+    return {
+        "mean_entities": float(np.mean(results["entities"])),
+        "mean_bytes_per_tick": float(message_bytes.mean()),
+        "p95_bytes_per_tick": float(np.percentile(message_bytes, 95)),
+        "mean_full_state_bytes": float(np.mean(results["full_state_bytes"])),
+        "full_message_bytes": results["full_message_bytes"][0],
+        "compression": float(np.mean(results["full_state_bytes"]) / message_bytes.mean()),
+        "mean_encode_ms": float(np.mean(results["encode_ns"]) / 1e6),
+        "mean_decode_ms": float(np.mean(results["decode_ns"]) / 1e6) if results["decode_ns"] else None,
+        "delivered": results["delivered"],
+        "lost": results["lost"],
+        "undecodable": results["undecodable"],
+        "mismatches": results["mismatches"],
+    }
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Measure the state sync messages of games of different sizes")
+    parser.add_argument("--latency", type=int, default=LOOPBACK_LATENCY, help="ticks each way")
+    parser.add_argument("--loss", type=float, default=LOOPBACK_LOSS, help="fraction of messages lost each way")
+    parser.add_argument("--tick-scale", type=float, default=1, help="multiply the ticks of every scenario by this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    results = {"latency": arguments.latency, "loss": arguments.loss, "scenarios": {}}
+    failed = False
+    for entities, ticks in SYNC_SCENARIOS:
+        rng = random.Random(arguments.seed)
+        simulation = create_scenario(entities)
+        summary = summarise(run_loopback(simulation, max(5, int(ticks * arguments.tick_scale)), arguments.latency,
+                                         arguments.loss, rng, round(entities * TORPEDO_FRACTION)))
+        results["scenarios"][entities] = summary
+        failed |= summary["mismatches"] > 0
+        print("{:6} entities {:10.1f} bytes/tick  full state {:10.1f} bytes  {:6.1f}x  encode {:7.3f} ms  "
+              "decode {:7.3f} ms  mismatches {}".format(
+                  entities, summary["mean_bytes_per_tick"], summary["mean_full_state_bytes"], summary["compression"],
+                  summary["mean_encode_ms"], summary["mean_decode_ms"] or 0, summary["mismatches"]), flush=True)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    # Any decoded snapshot that isn't what was encoded is a failure
+    return 1 if failed else 0
+
+
+# Runs main()
+if __name__ == "__main__":
+    sys.exit(main())
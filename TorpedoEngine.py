@@ -0,0 +1,275 @@
+"""Importing key libraries"""
+import numpy as np
+from Geometry import rotate_point, get_heading, get_hit_box_radius
+from GridSearch import find_close_pairs
+
+
+def are_hit_boxes_intersecting(boxes_a, boxes_b):
+    # The same separating axis check as are_polygons_intersecting, for many pairs of hit boxes at once
+    # boxes_a and boxes_b are arrays with the points of one hit box for every pair
+    # Every projection is worked out with the same sums in the same order, so the answers are exactly the same
+    # The points are put in rows with a column for each pair
+    # So finding the smallest and biggest projection is done across whole rows
+    pairs = np.arange(len(boxes_a))
+    a_x = np.ascontiguousarray(boxes_a[:, :, 0].T)
+    a_y = np.ascontiguousarray(boxes_a[:, :, 1].T)
+    b_x = np.ascontiguousarray(boxes_b[:, :, 0].T)
+    b_y = np.ascontiguousarray(boxes_b[:, :, 1].T)
+    for side in range(2):
+        x, y = (a_x, a_y) if side == 0 else (b_x, b_y)
+        overlapping = np.ones(len(pairs), dtype=np.bool_)
+        for i1 in range(len(x)):
+            i2 = (i1 + 1) % len(x)
+            normal_x = y[i2] - y[i1]
+            normal_y = x[i1] - x[i2]
+
+            # Project both hit boxes onto the normal of this edge
+            projected_a = normal_x * a_x + normal_y * a_y
+            projected_b = normal_x * b_x + normal_y * b_y
+            overlapping &= ((projected_a.max(axis=0) > projected_b.min(axis=0))
+                            & (projected_b.max(axis=0) > projected_a.min(axis=0)))
+
+        # Only the pairs that no normal separated are checked against the normals of the other hit box
+        pairs = pairs[overlapping]
+        a_x, a_y, b_x, b_y = a_x[:, overlapping], a_y[:, overlapping], b_x[:, overlapping], b_y[:, overlapping]
+
+    intersecting = np.zeros(len(boxes_a), dtype=np.bool_)
+    intersecting[pairs] = True
+    return intersecting
+
+
+class TorpedoEngine:
+    """Holds Every Torpedo In NumPy Arrays"""
+    # Each torpedo is a slot with the same index in every array
+    # So moving, running out of range and leaving the arena are done for every torpedo at once
+    # New torpedoes are added to the end and compact() removes dead ones while keeping the order they were fired
+    # Collisions are found for every torpedo at once too, first by distance and then by hit box
+
+    # The names of the arrays, used to save and load every torpedo
+    ARRAY_NAMES = ("x", "y", "change_x", "change_y", "angle", "range_left", "origin", "number", "alive", "hit_boxes",
+                   "left_offset", "right_offset", "bottom_offset", "top_offset")
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, speed, size, hit_box, scale, capacity=256):
+        self.speed = speed
+        self.scale = scale
+        # The furthest the hit box of a torpedo reaches from its center, at any angle
+        self.hit_box_radius = get_hit_box_radius(hit_box, scale)
+        # The hit box scaled to the torpedo's size
+        if scale != 1:
+            self.hit_box = tuple((point[0] * scale, point[1] * scale) for point in hit_box)
+        else:
+            self.hit_box = hit_box
+
+        # The number of slots in use
+        self.count = 0
+        self.capacity = 0
+        # The number of torpedoes ever spawned, the next torpedo is given this as its number
+        self.spawned = 0
+
+        # Create the arrays
+        self.x = None
+        self.y = None
+        self.change_x = None
+        self.change_y = None
+        self.angle = None
+        # How much further the torpedo can go before it explodes
+        self.range_left = None
+        # The identifier of the ship that fired it
+        self.origin = None
+        # The number of torpedoes spawned before it, which no other torpedo in the game has
+        self.number = None
+        self.alive = None
+        # The hit box of each torpedo rotated to its angle, it only has to be moved to be used
+        self.hit_boxes = None
+        # How far each side of the rotated hit box is from the torpedo's center
+        # These are used to find when a torpedo has left the arena
+        self.left_offset = None
+        self.right_offset = None
+        self.bottom_offset = None
+        self.top_offset = None
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity):
+        # Make every array big enough for capacity torpedoes, keeping the torpedoes already in them
+        def resize(array, dtype, shape=()):
+            new_array = np.zeros((capacity,) + shape, dtype=dtype)
+            if array is not None:
+                new_array[:self.count] = array[:self.count]
+            return new_array
+
+        self.x = resize(self.x, np.float64)
+        self.y = resize(self.y, np.float64)
+        self.change_x = resize(self.change_x, np.float64)
+        self.change_y = resize(self.change_y, np.float64)
+        self.angle = resize(self.angle, np.float64)
+        self.range_left = resize(self.range_left, np.float64)
+        self.origin = resize(self.origin, np.int64)
+        self.number = resize(self.number, np.int64)
+        self.alive = resize(self.alive, np.bool_)
+        self.hit_boxes = resize(self.hit_boxes, np.float64, (len(self.hit_box), 2))
+        self.left_offset = resize(self.left_offset, np.float64)
+        self.right_offset = resize(self.right_offset, np.float64)
+        self.bottom_offset = resize(self.bottom_offset, np.float64)
+        self.top_offset = resize(self.top_offset, np.float64)
+        self.capacity = capacity
+
+    def get_state(self):
+        # Return a copy of the slots in use of every array
+        return {name: getattr(self, name)[:self.count].copy() for name in self.ARRAY_NAMES}
+
+    def set_state(self, arrays):
+        # Replace every torpedo with the ones in arrays, which were made by get_state
+        count = len(arrays["x"])
+        self.count = 0
+        if count > self.capacity:
+            self.grow(count)
+        for name in self.ARRAY_NAMES:
+            getattr(self, name)[:count] = arrays[name]
+        self.count = count
+
+    def get_rotated_hit_box(self, angle):
+        # Return the hit box rotated by the angle the same way a sprite's is
+        if angle:
+            return [rotate_point(point[0], point[1], angle) for point in self.hit_box]
+        return [list(point) for point in self.hit_box]
+
+    def spawn(self, angle, x, y, distance_to_travel, origin):
+        # Add a torpedo in the next free slot and return its index
+        # If the arrays are full then they are made twice as big
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        index = self.count
+        self.count += 1
+
+        # A torpedo's velocity is constant so it only has to be calculated once
+        heading_x, heading_y = get_heading(angle)
+        self.x[index] = x
+        self.y[index] = y
+        self.change_x[index] = self.speed * heading_x
+        self.change_y[index] = self.speed * heading_y
+        self.angle[index] = angle
+        self.range_left[index] = distance_to_travel
+        self.origin[index] = origin
+        self.number[index] = self.spawned
+        self.spawned += 1
+        self.alive[index] = True
+
+        hit_box = self.get_rotated_hit_box(angle)
+        self.hit_boxes[index] = hit_box
+        self.left_offset[index] = min(point[0] for point in hit_box)
+        self.right_offset[index] = max(point[0] for point in hit_box)
+        self.bottom_offset[index] = min(point[1] for point in hit_box)
+        self.top_offset[index] = max(point[1] for point in hit_box)
+        return index
+
+    def get_hit_boxes(self, indexes):
+        # Return the hit boxes of the torpedoes in these slots moved to where the torpedoes are
+        return self.hit_boxes[indexes] + np.stack((self.x[indexes], self.y[indexes]), axis=1)[:, None, :]
+
+    def find_expired(self):
+        # Return which torpedoes have gone as far as they were meant to
+        count = self.count
+        return self.alive[:count] & (self.range_left[:count] <= 0)
+
+    def find_ship_pairs(self, ship_x, ship_y, ship_radius):
+        # Return every living torpedo and ship whose centers are close enough for their hit boxes to touch
+        # The pairs are returned as an array of torpedo slots and an array of ship numbers
+        living = np.flatnonzero(self.alive[:self.count])
+        torpedoes, ships = find_close_pairs(self.x[living], self.y[living], ship_x, ship_y,
+                                            self.hit_box_radius + ship_radius)
+        return living[torpedoes], ships
+
+    def find_torpedo_hits(self, exploding):
+        # Return which torpedoes explode once the ones touching a living torpedo fired after them are added
+        # exploding is which torpedoes are already exploding, they don't need to be checked
+        # Torpedoes explode in the order they were fired, so when two are touching the first one to be fired
+        # explodes and the other one only explodes if it is touching something else
+        exploding = exploding.copy()
+        living = np.flatnonzero(self.alive[:self.count])
+        x = self.x[living]
+        y = self.y[living]
+        first, second = find_close_pairs(x, y, x, y, 2 * self.hit_box_radius)
+        first = living[first]
+        second = living[second]
+        needed = (first < second) & ~exploding[first]
+        first = first[needed]
+        second = second[needed]
+
+        # Torpedoes can only touch if the rectangles around their hit boxes overlap
+        # This is checked first as it is much quicker than checking the hit boxes
+        x = self.x
+        y = self.y
+        overlapping = ((x[first] + self.left_offset[first] < x[second] + self.right_offset[second])
+                       & (x[second] + self.left_offset[second] < x[first] + self.right_offset[first])
+                       & (y[first] + self.bottom_offset[first] < y[second] + self.top_offset[second])
+                       & (y[second] + self.bottom_offset[second] < y[first] + self.top_offset[first]))
+        first = first[overlapping]
+        second = second[overlapping]
+
+        # A torpedo only has to be touching one other torpedo to explode
+        # So the pairs are checked in rounds, with one pair of every torpedo that isn't exploding yet in each round
+        order = np.argsort(first, kind="stable")
+        first = first[order]
+        second = second[order]
+        pair_round = np.arange(len(first)) - np.searchsorted(first, first)
+        remaining = np.arange(len(first))
+        check_round = 0
+        while len(remaining) > 0:
+            checked = remaining[pair_round[remaining] == check_round]
+            touching = are_hit_boxes_intersecting(self.get_hit_boxes(first[checked]),
+                                                  self.get_hit_boxes(second[checked]))
+            exploding[first[checked[touching]]] = True
+            remaining = remaining[pair_round[remaining] > check_round]
+            remaining = remaining[~exploding[first[remaining]]]
+            check_round += 1
+        return exploding
+
+    def get_positions(self, interpolation):
+        # Return where every torpedo should be drawn when the game is interpolation of the way to the next tick
+        # A torpedo's velocity never changes, so where it was before the last tick is found from its velocity
+        count = self.count
+        behind = interpolation - 1
+        return self.x[:count] + self.change_x[:count] * behind, self.y[:count] + self.change_y[:count] * behind
+
+    def kill(self, index):
+        # Mark the torpedo in this slot as dead, its slot is removed the next time compact() is called
+        self.alive[index] = False
+
+    def move(self, width, height):
+        # Move every torpedo based on it's velocity and use up it's range
+        count = self.count
+        self.x[:count] += self.change_x[:count]
+        self.y[:count] += self.change_y[:count]
+        self.range_left[:count] -= self.speed
+
+        # If a torpedo is off the arena then it is removed
+        x = self.x[:count]
+        y = self.y[:count]
+        off_arena = ((x + self.right_offset[:count] < 0)
+                     | (x + self.left_offset[:count] > width - 1)
+                     | (y + self.top_offset[:count] < 0)
+                     | (y + self.bottom_offset[:count] > height - 1))
+        self.alive[:count] &= ~off_arena
+
+    def compact(self):
+        # Remove the slots of dead torpedoes by moving the living ones down
+        # The living torpedoes stay in the order they were fired
+        count = self.count
+        alive = self.alive[:count]
+        living = int(np.count_nonzero(alive))
+        if living == count:
+            return
+
+        for array in (self.x, self.y, self.change_x, self.change_y, self.angle, self.range_left, self.origin,
+                      self.number, self.hit_boxes, self.left_offset, self.right_offset, self.bottom_offset,
+                      self.top_offset):
+            array[:living] = array[:count][alive]
+        self.alive[:living] = True
+        self.alive[living:count] = False
+        self.count = living
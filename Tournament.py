@@ -0,0 +1,172 @@
+"""Importing key libraries"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from Rules import AI_OUTER_DISTANCE, AI_INNER_DISTANCE, MAX_AIM_DISTANCE, WEAPON_COOLDOWN_TIME, TORPEDO_SPEED
+from Simulation import Simulation
+
+
+"""Defining Constants"""
+# Match Constants
+MATCH_WIDTH = 1920
+MATCH_HEIGHT = 1080
+MATCH_SHIPS = 4
+MATCHES_PER_CONFIG = 4
+# A match that goes on for this many ticks is stopped, 5 minutes at 60 ticks a second
+MAX_MATCH_TICKS = 60 * 60 * 5
+
+# Sweep Constants
+# The AI constants that can be swept and the values tried when none are given
+# A grid sweep tries every combination of the values
+# A random sweep picks each value anywhere between the smallest and biggest value
+PARAMETERS = {
+    "ai_outer_distance": [AI_OUTER_DISTANCE * 0.75, AI_OUTER_DISTANCE, AI_OUTER_DISTANCE * 1.25],
+    "ai_inner_distance": [AI_INNER_DISTANCE * 0.8, AI_INNER_DISTANCE, AI_INNER_DISTANCE * 1.2],
+    "max_aim_distance": [MAX_AIM_DISTANCE * 0.75, MAX_AIM_DISTANCE, MAX_AIM_DISTANCE * 1.25],
+    "weapon_cooldown_time": [WEAPON_COOLDOWN_TIME * 0.6, WEAPON_COOLDOWN_TIME, WEAPON_COOLDOWN_TIME * 1.4],
+    "torpedo_speed": [TORPEDO_SPEED * 0.75, TORPEDO_SPEED, TORPEDO_SPEED * 1.25],
+}
+RANDOM_CONFIGS = 20
+
+
+def is_valid_config(config):
+    # The inner rect has to be inside the outer rect, or the AI ships would never stop turning away from the edge
+    return config["ai_inner_distance"] >= config["ai_outer_distance"]
+
+
+def make_grid_configs(parameters):
+    # Return every combination of the parameter values
+    names = list(parameters)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(parameters[name] for name in names))]
+    return [config for config in configs if is_valid_config(config)]
+
+
+def make_random_configs(parameters, config_number, rng):
+    # Return config_number configs with each value picked between the smallest and biggest value given
+    configs = []
+    while len(configs) < config_number:
+        config = {name: rng.uniform(min(values), max(values)) for name, values in parameters.items()}
+        if is_valid_config(config):
+            configs.append(config)
+    return configs
+
+
+def scatter_ships(simulation, rng):
+    # Put every ship somewhere random inside the inner rect, facing a random way
+    # Every match of a config starts differently so they don't all play out the same
+    (left, bottom), _, (right, top), _ = simulation.ai_inner_rect
+    for ship in simulation.ship_list:
+        ship.center_x = rng.uniform(left, right)
+        ship.center_y = rng.uniform(bottom, top)
+        ship.angle = rng.uniform(0, 360)
+    simulation.save_previous_state()
+
+
+def play_match(match):
+    # This function is run by the worker processes
+    # It plays one match of AI ships against each other without a window and returns what happened
+    start = time.perf_counter()
+    simulation = Simulation(match["width"], match["height"], match["ships"], has_player=False, **match["config"])
+    scatter_ships(simulation, random.Random(match["seed"]))
+    simulation.run(match["max_ticks"])
+
+    return {
+        "config_number": match["config_number"],
+        "match_number": match["match_number"],
+        "seed": match["seed"],
+        "config": match["config"],
+        "winner": simulation.winner,
+        "finished": simulation.result is not None,
+        "ticks": simulation.tick,
+        "damage_dealt": simulation.damage_dealt,
+        "shots_fired": simulation.shots_fired,
+        "shots_hit": simulation.shots_hit,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def summarise(results):
+    # Return a line for each config with the averages of all its matches
+    lines = []
+    by_config = {}
+    for result in results:
+        by_config.setdefault(result["config_number"], []).append(result)
+
+    for config_number in sorted(by_config):
+        matches = by_config[config_number]
+        shots_fired = sum(match["shots_fired"] for match in matches)
+        shots_hit = sum(match["shots_hit"] for match in matches)
+        lines.append({
+            "config_number": config_number,
+            "config": matches[0]["config"],
+            "matches": len(matches),
+            "finished": sum(match["finished"] for match in matches),
+            "mean_ticks": sum(match["ticks"] for match in matches) / len(matches),
+            "mean_damage_dealt": sum(match["damage_dealt"] for match in matches) / len(matches),
+            "hit_rate": shots_hit / shots_fired if shots_fired else 0,
+        })
+    return lines
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Run AI against AI matches for a sweep of AI constants")
+    parser.add_argument("--sweep", choices=("grid", "random"), default="grid",
+                        help="try every combination of values, or random values between the smallest and biggest")
+    parser.add_argument("--configs", type=int, default=RANDOM_CONFIGS, help="number of configs in a random sweep")
+    parser.add_argument("--matches", type=int, default=MATCHES_PER_CONFIG, help="matches played for each config")
+    parser.add_argument("--ships", type=int, default=MATCH_SHIPS, help="AI ships in each match")
+    parser.add_argument("--width", type=int, default=MATCH_WIDTH)
+    parser.add_argument("--height", type=int, default=MATCH_HEIGHT)
+    parser.add_argument("--max-ticks", type=int, default=MAX_MATCH_TICKS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes, every core by default")
+    parser.add_argument("--seed", type=int, default=0, help="seed the configs and the seed of every match come from")
+    parser.add_argument("--output", help="file to write a JSON line for each match to, instead of stdout")
+    for name, values in PARAMETERS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=float, nargs="+", default=values)
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    rng = random.Random(arguments.seed)
+    parameters = {name: getattr(arguments, name) for name in PARAMETERS}
+    if arguments.sweep == "grid":
+        configs = make_grid_configs(parameters)
+    else:
+        configs = make_random_configs(parameters, arguments.configs, rng)
+
+    # Every match gets its own seed from the tournament seed
+    # So a match plays out the same whichever worker runs it
+    matches = []
+    for config_number, config in enumerate(configs):
+        for match_number in range(arguments.matches):
+            matches.append({"config_number": config_number, "match_number": match_number,
+                            "seed": rng.getrandbits(32), "config": config, "ships": arguments.ships,
+                            "width": arguments.width, "height": arguments.height,
+                            "max_ticks": arguments.max_ticks})
+
+    output = open(arguments.output, "w") if arguments.output else sys.stdout
+    results = []
+    try:
+        # The results are written as soon as each match finishes, in whatever order they finish
+        with multiprocessing.Pool(arguments.workers) as pool:
+            for result in pool.imap_unordered(play_match, matches):
+                results.append(result)
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    for line in summarise(results):
+        print(json.dumps(line), file=sys.stderr)
+
+
+# Runs main()
+if __name__ == "__main__":
+    main()
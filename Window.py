@@ -1,253 +1,507 @@
 """Importing key libraries"""
+import argparse
 import arcade
+import collections
 import math
+import os
+import PIL.Image
 from pyglet.gl import GL_NEAREST
+from Assets import AssetLoader, ASSET_IMAGES
+from Profiler import Profiler
+from Rules import SCALING, WEAPON_SCALING, EXPLOSION_SCALING, KEY_NAMES
+from Simulation import Simulation
+from SpritePool import SpritePool
+from Replay import ReplayRecorder
+from ScenarioFile import load_scenario, create_simulation
+from WorldFile import write_world_file, read_world_file
 
 
 """Defining Constants"""
 # Screen Setup Constants
 SCREEN_TITLE = "Naval Warfare Game"
 
+# Camera Constants
+# The arena is this many times the size of the window when a game starts, the camera follows the player around it
+# The arena doesn't change size when the window is resized, more or less of it is shown instead
+# It can be changed with --world-scale, 1 makes the arena fit the window
+WORLD_SCALE = 2
+# Only the sprites within this many pixels of the window are drawn
+# It is far enough that a ship, its health bar or an explosion partly in the window is still drawn
+CULL_MARGIN = 100
+
+# Scenario Constants
+# A scenario file in the Scenarios folder to play instead of the default game, it needs a player to be played
+# When it is None the game is the player and ENEMY_SHIP_NUMBER AI ships, it can be set with --scenario
+SCENARIO_FILE = None
+
 # Scaling Constants
-SCALING = 1
-WEAPON_SCALING = 2
-EXPLOSION_SCALING = 4
 SIGN_SCALING = 8
 
-# Ship Constants
-MAX_SPEED = 1.5
-MIN_SPEED = 0
-ACCELERATION_RATE = 0.01
-ANGLE_SPEED = 1
-WEAPON_COOLDOWN_TIME = 5
+# Health Bar Constants
 HP_BAR_WIDTH = 100
 HP_BAR_HEIGHT = 10
+HP_BAR_TEXTURE = "HealthBar"
+HP_BAR_COLOR = (0, 128, 0)
+HP_BAR_LOST_COLOR = (255, 0, 0)
+
+# Aim Constants
+AIM_COLOR = (0, 75, 120)
+AIM_LINE_WIDTH = 3
+# The number of straight lines the aim circle is made of
+AIM_SEGMENTS = 128
+
+# HUD Constants
+HUD_FONT_SIZE = 16
+HUD_MARGIN = 10
+HUD_BAR_WIDTH = 150
+HUD_BAR_HEIGHT = 12
+HUD_BAR_COLOR = (255, 255, 255)
+HUD_BAR_EMPTY_COLOR = (0, 40, 80)
+
+# Image Constants
+# The image of each ship is found using the ship's image_number
+SHIP_IMAGES = ["Images/PlayerShip.png", "Images/EnemyShip1.png", "Images/EnemyShip2.png", "Images/EnemyShip3.png"]
+TORPEDO_IMAGE = "Images/Torpedo.png"
+EXPLOSION_IMAGE = "Images/Explosion.png"
+SIGN_IMAGE = "Images/Sign.png"
+
+# Startup Constants
+# The BufferView is shown for at least this many frames, so the window has finished opening before the menu is shown
+BUFFER_FRAMES = 2
+
+# Profiler Constants
+# This key turns the profiler and its overlay on and off
+PROFILE_KEY = arcade.key.F3
+PROFILE_FONT_SIZE = 12
+PROFILE_OVERLAY_TIME = 0.5
+# When the window is closed after profiling, the profile is saved to this file, as CSV if the name ends in .csv or JSON
+PROFILE_FILE = "profile.json"
+
+# Replay Constants
+# Every game is recorded and saved to this file when it ends
+REPLAY_FILE = "replay.nwr"
+# The key that watches the replay of the last game on the GameOverView
+REPLAY_KEY = arcade.key.R
+# While watching a replay, the left and right arrow keys go back and forward this many ticks
+REPLAY_SEEK_TICKS = 300
+
+# Save Constants
+# These keys save the whole game to QUICKSAVE_FILE and load it back
+QUICKSAVE_KEY = arcade.key.F5
+QUICKLOAD_KEY = arcade.key.F9
+QUICKSAVE_FILE = "quicksave.nww"
+
+# Sprite Pool Constants
+# The number of torpedo and explosion sprites made when a game starts
+TORPEDO_POOL_CAPACITY = 256
+EXPLOSION_POOL_CAPACITY = 128
+
+# Label Constants
+# The most text images kept for Labels, the ones used longest ago are dropped first
+# Text that changes all the time, like the profile overlay, would otherwise be kept forever
+LABEL_TEXTURE_CACHE_SIZE = 64
+
+# Every image is only loaded once and the texture is shared by every sprite that uses it
+textures = {}
+# The images of the text of Labels, in the order they were last used
+label_textures = collections.OrderedDict()
+# The images are cut from the atlas on another thread, which starts as the window opens
+asset_loader = AssetLoader()
+# The pools of torpedo and explosion sprites are made once and shared by every game
+sprite_pools = {}
+# Every game, replay and loaded game is timed by the same profiler
+# So turning it on with PROFILE_KEY lasts between games and the profile saved on closing has all of them
+game_profiler = Profiler()
+
+
+def get_texture(file_name):
+    # This function returns the texture of an image, making it the first time it is needed
+    # If the images haven't finished loading, it waits for them
+    # The Simulation finds collisions itself, so the texture doesn't need a hit box worked out from its pixels
+    texture = textures.get(file_name)
+    if texture is None:
+        image = asset_loader.get_images()[file_name]
+        texture = textures[file_name] = arcade.Texture(file_name, image, hit_box_algorithm="None")
+    return texture
+
+
+def create_sprite(file_name, scale):
+    # This function creates a sprite that uses the shared texture of an image
+    sprite = arcade.Sprite(scale=scale)
+    sprite.texture = get_texture(file_name)
+    return sprite
+
+
+def get_bar_texture():
+    # This function returns a plain white texture the size of a health bar
+    # Every health bar sprite uses it and is coloured red or green, so they can all be drawn in one batch
+    texture = textures.get(HP_BAR_TEXTURE)
+    if texture is None:
+        image = PIL.Image.new("RGBA", (HP_BAR_WIDTH, HP_BAR_HEIGHT), (255, 255, 255, 255))
+        texture = textures[HP_BAR_TEXTURE] = arcade.Texture(HP_BAR_TEXTURE, image, hit_box_algorithm="None")
+    return texture
+
+
+def create_bar_sprite(color):
+    # This function creates a sprite used to draw one of the two bars of a health bar
+    sprite = arcade.Sprite()
+    sprite.texture = get_bar_texture()
+    sprite.color = color
+    return sprite
+
+
+def create_ship_sprite(ship):
+    # This function creates the sprite used to draw a ship of the Simulation
+    return create_sprite(SHIP_IMAGES[ship.image_number], SCALING)
+
+
+def create_torpedo_sprite():
+    # This function creates the sprite used to draw a torpedo of the Simulation
+    sprite = create_sprite(TORPEDO_IMAGE, WEAPON_SCALING)
+    reset_torpedo_sprite(sprite)
+    return sprite
+
+
+def reset_torpedo_sprite(sprite):
+    # This function sets a torpedo sprite back to how it looks when it is created
+    sprite.angle = 0
+    sprite.scale = WEAPON_SCALING
+    # Alpha changes opacity, higher number means higher opacity
+    # Alpha unless overridden is 255
+    sprite.alpha = 63
+    sprite.color = [0, 0, 127]
+
+
+def create_explosion_sprite():
+    # This function creates the sprite used to draw an explosion of the Simulation
+    return create_sprite(EXPLOSION_IMAGE, EXPLOSION_SCALING)
+
+
+def reset_explosion_sprite(sprite):
+    # This function sets an explosion sprite back to how it looks when it is created
+    sprite.angle = 0
+    sprite.scale = EXPLOSION_SCALING
+
+
+def get_sprite_pools():
+    # This function returns the torpedo and explosion sprite pools, making them the first time they are needed
+    if not sprite_pools:
+        sprite_pools["torpedo"] = SpritePool(create_torpedo_sprite, reset_torpedo_sprite, TORPEDO_POOL_CAPACITY)
+        sprite_pools["explosion"] = SpritePool(create_explosion_sprite, reset_explosion_sprite,
+                                               EXPLOSION_POOL_CAPACITY)
+    return sprite_pools["torpedo"], sprite_pools["explosion"]
+
+
+def preload_assets():
+    # This function makes every texture and the sprite pools, so the first game doesn't have to
+    for file_name in ASSET_IMAGES:
+        get_texture(file_name)
+    get_sprite_pools()
+
+
+class HealthBars:
+    """The Health Bars Of Every Ship Drawn In One Batch"""
+    # Each ship has a red bar for hp gone and a green bar on top of it for hp left
+    # The green bar is as wide as the percentage of hp remaining
+    # The bars are sprites in one SpriteList, so they are drawn with one draw call
+    # The SpriteList keeps their vertices between frames and a bar is only changed when its ship's hp or sprite moves
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList(use_spatial_hash=False)
+        # This dictionary links each ship to [red bar, green bar, hp, position]
+        # The hp and position are what the bars were last set for
+        self.bars = {}
+
+    def update(self, ship_sprites):
+        # Make a health bar for every ship in ship_sprites and move it above the ship's sprite
+        # The bar is drawn above the sprite so it moves with the ship as it is drawn between ticks
+        for ship, sprite in ship_sprites.items():
+            bars = self.bars.get(ship)
+            if bars is None:
+                bars = self.bars[ship] = [create_bar_sprite(HP_BAR_LOST_COLOR), create_bar_sprite(HP_BAR_COLOR),
+                                          None, None]
+                self.sprite_list.append(bars[0])
+                self.sprite_list.append(bars[1])
+
+            position = sprite.position
+            if bars[2] == ship.hp and bars[3] == position:
+                continue
+            bars[2] = ship.hp
+            bars[3] = position
+
+            # If hp is temporarily negative then fill would be negative which causes issues
+            # So we make fill = 0 if that is the case
+            # Fill determines how long the green bar is based off the hp remaining
+            fill = HP_BAR_WIDTH * max(ship.hp, 0) / ship.max_hp
+            left = position[0] - HP_BAR_WIDTH / 2
+            center_y = position[1] + ship.width / 2 + HP_BAR_HEIGHT / 2
+
+            red_bar, green_bar = bars[0], bars[1]
+            red_bar.center_x = position[0]
+            red_bar.center_y = center_y
+            green_bar.width = fill
+            green_bar.center_x = left + fill / 2
+            green_bar.center_y = center_y
+
+        # The bars of ships that are gone are removed
+        for ship in [ship for ship in self.bars if ship not in ship_sprites]:
+            red_bar, green_bar, _, _ = self.bars.pop(ship)
+            red_bar.remove_from_sprite_lists()
+            green_bar.remove_from_sprite_lists()
+
+    def draw(self):
+        self.sprite_list.draw(filter=GL_NEAREST)
+
+
+class Label:
+    """A Line Of Text Drawn From A Sprite Made Once"""
+    # arcade.draw_text looks the text up in a cache and moves its sprite every time it is called
+    # A Label makes the image of its text once and only makes it again when the text changes
+    # Its sprite is only moved when the Label is moved, which Views do when they are shown or resized
 
-# Aiming Constants
-AIM_DISTANCE_SPEED = 5
-AIM_ANGLE_SPEED = 2
-MAX_AIM_DISTANCE = 350
-MIN_AIM_DISTANCE = 75
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, text, font_size, color=arcade.color.WHITE, anchor_x="left"):
+        self.font_size = font_size
+        self.color = color
+        self.anchor_x = anchor_x
+        self.text = None
+        self.x = 0
+        self.y = 0
+        self.sprite = arcade.Sprite()
+        self.sprite_list = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        # Make the image of the text again if it has changed
+        if text == self.text:
+            return
+        self.text = text
+        # The images of recent text are kept and shared, so the same text in a new View isn't made again
+        name = "Label-{}-{}-{}".format(text, self.color, self.font_size)
+        texture = label_textures.get(name)
+        if texture is None:
+            image = arcade.get_text_image(text, self.color, self.font_size)
+            texture = label_textures[name] = arcade.Texture(name, image, hit_box_algorithm="None")
+            if len(label_textures) > LABEL_TEXTURE_CACHE_SIZE:
+                label_textures.popitem(last=False)
+        else:
+            label_textures.move_to_end(name)
+        self.sprite.texture = texture
+        # A SpriteList keeps every texture it has ever drawn, so a new one is made for each new text
+        self.sprite_list = arcade.SpriteList(use_spatial_hash=False)
+        self.sprite_list.append(self.sprite)
+        self.set_position(self.x, self.y)
+
+    def set_position(self, x, y):
+        # Move the text so its anchor_x side and its bottom are at x and y, like draw_text does
+        self.x = x
+        self.y = y
+        if self.anchor_x == "center":
+            self.sprite.center_x = x
+        elif self.anchor_x == "right":
+            self.sprite.center_x = x - self.sprite.width / 2
+        else:
+            self.sprite.center_x = x + self.sprite.width / 2
+        self.sprite.center_y = y + self.sprite.height / 2
 
-# Other Constants
-ENEMY_SHIP_NUMBER = 3
-AI_OUTER_DISTANCE = 100
-AI_INNER_DISTANCE = 125
-TORPEDO_SPEED = 4
+    def draw(self):
+        self.sprite_list.draw()
 
 
-class Projectile(arcade.Sprite):
-    """Child Class Of The Sprite Class"""
-    # This is a base Class for projectiles and this Class inherits attributes from arcade.Sprite
+class AimReticle:
+    """The Circle And Line Showing Where The Player Is Aiming"""
+    # The circle and line are made once around the origin, pointing to the right
+    # They are drawn at the player and rotated to the aim_angle by the GPU
+    # So they are only made again when the aim_distance changes or the window is resized
 
     # The __init__ functions are called when an object of that class are made
     # It sets up several attributes
-    def __init__(self, image, scaling, angle):
-        # Init the parent Class, arcade.Sprite, with the image and scaling
-        super().__init__(image, scaling)
-        # Setting up attributes
-        # It's start location is important for several calculations so we define it
-        self.start_x = None
-        self.start_y = None
-        self.distance_to_travel = None
-        # A projectile is an object in motion where the only external force is gravity
-        # So ignoring friction, it's velocity is constant so it only has to be calculated once
-        self.change_x = self.speed * math.cos(math.radians(angle))
-        self.change_y = self.speed * math.sin(math.radians(angle))
-        self.angle = angle
-
-
-class Torpedo(Projectile):
-    """Child Class of the Projectile Class"""
-    # This class inherits attributes from the Projectile class
-    # Objects of this class are fired from ships
+    def __init__(self):
+        self.shape_list = None
+        self.aim_distance = None
 
-    # The __init__ functions are called when an object of that class are made
-    # It sets up several attributes
-    def __init__(self, scaling, angle):
-        self.speed = TORPEDO_SPEED
-        # Init the parent Class, Projectile, with the image, scaling and angle
-        super().__init__("Images/Torpedo.png", scaling, angle)
-        # Setting up attributes
-        self.distance_traveled = 0
-        # It's origin is needed so it doesn't collide with the ship it is fired from
-        self.origin = None
-        # Alpha changes opacity, higher number means higher opacity
-        # Alpha unless overridden is 255
-        self.alpha = 63
-        self.color = [0, 0, 127]
-
-    def update(self):
-        # This is an update function called a maximum of 60 times a second
-
-        # Move the torpedo based on it's velocity
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-
-        # If it is off the window then remove it
-        if self.right < 0 \
-                or self.left > arcade.get_window().width - 1 \
-                or self.top < 0 \
-                or self.bottom > arcade.get_window().height - 1:
-            self.remove_from_sprite_lists()
-
-
-def create_torpedo(angle, x, y, distance_to_travel, identifier):
-    # This function creates a object of the Torpedo Class
-    # and sets up it's attributes using the given parameters
-    torpedo = Torpedo(WEAPON_SCALING, angle)
-
-    torpedo.center_x = x
-    torpedo.center_y = y
-    torpedo.start_x = x
-    torpedo.start_y = y
-    torpedo.distance_to_travel = distance_to_travel
-    torpedo.origin = identifier
-    # Return a handle on the object so it can be easily appended to SpriteLists
-    return torpedo
-
-
-class Ship(arcade.Sprite):
-    """Child Class Of The Sprite Class"""
-    # This is a base class for the AI ships and player ship to derive the same attributes and updates from
+    def invalidate(self):
+        # Make the shapes again the next time they are drawn
+        self.shape_list = None
+
+    def build(self, aim_distance):
+        # This creates a circle where it's radius is the player's aim_distance
+        # This is used to show how far the player is aiming
+        # And a line as long as the aim_distance, which is rotated to show what direction the player is aiming
+        self.aim_distance = aim_distance
+        points = [(aim_distance * math.cos(2 * math.pi * segment / AIM_SEGMENTS),
+                   aim_distance * math.sin(2 * math.pi * segment / AIM_SEGMENTS)) for segment in range(AIM_SEGMENTS)]
+        self.shape_list = arcade.ShapeElementList()
+        self.shape_list.append(arcade.create_line_loop(points, AIM_COLOR, AIM_LINE_WIDTH))
+        self.shape_list.append(arcade.create_line(0, 0, aim_distance, 0, AIM_COLOR, AIM_LINE_WIDTH))
+
+    def draw(self, x, y, aim_distance, aim_angle):
+        if self.shape_list is None or aim_distance != self.aim_distance:
+            self.build(aim_distance)
+        self.shape_list.center_x = x
+        self.shape_list.center_y = y
+        self.shape_list.angle = aim_angle
+        self.shape_list.draw()
+
+
+class Hud:
+    """The Number Of Enemy Ships And How Long Until The Player Can Fire"""
+    # The text is only made again when the number of ships changes
+    # The cooldown is a bar that fills up, so it is changed by setting the width of a sprite
 
     # The __init__ functions are called when an object of that class are made
     # It sets up several attributes
-    def __init__(self, image):
-        # Init the parent
-        super().__init__(image, SCALING)
-
-        # Creating New Attributes
-        self.speed = 0
-        self.hp = 1000
-        self.max_hp = self.hp
-        # Identifier is useful for making torpedoes fired from a ship not collide with the ship upon firing
-        self.identifier = None
-        # Cooldown_time allows for a cooldown after a projectile is fired
-        self.cooldown_time = 0
-
-    def on_update(self, delta_time: float = 1/60):
-        # This is an update function which takes the parameter of the time since the last frame / last update
-
-        # Update ship's position based on ship's direction and speed
-        self.center_x += self.speed * math.cos(math.radians(self.angle))
-        self.center_y += self.speed * math.sin(math.radians(self.angle))
-
-        # Increase the cooldown_time by the time since the last update
-        # When it reaches a certain value then they can fire
-        self.cooldown_time += delta_time
-
-        # Wall Collision
-        # Check to see if the ship hit the screen edge and if so prevent the ship from going off the window
-        if self.left < 0:
-            self.left = 0
-        elif self.right > arcade.get_window().width - 1:
-            self.right = arcade.get_window().width - 1
-
-        if self.bottom < 0:
-            self.bottom = 0
-        elif self.top > arcade.get_window().height - 1:
-            self.top = arcade.get_window().height - 1
-
-        # Prevent the ship from exceeding speed limits
-        if self.speed > MAX_SPEED:
-            self.speed = MAX_SPEED
-        elif self.speed < MIN_SPEED:
-            self.speed = MIN_SPEED
-
-    def draw_health(self):
-        # This function allows for a ship to have its health displayed in a bar above it
-        # It draws a green bar and a red bar based on the percentage of hp remaining
-        # Green bar is hp left and red bar is hp gone
-
-        # Determine what percentage of hp is left
-        percent = self.hp / self.max_hp
-
-        # If hp is temporarily negative then fill would be negative which causes issues
-        # So we make fill = 0 if that is the case
-        # Fill determines how long the bars are based off the hp remaining
-        if self.hp < 0:
-            fill = 0
-        else:
-            fill = HP_BAR_WIDTH * percent
-
-        # Determine the left side the green bar
-        left = int(self.center_x - HP_BAR_WIDTH // 2)
-        # Determine where the right side of the green bar the left side of the red bar meet
-        # Depending on the hp remaining
-        middle = int(left + fill)
-        # Determine the right side of the red bar
-        right = left + HP_BAR_WIDTH
+    def __init__(self):
+        self.ships_label = Label("", HUD_FONT_SIZE, anchor_x="right")
+        self.cooldown_label = Label("Torpedo", HUD_FONT_SIZE, anchor_x="right")
+        self.bar_list = arcade.SpriteList(use_spatial_hash=False)
+        self.empty_bar = create_bar_sprite(HUD_BAR_EMPTY_COLOR)
+        self.empty_bar.width = HUD_BAR_WIDTH
+        self.empty_bar.height = HUD_BAR_HEIGHT
+        self.cooldown_bar = create_bar_sprite(HUD_BAR_COLOR)
+        self.cooldown_bar.height = HUD_BAR_HEIGHT
+        self.bar_list.append(self.empty_bar)
+        self.bar_list.append(self.cooldown_bar)
+        self.enemy_count = None
+        self.bar_left = 0
 
-        # Determine the bottom and top of the bars
-        bottom = self.center_y + self.width / 2
-        top = bottom + HP_BAR_HEIGHT
+    def on_resize(self, width, height):
+        # The HUD is in the top right corner of the window
+        right = width - HUD_MARGIN
+        line_height = HUD_FONT_SIZE * 2
+        self.ships_label.set_position(right, height - line_height)
+        self.cooldown_label.set_position(right - HUD_BAR_WIDTH - HUD_MARGIN, height - line_height * 2)
+        self.bar_left = right - HUD_BAR_WIDTH
+        self.empty_bar.center_x = right - HUD_BAR_WIDTH / 2
+        self.empty_bar.center_y = height - line_height * 2 + HUD_BAR_HEIGHT / 2
+        self.cooldown_bar.center_y = self.empty_bar.center_y
+        self.cooldown_bar.center_x = self.bar_left + self.cooldown_bar.width / 2
+
+    def update(self, simulation):
+        # Only the ships on other teams than the player are enemies, a game without a player counts every ship
+        player = simulation.player_sprite
+        if player is None:
+            enemy_count = len(simulation.ship_list)
+        else:
+            enemy_count = sum(count for team, count in simulation.team_counts.items() if team != player.team)
+        if enemy_count != self.enemy_count:
+            self.enemy_count = enemy_count
+            self.ships_label.set_text("Enemy ships: {}".format(enemy_count))
 
-        # Draw the bars
-        arcade.draw_lrtb_rectangle_filled(middle, right, top, bottom, (255, 0, 0))  # Red bar
-        arcade.draw_lrtb_rectangle_filled(left, middle, top, bottom, (0, 128, 0))  # Green bar
+        # The bar is full when the player can fire
+        if player is not None:
+            fill = HUD_BAR_WIDTH * min(player.cooldown_time / player.weapon_cooldown_time, 1)
+            self.cooldown_bar.width = fill
+            self.cooldown_bar.center_x = self.bar_left + fill / 2
 
+    def draw(self):
+        self.bar_list.draw()
+        self.ships_label.draw()
+        self.cooldown_label.draw()
 
-class AI(Ship):
-    """Child Class Of The Ship Class"""
-    # This class inherits attributes and updates from the ship class
-    # This class gives the AI ships more attributes
 
-    # The __init__ functions are called when an object of that class are made
-    # It sets up several attributes
-    def __init__(self, image):
-        # Init the parent
-        super().__init__(image)
-        # These attributes are required to turn it away from the window edge if the AI gets too close
-        self.left_turn = False
-        self.right_turn = False
+def get_camera_offset(target, view_size, world_size):
+    # Return where the camera's left or bottom edge goes to have the target in the middle of the view
+    # The camera stops at the edges of the arena, and an arena smaller than the view is put in the middle of it
+    if world_size <= view_size:
+        return round((world_size - view_size) / 2)
+    return round(min(max(target - view_size / 2, 0), world_size - view_size))
 
 
-class Player(Ship):
-    """Child Class Of The Ship Class"""
-    # This class inherits attributes and updates from the ship class
-    # This class is for the player's ship which gives them more attributes
+class Camera:
+    """The Part Of The Arena That Is Shown In The Window"""
+    # The camera follows the player so the arena can be bigger than the window
+    # The arena is drawn through the camera, then the HUD is drawn on top in the window's own coordinates
+    # The camera moves in whole pixels so the sprites drawn with GL_NEAREST don't shimmer as it moves
 
     # The __init__ functions are called when an object of that class are made
     # It sets up several attributes
     def __init__(self):
-        # Init the parent
-        super().__init__("Images/PlayerShip.png")
-
-        # Creating New Attributes
-        # These attributes will be changed by the player to show and determine where the player is aiming
-        self.aim_angle = 0
-        self.aim_distance = MIN_AIM_DISTANCE
-
-    def update(self):
-        # Limit the aim_distance of the player so they cannot go outside of the determined range
-        if self.aim_distance > MAX_AIM_DISTANCE:
-            self.aim_distance = MAX_AIM_DISTANCE
-        elif self.aim_distance < MIN_AIM_DISTANCE:
-            self.aim_distance = MIN_AIM_DISTANCE
+        self.width = 0
+        self.height = 0
+        # The arena coordinates of the bottom left corner of the window
+        self.left = 0
+        self.bottom = 0
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def follow(self, x, y, world_width, world_height):
+        # Move the camera so x, y is in the middle of the window, or as close as it can be
+        self.left = get_camera_offset(x, self.width, world_width)
+        self.bottom = get_camera_offset(y, self.height, world_height)
+
+    def get_bounds(self, margin=0):
+        # Return the left, bottom, right and top of the arena that is shown, made bigger by margin on every side
+        return (self.left - margin, self.bottom - margin,
+                self.left + self.width + margin, self.bottom + self.height + margin)
+
+    def get_visible(self, x, y, margin=0):
+        # Return which of the points in the arrays x and y are shown, made bigger by margin on every side
+        left, bottom, right, top = self.get_bounds(margin)
+        return (x >= left) & (x <= right) & (y >= bottom) & (y <= top)
+
+    def use(self):
+        # Draw in arena coordinates from now on
+        arcade.set_viewport(self.left, self.left + self.width, self.bottom, self.bottom + self.height)
+
+    def use_window(self):
+        # Draw in window coordinates from now on, for the HUD
+        arcade.set_viewport(0, self.width, 0, self.height)
+
+
+def sync_sprites(bodies, sprite_list, sprites, create_sprite, interpolation):
+    # This function makes the sprites in a SpriteList match the bodies in a list of the Simulation
+    # sprites is a dictionary linking each body to the sprite that draws it
+    # A sprite is created for each new body and removed when its body is gone or isn't in bodies because it isn't shown
+    # Each sprite is drawn interpolation of the way from where its body was before the last tick to where it is
+    alive = set()
+    for body in bodies:
+        alive.add(body)
+        sprite = sprites.get(body)
+        if sprite is None:
+            sprite = create_sprite(body)
+            sprites[body] = sprite
+            sprite_list.append(sprite)
+
+        sprite.center_x = body.previous_x + (body.center_x - body.previous_x) * interpolation
+        sprite.center_y = body.previous_y + (body.center_y - body.previous_y) * interpolation
+        sprite.angle = body.previous_angle + (body.angle - body.previous_angle) * interpolation
+        sprite.scale = body.scale
+
+    for body in [body for body in sprites if body not in alive]:
+        sprites.pop(body).remove_from_sprite_lists()
 
 
 class BufferView(arcade.View):
     """Child Class Of The View Class"""
     # Views hold information to be shown on the window and are used to transition between different content
     # This View lasts a very short time in order to allow for the proper resizing of the window
+    # The images are loaded while it is shown, and the menu is shown as soon as they are ready
 
     # The __init__ functions are called when an object of that class are made
     # It sets up several attributes
     def __init__(self):
         super().__init__()
-        self.time = 0
+        self.frames = 0
 
     def on_show(self):
         # The on_show function is called when the view is shown
         # The background is set to a specific shade of blue
         arcade.set_background_color(arcade.color.OCEAN_BOAT_BLUE)
+        asset_loader.start()
 
     def on_update(self, delta_time: float):
-        # Switch to the MenuView after some time has passed
-        # A little bit of time is required as going to a view and instantly going to the next view may cause issues
-        self.time += delta_time
-        if self.time > 0.5:
+        # Switch to the MenuView once the images have loaded
+        # A few frames are required as going to a view and instantly going to the next view may cause issues
+        self.frames += 1
+        if self.frames >= BUFFER_FRAMES and asset_loader.done():
+            # The textures and sprite pools are made now, while there is nothing else to do
+            preload_assets()
             # MenuView is created then shown
             menu_view = MenuView()
             self.window.show_view(menu_view)
@@ -264,12 +518,22 @@ class MenuView(arcade.View):
         # This sets up an image called sign to be displayed on this view
         # Every sprite must be in a SpriteList() to be drawn
         self.sign_list = arcade.SpriteList()
-        self.sign = arcade.Sprite("Images/Sign.png", SIGN_SCALING)
+        self.sign = create_sprite(SIGN_IMAGE, SIGN_SCALING)
         self.sign_list.append(self.sign)
+        # Some supporting text to tell the user how to progress to the next view
+        self.start_label = Label("Click to start", 35, anchor_x="center")
 
     def on_show(self):
         # When shown set the background to this blue
         arcade.set_background_color(arcade.color.OCEAN_BOAT_BLUE)
+        self.on_resize(self.window.width, self.window.height)
+
+    def on_resize(self, width, height):
+        # The sign and text are set up in a position dependant on the window size
+        # So they move when the window is resized
+        self.sign.center_x = width / 2
+        self.sign.center_y = (height / 2) + 50
+        self.start_label.set_position(width / 2, height / 2 - 300)
 
     def on_draw(self):
         # on_draw is called every frame to draw each frame
@@ -277,16 +541,10 @@ class MenuView(arcade.View):
         # It clears the window to the background colour
         arcade.start_render()
 
-        # The sign is set up in a position dependant on the window size so it moves when the window is resized
-        self.sign.center_x = self.window.width / 2
-        self.sign.center_y = (self.window.height / 2) + 50
         # This draws all the sprites in this SpriteList and the parameter determines how they are drawn
         # GL_NEAREST prevents anti-aliasing
         self.sign_list.draw(filter=GL_NEAREST)
-
-        # Some supporting text is drawn to tell the user how to progress to the next view
-        arcade.draw_text("Click to start", self.window.width / 2, self.window.height / 2 - 300, arcade.color.WHITE,
-                         font_size=35, anchor_x="center")
+        self.start_label.draw()
 
     def on_mouse_press(self, _x, _y, _button, _modifiers):
         # This function is called when the mouse is pressed
@@ -299,75 +557,111 @@ class MenuView(arcade.View):
 class GameView(arcade.View):
     """Child Class Of The View Class"""
     # This View has the gameplay on it
+    # The gameplay itself is done by a Simulation, this View draws it and passes the key presses to it
 
     # The __init__ functions are called when an object of that class are made
     # It sets up several attributes
-    def __init__(self):
+    def __init__(self, simulation=None):
         super().__init__()
 
-        # These attributes track the current state of what key is pressed
-        # Initially they are set to False
-        self.left_pressed = False
-        self.right_pressed = False
-        self.up_pressed = False
-        self.down_pressed = False
-        self.w_pressed = False
-        self.a_pressed = False
-        self.s_pressed = False
-        self.d_pressed = False
-        self.space_pressed = False
-
-        # These attributes will be rectangles
-        # They are used for determining whether the AI Ships are too close to the window edge
-        self.ai_outer_rect = None
-        self.ai_inner_rect = None
-
-        # Create Sprite lists to hold the sprites
-        self.player_list = arcade.SpriteList()
-        self.ship_list = arcade.SpriteList()
-        self.torpedo_list = arcade.SpriteList()
-        self.explosion_list = arcade.SpriteList()
-        self.all_collidable_sprites = arcade.SpriteList()
-        self.enemy_ship_list = arcade.SpriteList()
-
-        # Create and setup the player ship
-        self.player_sprite = Player()
-        self.player_sprite.identifier = 0
-        # Append the player sprite to the appropriate lists
-        self.player_list.append(self.player_sprite)
-        self.ship_list.append(self.player_sprite)
-        self.all_collidable_sprites.append(self.player_sprite)
-
-        # Create and setup the enemy ships
-        # This for loop allows for any number of enemy ships to be created
-        for i in range(ENEMY_SHIP_NUMBER):
-            # Create ship with an image based on the iterated value
-            # There are 3 different colours of enemy ships
-            # So every 3 enemy ships the colours will repeat
-            ship = AI("Images/EnemyShip" + str((i % 3) + 1) + ".png")
-            # Assign their identifier based on the iterated value
-            ship.identifier = i + 1
-
-            # Append the AI ships to the appropriate lists
-            self.all_collidable_sprites.append(ship)
-            self.ship_list.append(ship)
-            self.enemy_ship_list.append(ship)
-
-        # This sets up the starting position of all the ships depending on how many ships there are
-        i = 0
-        for ship in self.ship_list:
-            # The ships are arranged equally on points of a circle originating at the middle of the window
-            # The angle different between them is determined on the number of ships
-            angle = i * 360 / len(self.ship_list)
-            # Their direction is determined by the angle they were placed at
-            ship.angle = angle
-
-            # Their position from the center of the window is determined by the angle and window size
-            # It's cartesian coordinates are determined by polar coordinates
-            ship.center_x = self.window.height / 4 * math.cos(math.radians(angle)) + self.window.width / 2
-            ship.center_y = self.window.height / 4 * math.sin(math.radians(angle)) + self.window.height / 2
-            # Increment the i value for the next ship so it's angle is the next value
-            i += 1
+        # The Simulation holds all the ships, torpedoes and explosions and updates them
+        # Its arena is WORLD_SCALE times the size of the window when the game starts, or the size of the scenario
+        # A new game is recorded so it can be watched again when it ends
+        self.recorder = None
+        if simulation is None:
+            if SCENARIO_FILE is not None:
+                simulation = create_simulation(load_scenario(SCENARIO_FILE))
+            else:
+                simulation = Simulation(round(self.window.width * WORLD_SCALE),
+                                        round(self.window.height * WORLD_SCALE))
+            self.recorder = ReplayRecorder(simulation)
+        self.simulation = simulation
+        self.simulation.profiler = game_profiler
+        # The Replay of this game, it is made when the game ends
+        self.replay = None
+        # Create a shorter named handle of the player's ship
+        self.player_sprite = self.simulation.player_sprite
+
+        # Create Sprite lists to hold the sprites that draw the Simulation
+        # Each SpriteList is drawn with one draw call, whatever number of sprites are in it
+        # Collisions are found by the Simulation, so the lists don't need a spatial hash slowing down every move
+        self.ship_list = arcade.SpriteList(use_spatial_hash=False)
+        self.torpedo_list = arcade.SpriteList(use_spatial_hash=False)
+        self.explosion_list = arcade.SpriteList(use_spatial_hash=False)
+        self.health_bars = HealthBars()
+
+        # This dictionary links each ship to the sprite that draws it
+        self.ship_sprites = {}
+        # Torpedo and explosion sprites come from pools and go back to them when they aren't needed
+        # The pools are shared by every game, and this game's sprites go back to them when it ends
+        self.torpedo_pool, self.explosion_pool = get_sprite_pools()
+
+        # The Labels of the lines of the profile overlay and how long they have been shown for
+        self.profile_labels = []
+        self.profile_time = 0
+
+        # The camera shows the part of the arena around the player
+        # Only the ships, torpedoes and explosions it shows are given sprites and drawn
+        self.camera = Camera()
+        self.camera.resize(self.window.width, self.window.height)
+        self.culling = True
+
+        # The aim and HUD are only made again when they change
+        self.aim_reticle = AimReticle()
+        self.hud = Hud()
+        self.resize_hud(self.window.width, self.window.height)
+        self.sync_sprites()
+
+    def sync_sprites(self):
+        # Make the sprites match the current state of the Simulation
+        # The camera is moved to the player first, then only what it shows is given sprites
+        # The ships near the camera are found with the Simulation's spatial hash, without looking at the rest
+        interpolation = self.simulation.interpolation
+        self.move_camera(interpolation)
+        ships = self.simulation.ship_list
+        if self.culling:
+            ships = self.simulation.collision_hash.get_in_rect(*self.camera.get_bounds(CULL_MARGIN))
+        sync_sprites(ships, self.ship_list, self.ship_sprites, create_ship_sprite, interpolation)
+        self.health_bars.update(self.ship_sprites)
+        self.hud.update(self.simulation)
+
+        # The torpedo sprites are set straight from the arrays of the Simulation's TorpedoEngine
+        # There is one sprite for each torpedo shown, so sprites are only added or removed when the count changes
+        torpedoes = self.simulation.torpedoes
+        x, y = torpedoes.get_positions(interpolation)
+        angle = torpedoes.angle[:torpedoes.count]
+        if self.culling:
+            visible = self.camera.get_visible(x, y, CULL_MARGIN)
+            x, y, angle = x[visible], y[visible], angle[visible]
+        count = len(x)
+        while len(self.torpedo_list) < count:
+            self.torpedo_list.append(self.torpedo_pool.acquire())
+        while len(self.torpedo_list) > count:
+            self.torpedo_pool.release(self.torpedo_list.pop())
+
+        for sprite, x, y, angle in zip(self.torpedo_list, x.tolist(), y.tolist(), angle.tolist()):
+            sprite.center_x = x
+            sprite.center_y = y
+            sprite.angle = angle
+
+        # The explosion sprites are set from the Simulation's DamageFields the same way
+        # Each explosion is drawn smaller as its circle of damage shrinks
+        explosions = self.simulation.explosions
+        x, y = explosions.x[:explosions.count], explosions.y[:explosions.count]
+        scale = explosions.get_scale(EXPLOSION_SCALING)
+        if self.culling:
+            visible = self.camera.get_visible(x, y, CULL_MARGIN)
+            x, y, scale = x[visible], y[visible], scale[visible]
+        count = len(x)
+        while len(self.explosion_list) < count:
+            self.explosion_list.append(self.explosion_pool.acquire())
+        while len(self.explosion_list) > count:
+            self.explosion_pool.release(self.explosion_list.pop())
+
+        for sprite, x, y, scale in zip(self.explosion_list, x.tolist(), y.tolist(), scale.tolist()):
+            sprite.center_x = x
+            sprite.center_y = y
+            sprite.scale = scale
 
     def on_show(self):
         # Code to run when the view is shown
@@ -375,24 +669,35 @@ class GameView(arcade.View):
         # Set the background colour/color
         arcade.set_background_color(arcade.color.OCEAN_BOAT_BLUE)
 
+    def move_camera(self, interpolation):
+        # Move the camera to where the player's ship is drawn, between ticks
+        # If the player's ship is gone then it stays where the ship was
+        player = self.player_sprite
+        if player is None:
+            self.camera.follow(self.simulation.width / 2, self.simulation.height / 2,
+                               self.simulation.width, self.simulation.height)
+            return
+        self.camera.follow(player.previous_x + (player.center_x - player.previous_x) * interpolation,
+                           player.previous_y + (player.center_y - player.previous_y) * interpolation,
+                           self.simulation.width, self.simulation.height)
+
     def on_resize(self, width, height):
         # When the window is resized, this function is called
-        # So the sizes of the rectangles for the AI Ship wall avoidance code need to be resized
-
-        # Create rectangles which have a midpoint at the window's midpoint
-        # The outer rect is to determine when the AI Ships start turning away from the wall
-        p1 = (AI_OUTER_DISTANCE, AI_OUTER_DISTANCE)
-        p2 = (width - AI_OUTER_DISTANCE, AI_OUTER_DISTANCE)
-        p3 = (width - AI_OUTER_DISTANCE, height - AI_OUTER_DISTANCE)
-        p4 = (AI_OUTER_DISTANCE, height - AI_OUTER_DISTANCE)
-        self.ai_outer_rect = [p1, p2, p3, p4]
-
-        # The inner rect is to determine when the AI Ships stop turning away from the wall
-        p1 = (AI_INNER_DISTANCE, AI_INNER_DISTANCE)
-        p2 = (width - AI_INNER_DISTANCE, AI_INNER_DISTANCE)
-        p3 = (width - AI_INNER_DISTANCE, height - AI_INNER_DISTANCE)
-        p4 = (AI_INNER_DISTANCE, height - AI_INNER_DISTANCE)
-        self.ai_inner_rect = [p1, p2, p3, p4]
+        # The arena stays the same size, the camera shows more or less of it
+        self.camera.resize(width, height)
+        self.resize_hud(width, height)
+
+    def resize_hud(self, width, height):
+        # Move the HUD and the profile overlay to the new corners of the window and make the aim again
+        self.hud.on_resize(width, height)
+        self.aim_reticle.invalidate()
+        self.place_profile_labels(height)
+
+    def place_profile_labels(self, height):
+        # The lines of the profile overlay go down from the top left of the window
+        top = height - PROFILE_FONT_SIZE * 2
+        for i, label in enumerate(self.profile_labels):
+            label.set_position(10, top - i * PROFILE_FONT_SIZE * 1.5)
 
     def on_draw(self):
         # Render the screen and draw shapes and sprites on it
@@ -400,381 +705,219 @@ class GameView(arcade.View):
         # arcade.start_render() is needed to start drawing and it clears the window
         arcade.start_render()
 
-        # This creates a circle originating at the player where it's radius is the player's aim_distance
-        # This is used to show how far the player is aiming
-        arcade.draw_circle_outline(self.player_sprite.center_x, self.player_sprite.center_y,
-                                   self.player_sprite.aim_distance, [0, 75, 120], 3, -1)
-
-        # This code draws a line dependant on the player's aim_angle and aim_distance
-        # Create shorter named handles of the player's attributes to be used in equations
-        aim_angle = self.player_sprite.aim_angle
-        aim_distance = self.player_sprite.aim_distance
-
-        # The lines's cartesian endpoints are determined by polar coordinates
-        # The length of the line is the player's aim_distance and it's angle, the player's aim_angle
-        # The player's current coordinates need to be added
-        # Otherwise the line's endpoints will be based on the window's origin rather than the player
-        end_x = aim_distance * math.cos(math.radians(aim_angle)) + self.player_sprite.center_x
-        end_y = aim_distance * math.sin(math.radians(aim_angle)) + self.player_sprite.center_y
-
-        # Draw the line using the start point and end point
-        # This shows what direction the player is aiming
-        arcade.draw_line(self.player_sprite.center_x, self.player_sprite.center_y, end_x, end_y, [0, 75, 120], 3)
-
+        # If the profiler is enabled then each part of drawing is timed and the profile is drawn on top
+        # The arena is drawn through the camera and the HUD is drawn over it where it is in the window
+        profiler = self.simulation.profiler
+        self.camera.use()
+        if profiler.enabled:
+            profiler.time_phase("draw_aim", self.draw_aim)
+            profiler.time_phase("draw_weapons", self.draw_weapons)
+            profiler.time_phase("draw_health_bars", self.draw_health_bars)
+            profiler.time_phase("draw_ships", self.draw_ships)
+            self.camera.use_window()
+            profiler.time_phase("draw_hud", self.hud.draw)
+            self.draw_profile()
+        else:
+            self.draw_aim()
+            self.draw_weapons()
+            self.draw_health_bars()
+            self.draw_ships()
+            self.camera.use_window()
+            self.hud.draw()
+
+    def draw_aim(self):
+        # The aim is drawn from where the player's ship is drawn, which is between ticks
+        # If the player's ship is gone then it is drawn from where the ship was
+        player_x, player_y = self.player_sprite.center_x, self.player_sprite.center_y
+        if self.player_sprite in self.ship_sprites:
+            player_x, player_y = self.ship_sprites[self.player_sprite].position
+
+        self.aim_reticle.draw(player_x, player_y, self.player_sprite.aim_distance, self.player_sprite.aim_angle)
+
+    def draw_weapons(self):
         # The sprites are drawn by calling the draw() function on the sprite lists
         # The GL_NEAREST determines the quality
         self.torpedo_list.draw(filter=GL_NEAREST)
         self.explosion_list.draw(filter=GL_NEAREST)
 
+    def draw_health_bars(self):
         # This draws the health bars for each ship
-        for ship in self.ship_list:
-            ship.draw_health()
+        self.health_bars.draw()
 
+    def draw_ships(self):
         self.ship_list.draw(filter=GL_NEAREST)
 
+    def draw_profile(self):
+        # Draw the p50, p95 and p99 time of every phase in the top left of the window
+        # The text only changes every PROFILE_OVERLAY_TIME seconds so it can be read
+        for label in self.profile_labels:
+            label.draw()
+
+    def update_profile_text(self, delta_time):
+        # Work out the text of the profile overlay again if it has been shown for long enough
+        self.profile_time += delta_time
+        if self.profile_time < PROFILE_OVERLAY_TIME:
+            return
+        self.profile_time = 0
+        lines = ["{:18} p50 {:7.3f}  p95 {:7.3f}  p99 {:7.3f} ms".format(
+            name, times["p50_ms"], times["p95_ms"], times["p99_ms"])
+            for name, times in self.simulation.profiler.get_summary().items()]
+        # A Label is made for each new line, and the Labels of lines that are still shown are reused
+        if len(self.profile_labels) != len(lines):
+            while len(self.profile_labels) < len(lines):
+                self.profile_labels.append(Label("", PROFILE_FONT_SIZE))
+            del self.profile_labels[len(lines):]
+            self.place_profile_labels(self.window.height)
+        for label, line in zip(self.profile_labels, lines):
+            label.set_text(line)
+
     def on_update(self, delta_time):
         # This function is called a maximum of 60 times a second
-        # It is used to update the game information
-
-        # The player is updated first based on the keys pressed
-        # If only the w key is pressed then the player is accelerating
-        # If both are pressed then the player's speed is not changed
-        # If only the s key is pressed then the player is decelerating
-        if self.w_pressed and not self.s_pressed:
-            self.player_sprite.speed += ACCELERATION_RATE
-        elif self.s_pressed and not self.w_pressed:
-            self.player_sprite.speed -= ACCELERATION_RATE
-
-        # Changes angle of the player ship
-        # Like comments above but a key turns player ship left and d key right
-        # The angle turning is based on the speed of the player so they can't turn if they have a speed of 0
-        if self.a_pressed and not self.d_pressed:
-            self.player_sprite.angle += ANGLE_SPEED * self.player_sprite.speed
-        elif self.d_pressed and not self.a_pressed:
-            self.player_sprite.angle -= ANGLE_SPEED * self.player_sprite.speed
-
-        # Change aim_distance
-        # Like comments above but up arrow key increases aim_distance
-        # Down arrow decreases aim_distance
-        # This changes how far the player is aiming
-        # These change the radius and length of the circle and line that show the player's aiming
-        if self.up_pressed and not self.down_pressed:
-            self.player_sprite.aim_distance += AIM_DISTANCE_SPEED
-        elif self.down_pressed and not self.up_pressed:
-            self.player_sprite.aim_distance -= AIM_DISTANCE_SPEED
-
-        # Change aim_angle
-        # Like comments above, left arrow key increases aim_angle (left)
-        # Right arrow key decreases aim_angle (right)
-        # This changes the direction the player is aiming
-        # This changes the direction of the line that shows the player's aiming
-        if self.left_pressed and not self.right_pressed:
-            self.player_sprite.aim_angle += AIM_ANGLE_SPEED
-        elif self.right_pressed and not self.left_pressed:
-            self.player_sprite.aim_angle -= AIM_ANGLE_SPEED
-
-        # The space key is the player's shoot key
-        # If it's pressed, it checks if the player can shoot a torpedo
-        # cooldown_time is increased every update in the Ship Class update function
-        # If cooldown_time is greater than the WEAPON_COOLDOWN_TIME
-        # Then a torpedo is created
-        if self.space_pressed:
-            if self.player_sprite.cooldown_time >= WEAPON_COOLDOWN_TIME:
-                # Since the player fired a torpedo, reset the cooldown_time
-                self.player_sprite.cooldown_time = 0
-
-                # Create shorter named handles of the player's attributes to use to setup the torpedo
-                angle = self.player_sprite.aim_angle
-                x = self.player_sprite.center_x
-                y = self.player_sprite.center_y
-                distance_to_travel = self.player_sprite.aim_distance
-                identifier = self.player_sprite.identifier
-
-                # Creates the torpedo
-                # Gets a handle of the torpedo in order to append it to the SpriteLists below
-                torpedo = create_torpedo(angle, x, y, distance_to_travel, identifier)
-
-                self.torpedo_list.append(torpedo)
-                self.all_collidable_sprites.append(torpedo)
-
-        # Updates Explosions
-        # When a torpedo explodes, an explosion is made
-        for explosion in self.explosion_list:
-            # Determine if any ships are in an explosion
-            # If so, decrease their hp
-            # Every frame that the ship is in the explosion, it's hp decreases by 5
-            hit_list = arcade.check_for_collision_with_list(explosion, self.ship_list)
-            for ship in hit_list:
-                ship.hp -= 5
-
-            # Explosions go away over time
-            # So reduce explosion size and if small enough then remove it
-            explosion.scale -= 0.05
-            if explosion.scale <= 0:
-                # This removes it from all sprite lists so it is no longer updated, displayed or used
-                explosion.remove_from_sprite_lists()
-
-        # Updates torpedoes
-        for torpedo in self.torpedo_list:
-            # Find all the collidable sprites the torpedo can collide with
-            hit_list = arcade.check_for_collision_with_list(torpedo, self.all_collidable_sprites)
-
-            # Determine how far the torpedo has traveled from it's start position
-            distance_traveled = ((torpedo.center_x - torpedo.start_x) ** 2 +
-                                 (torpedo.center_y - torpedo.start_y) ** 2) ** 0.5
-
-            # If the ship that fired the torpedo is in the hit_list then remove it
-            # This prevents the torpedo from exploding as soon as it was fired
-            # Because it hit the ship it was fired from
-            for ship in self.ship_list:
-                # If the torpedo's origin equals the identifier of the ship in the hit_list then remove that ship
-                if ship in hit_list and ship.identifier == torpedo.origin:
-                    hit_list.remove(ship)
-                    # Since the torpedo's origin has been found, no other ships have to be checked
-                    # as there is only one ship the torpedo can originate from
-                    break
-
-            # After removing any ships, if the hit_list is greater than 0
-            # Then the torpedo hit at least one sprite that was not it's origin so it shall explode
-            # Also if the torpedo reached it's endpoint then it shall explode
-            if len(hit_list) > 0 or distance_traveled >= torpedo.distance_to_travel:
-                torpedo.remove_from_sprite_lists()
-
-                # Create an explosion at the torpedoes midpoint
-                explosion = arcade.Sprite("Images/Explosion.png", EXPLOSION_SCALING)
-                explosion.center_x = torpedo.center_x
-                explosion.center_y = torpedo.center_y
-
-                # Add the explosion to the appropriate SpriteLists
-                self.explosion_list.append(explosion)
-                self.all_collidable_sprites.append(explosion)
-
-                # If a ship was hit, decrease it's hp
-                for sprite in hit_list:
-                    if sprite in self.ship_list:
-                        sprite.hp -= 150
-
-        # Updates AI Ships
-        for ship in self.enemy_ship_list:
-            # Check for the closest ship
-            # Have to remove this ship from the sprite list being checked
-            # Otherwise it will return itself as the closest ship
-            self.ship_list.remove(ship)
-            # arcade.get_closest_sprite returns a tuple with the closest sprite and the distance to the sprite
-            closest_sprite = arcade.get_closest_sprite(ship, self.ship_list)
-            # Add the ship back
-            self.ship_list.append(ship)
-
-            # If the distance to the closest sprite is within the MAX_AIM_DISTANCE
-            # Then check if the AI Ship can shoot
-            if closest_sprite[1] <= MAX_AIM_DISTANCE:
-                # If the ship can shoot then do the next code
-                if ship.cooldown_time >= WEAPON_COOLDOWN_TIME:
-                    # Creates a shorter named handle for the closest sprite
-                    target = closest_sprite[0]
-
-                    # Determines the cartesian coordinate difference between the ship and the target
-                    x_diff = target.center_x - ship.center_x
-                    y_diff = target.center_y - ship.center_y
-
-                    # t = d / v
-                    # Determine the time taken for a torpedo to reach the target's current position
-                    time_taken = closest_sprite[1] / TORPEDO_SPEED
-
-                    # Determine the target's change in x and y by the time_taken
-                    dx = target.speed * math.cos(math.radians(target.angle)) * time_taken
-                    dy = target.speed * math.sin(math.radians(target.angle)) * time_taken
-
-                    # Determine the destination of the target
-                    dest_x = x_diff + dx
-                    dest_y = y_diff + dy
-
-                    # Determine the distance the torpedo would have to travel
-                    # To get to the destination of the target
-                    distance_to_travel = ((dest_x ** 2) + (dest_y ** 2)) ** 0.5
-
-                    # If the distance to travel is greater than the MAX_AIM_DISTANCE
-                    # Then there is no point in firing as the torpedo will explode
-                    # Before it reaches the target's destination
-                    if distance_to_travel <= MAX_AIM_DISTANCE:
-                        # If the distance to travel is smaller than the MIN_AIM_DISTANCE
-                        # Then set it to the MIN_AIM_DISTANCE
-                        # This helps prevent a ship from destroying itself
-                        if distance_to_travel < MIN_AIM_DISTANCE:
-                            distance_to_travel = MIN_AIM_DISTANCE
-
-                        # The AI Ship fires a torpedo so reset it's cooldown_time
-                        ship.cooldown_time = 0
-
-                        # Calculate the direction of the torpedo
-                        # Create shorter named handles of the AI Ships attributes to be used for the torpedo
-                        angle = math.degrees(math.atan2(dest_y, dest_x))
-                        x = ship.center_x
-                        y = ship.center_y
-                        identifier = ship.identifier
-
-                        # Creates the torpedo
-                        # Gets a handle of the torpedo in order to append it to the SpriteLists below
-                        torpedo = create_torpedo(angle, x, y, distance_to_travel, identifier)
-
-                        self.torpedo_list.append(torpedo)
-                        self.all_collidable_sprites.append(torpedo)
-
-            # If the ai ship is below it's max speed then accelerate it
-            if ship.speed < MAX_SPEED:
-                ship.speed += ACCELERATION_RATE
-
-            # This code below determines how the AI Ships should turn
-            # If one of these variables is true then the ai ship is close to the window edge
-            # Window edge avoidance takes priority over other turning so it is checked first
-            if ship.left_turn or ship.right_turn:
-                # Depending on which variable is true, make it turn that way
-                if ship.left_turn:
-                    ship.angle += ANGLE_SPEED * ship.speed
-                elif ship.right_turn:
-                    ship.angle -= ANGLE_SPEED * ship.speed
-
-                # arcade.is_point_in_polygon checks if a given point is in a given polygon
-                # If the ai ship is inside this rect, then it is not by the window edge anymore
-                # So stop making it turn away from the edge
-                if arcade.is_point_in_polygon(ship.center_x, ship.center_y, self.ai_inner_rect):
-                    ship.left_turn = False
-                    ship.right_turn = False
-
-            # If the ai ship is not turning away from the edge then check the other turning code
-            else:
-                # Check if the ai ship is too close to the edge
-                in_rect = arcade.is_point_in_polygon(ship.center_x, ship.center_y, self.ai_outer_rect)
-
-                # If the ship is not in the rect, it means it is too close to the window edge
-                # Then depending on angle it is approaching the window edge
-                # Make it turn left or right
-                if not in_rect:
-                    if (ship.angle // 45) % 2 == 0:
-                        ship.left_turn = True
-                    else:
-                        ship.right_turn = True
-
-                # If it is in the rect then do the other turning code
-                elif in_rect:
-                    # Determine x and y difference between this ship and closest ship
-                    x_diff = closest_sprite[0].center_x - ship.center_x
-                    y_diff = closest_sprite[0].center_y - ship.center_y
-
-                    # Determine the atan2 angle of the closest ship relative to this ship
-                    # Create modified value of this ship's angle to be used later
-                    arctan_angle = math.degrees(math.atan2(y_diff, x_diff))
-                    ship_angle = abs(ship.angle % 360)
-
-                    # If the closest sprite is within a certain distance to this ship
-                    # Then depending on the arctan_angle the closest ship is to this ship
-                    # Make this ship turn left or right
-                    # Explaining how this code works without diagrams and more space is difficult
-                    # So I won't explain
-                    if closest_sprite[1] < MAX_AIM_DISTANCE / 2:
-                        if arctan_angle >= 0:
-                            if arctan_angle < ship_angle < arctan_angle + 180:
-                                ship.angle += ANGLE_SPEED * ship.speed
-                            else:
-                                ship.angle -= ANGLE_SPEED * ship.speed
-
-                        else:
-                            if arctan_angle + 180 < ship_angle < arctan_angle + 360:
-                                ship.angle -= ANGLE_SPEED * ship.speed
-                            else:
-                                ship.angle += ANGLE_SPEED * ship.speed
-
-                    # If the closest ship is not close enough to shoot at
-                    # Then depending on the arctan_angle the closest ship is to this ship
-                    # Make this ship turn left or right
-                    # So this ship can get closer and then attack the nearest ship
-                    elif closest_sprite[1] > MAX_AIM_DISTANCE:
-                        if arctan_angle >= 0:
-                            if arctan_angle < ship_angle < arctan_angle + 180:
-                                ship.angle -= ANGLE_SPEED * ship.speed
-                            else:
-                                ship.angle += ANGLE_SPEED * ship.speed
-
-                        else:
-                            if arctan_angle + 180 < ship_angle < arctan_angle + 360:
-                                ship.angle += ANGLE_SPEED * ship.speed
-                            else:
-                                ship.angle -= ANGLE_SPEED * ship.speed
-
-        # Check if a ship is dead and if so remove it
-        for ship in self.ship_list:
-            if ship.hp <= 0:
-                ship.remove_from_sprite_lists()
-
-                # If the player is dead or all the enemy ships are dead
-                # Then go to the GameOverView
-
-                # If everyone but the player is dead
-                # Then setup the GameOverView to say "You Won!"
-                if len(self.enemy_ship_list) == 0:
-                    game_over_view = GameOverView()
-                    game_over_view.text = "You Won!"
-                    self.window.show_view(game_over_view)
-
-                # If the player is dead
-                # Then setup the GameOverView to say "You Lost!"
-                elif len(self.player_list) == 0:
-                    game_over_view = GameOverView()
-                    game_over_view.text = "You Lost!"
-                    self.window.show_view(game_over_view)
-
-        # Update the sprites in these SpriteLists using the update function in their class
-        self.ship_list.on_update(delta_time)
-        self.player_sprite.update()
-        self.torpedo_list.update()
+        # The Simulation does as many ticks as fit in the time since the last frame
+        # Then the sprites are moved to where the bodies are between the last tick and the next one
+        self.simulation.advance(delta_time)
+        profiler = self.simulation.profiler
+        if profiler.enabled:
+            profiler.time_phase("sync_sprites", self.sync_sprites)
+            self.update_profile_text(delta_time)
+        else:
+            self.sync_sprites()
+
+        # If the player is dead or all the enemy ships are dead
+        # Then go to the GameOverView
+        if self.simulation.result is not None:
+            self.show_game_over()
+
+    def load_game(self, simulation):
+        # Carry on from a loaded game instead of this one
+        # The recording starts again from the loaded game so the replay matches what is played
+        # The loaded game keeps the arena it was saved with
+        # The keys held down when it was saved aren't held down now, so it is given the keys held down at the moment
+        for name in KEY_NAMES:
+            setattr(simulation, name, getattr(self.simulation, name))
+        self.simulation = simulation
+        self.simulation.profiler = game_profiler
+        self.recorder = ReplayRecorder(simulation)
+        self.player_sprite = self.simulation.player_sprite
+        self.sync_sprites()
+
+    def show_game_over(self):
+        # Show the GameOverView with the result of the game and the replay of it
+        if self.replay is None and self.recorder is not None:
+            self.replay = self.recorder.get_replay(self.simulation)
+            self.replay.save(REPLAY_FILE)
+        self.release_sprites()
+        game_over_view = GameOverView()
+        game_over_view.replay = self.replay
+
+        # If everyone but the player is dead
+        # Then setup the GameOverView to say "You Won!"
+        if self.simulation.result == "won":
+            game_over_view.text = "You Won!"
+
+        # If the player is dead
+        # Then setup the GameOverView to say "You Lost!"
+        else:
+            game_over_view.text = "You Lost!"
+
+        self.window.show_view(game_over_view)
+
+    def release_sprites(self):
+        # Put the torpedo and explosion sprites back in their pools for the next game
+        while len(self.torpedo_list):
+            self.torpedo_pool.release(self.torpedo_list.pop())
+        while len(self.explosion_list):
+            self.explosion_pool.release(self.explosion_list.pop())
 
     def on_key_press(self, key, key_modifiers):
         # on_key_press is called whenever a key is pressed
         # Depending on the key pressed
-        # It sets the GameView's state of the key to True
+        # It sets the Simulation's state of the key to True
 
         if key == arcade.key.UP:
-            self.up_pressed = True
+            self.simulation.up_pressed = True
         elif key == arcade.key.DOWN:
-            self.down_pressed = True
+            self.simulation.down_pressed = True
         elif key == arcade.key.LEFT:
-            self.left_pressed = True
+            self.simulation.left_pressed = True
         elif key == arcade.key.RIGHT:
-            self.right_pressed = True
+            self.simulation.right_pressed = True
         elif key == arcade.key.W:
-            self.w_pressed = True
+            self.simulation.w_pressed = True
         elif key == arcade.key.A:
-            self.a_pressed = True
+            self.simulation.a_pressed = True
         elif key == arcade.key.S:
-            self.s_pressed = True
+            self.simulation.s_pressed = True
         elif key == arcade.key.D:
-            self.d_pressed = True
+            self.simulation.d_pressed = True
         elif key == arcade.key.SPACE:
-            self.space_pressed = True
+            self.simulation.space_pressed = True
+        elif key == PROFILE_KEY:
+            game_profiler.toggle()
+        elif key == QUICKSAVE_KEY:
+            write_world_file(self.simulation, QUICKSAVE_FILE)
+        elif key == QUICKLOAD_KEY and os.path.exists(QUICKSAVE_FILE):
+            self.load_game(read_world_file(QUICKSAVE_FILE))
 
     def on_key_release(self, key, key_modifiers):
         # on_key_release is called whenever a key is pressed
         # Depending on the key released
-        # It sets the GameView's state of the key to False
+        # It sets the Simulation's state of the key to False
 
         if key == arcade.key.UP:
-            self.up_pressed = False
+            self.simulation.up_pressed = False
         elif key == arcade.key.DOWN:
-            self.down_pressed = False
+            self.simulation.down_pressed = False
         elif key == arcade.key.LEFT:
-            self.left_pressed = False
+            self.simulation.left_pressed = False
         elif key == arcade.key.RIGHT:
-            self.right_pressed = False
+            self.simulation.right_pressed = False
         elif key == arcade.key.W:
-            self.w_pressed = False
+            self.simulation.w_pressed = False
         elif key == arcade.key.A:
-            self.a_pressed = False
+            self.simulation.a_pressed = False
         elif key == arcade.key.S:
-            self.s_pressed = False
+            self.simulation.s_pressed = False
         elif key == arcade.key.D:
-            self.d_pressed = False
+            self.simulation.d_pressed = False
         elif key == arcade.key.SPACE:
-            self.space_pressed = False
+            self.simulation.space_pressed = False
+
+
+class ReplayView(GameView):
+    """Child Class Of The GameView Class"""
+    # This View plays back a Replay instead of a game being played
+    # The keys of every tick come from the Replay, and the arrow keys go back and forward through it
+
+    # The __init__ functions are called when an object of that class are made
+    # It sets up several attributes
+    def __init__(self, replay):
+        super().__init__(replay.seek(replay.start_tick))
+        self.replay = replay
+
+    def on_update(self, delta_time):
+        # A replay that stopped before the game ended stays on its last tick
+        if self.simulation.tick >= self.replay.end_tick and self.simulation.result is None:
+            return
+        super().on_update(delta_time)
+
+    def seek(self, tick):
+        # Go to the tick, the sprites are made again for the ships of the new Simulation
+        self.simulation = self.replay.seek(tick, self.simulation)
+        self.simulation.profiler = game_profiler
+        self.player_sprite = self.simulation.player_sprite
+        self.sync_sprites()
+
+    def on_key_press(self, key, key_modifiers):
+        if key == arcade.key.LEFT:
+            self.seek(self.simulation.tick - REPLAY_SEEK_TICKS)
+        elif key == arcade.key.RIGHT:
+            self.seek(self.simulation.tick + REPLAY_SEEK_TICKS)
+        elif key == PROFILE_KEY:
+            game_profiler.toggle()
+
+    def on_key_release(self, key, key_modifiers):
+        pass
 
 
 class GameOverView(arcade.View):
@@ -788,22 +931,38 @@ class GameOverView(arcade.View):
         super().__init__()
         # This is used to store what text to say depending if the player won or lost
         self.text = None
+        # The Replay of the game that just ended, if there is one it can be watched
+        self.replay = None
+        # The Labels of the text, they are made when the View is shown as that is when text is known
+        self.labels = []
 
     def on_show(self):
         # When shown, set the background to this colour
         arcade.set_background_color(arcade.color.OCEAN_BOAT_BLUE)
 
+        # Text saying whether the player won or lost
+        # And text that tells the player they can replay by clicking
+        self.labels = [Label(self.text, 100, anchor_x="center"), Label("Click to replay", 50, anchor_x="center")]
+        # And text that tells the player they can watch the game again
+        if self.replay is not None:
+            self.labels.append(Label("Press R to watch the game again", 30, anchor_x="center"))
+        self.on_resize(self.window.width, self.window.height)
+
+    def on_resize(self, width, height):
+        # The text is in the middle of the window, one line under another
+        for label, offset in zip(self.labels, (0, 100, 170)):
+            label.set_position(width / 2, height / 2 - offset)
+
     def on_draw(self):
-        # Start the render and draw some text
+        # Start the render and draw the text
         arcade.start_render()
+        for label in self.labels:
+            label.draw()
 
-        # Draws text saying whether the player won or lost
-        arcade.draw_text(self.text, self.window.width / 2, self.window.height / 2, arcade.color.WHITE,
-                         font_size=100, anchor_x="center")
-
-        # Draw text that tells the player they can replay by clicking
-        arcade.draw_text("Click to replay", self.window.width / 2, self.window.height / 2 - 100, arcade.color.WHITE,
-                         font_size=50, anchor_x="center")
+    def on_key_press(self, key, key_modifiers):
+        # When R is pressed, show the replay of the game that just ended
+        if key == REPLAY_KEY and self.replay is not None:
+            self.window.show_view(ReplayView(self.replay))
 
     def on_mouse_press(self, _x, _y, _button, _modifiers):
         # When the player clicks, create and show the GameView
@@ -813,8 +972,32 @@ class GameOverView(arcade.View):
         game_view.on_resize(self.window.width, self.window.height)
 
 
-def main():
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Play the Naval Warfare Game")
+    parser.add_argument("--world-scale", type=float, default=WORLD_SCALE,
+                        help="how many times the size of the window the arena is")
+    parser.add_argument("--scenario", default=SCENARIO_FILE, help="a scenario file to play instead of the default game")
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
     """ Main method """
+    global WORLD_SCALE, SCENARIO_FILE
+    arguments = parse_arguments(arguments)
+    if arguments.world_scale < 1:
+        raise SystemExit("--world-scale has to be at least 1")
+    WORLD_SCALE = arguments.world_scale
+    SCENARIO_FILE = arguments.scenario
+    # A scenario is checked now, so a mistake in it is shown before the window opens rather than when a game starts
+    if SCENARIO_FILE is not None:
+        try:
+            load_scenario(SCENARIO_FILE)
+        except (OSError, ValueError) as error:
+            raise SystemExit("Can't play {}: {}".format(SCENARIO_FILE, error))
+
+    # The images start loading straight away, on another thread while the window opens
+    asset_loader.start()
+
     # Set initial size of window
     # This is not a perfect fitting of the display due to any task bars and window heading
     size = arcade.get_display_size(0)
@@ -828,7 +1011,12 @@ def main():
     # This view is created to allow for correct resize of window
     buffer_view = BufferView()
     window.show_view(buffer_view)
-    arcade.run()
+    try:
+        arcade.run()
+    finally:
+        # The profile is saved when the window is closed, even in the middle of a game
+        if game_profiler.phases:
+            game_profiler.dump(PROFILE_FILE)
 
 
 # Runs main()
@@ -0,0 +1,91 @@
+"""Importing key libraries"""
+import json
+import math
+import struct
+import numpy as np
+from Simulation import Simulation
+
+
+"""Defining Constants"""
+# World File Constants
+WORLD_MAGIC = b"NWWORLD\0"
+# This goes up whenever the layout of the file or the state of a Simulation changes
+WORLD_VERSION = 4
+# The magic bytes, the version and the length of the JSON header
+WORLD_PREFIX = struct.Struct("<8sHI")
+# Every array starts at a multiple of this many bytes, so it can be used straight out of the buffer
+ARRAY_ALIGNMENT = 64
+
+
+def align(offset):
+    # Return the first multiple of ARRAY_ALIGNMENT at or after the offset
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+
+def pack_world(values, arrays):
+    # Turn a state from Simulation.get_state into a versioned blob of bytes
+    # The blob is the prefix, a JSON header with the values and where each array is, and then the arrays
+    # Each array is stored as its raw bytes in little endian order
+    layout = []
+    little_endian_arrays = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, array.dtype.newbyteorder("<"))
+        little_endian_arrays.append(array)
+        layout.append([name, array.dtype.str, list(array.shape), offset])
+        offset = align(offset + array.nbytes)
+    header = json.dumps({"values": values, "arrays": layout}).encode()
+    data_start = align(WORLD_PREFIX.size + len(header))
+
+    blob = bytearray(data_start + offset)
+    WORLD_PREFIX.pack_into(blob, 0, WORLD_MAGIC, WORLD_VERSION, len(header))
+    blob[WORLD_PREFIX.size:WORLD_PREFIX.size + len(header)] = header
+    for (_, _, _, array_offset), array in zip(layout, little_endian_arrays):
+        if array.nbytes:
+            start = data_start + array_offset
+            blob[start:start + array.nbytes] = memoryview(array).cast("B")
+    return blob
+
+
+def unpack_world(buffer):
+    # Turn a blob made by pack_world back into values and arrays
+    # No bytes are copied, each array is a read only view of the buffer
+    buffer = memoryview(buffer).cast("B")
+    magic, version, header_length = WORLD_PREFIX.unpack_from(buffer)
+    if magic != WORLD_MAGIC:
+        raise ValueError("Not a world file")
+    if version != WORLD_VERSION:
+        raise ValueError("World version {} is not supported".format(version))
+
+    header = json.loads(bytes(buffer[WORLD_PREFIX.size:WORLD_PREFIX.size + header_length]))
+    data_start = align(WORLD_PREFIX.size + header_length)
+    arrays = {}
+    for name, dtype, shape, offset in header["arrays"]:
+        array = np.frombuffer(buffer, dtype, math.prod(shape), data_start + offset).reshape(shape)
+        array.flags.writeable = False
+        arrays[name] = array
+    return header["values"], arrays
+
+
+def save_world(simulation):
+    # Return the whole state of the Simulation as a blob
+    return pack_world(*simulation.get_state())
+
+
+def load_world(buffer):
+    # Return a new Simulation made from a blob made by save_world
+    return Simulation.from_state(*unpack_world(buffer))
+
+
+def write_world_file(simulation, file_name):
+    with open(file_name, "wb") as file:
+        file.write(save_world(simulation))
+
+
+def read_world_file(file_name):
+    # The file is read straight into a buffer that the arrays are views of
+    with open(file_name, "rb") as file:
+        buffer = bytearray(file.seek(0, 2))
+        file.seek(0)
+        file.readinto(buffer)
+    return load_world(buffer)